@@ -0,0 +1,20 @@
+"""
+Configurazione di Gunicorn, letta in automatico dalla cartella di lavoro
+(/app nel container, BASE_DIR per benchmark_carico).
+
+Le opzioni passate da riga di comando (Dockerfile) hanno la precedenza.
+"""
+
+import os
+
+
+def on_starting(server):
+    # Nel master, prima dei worker: le metriche dell'avvio precedente (e i
+    # file di worker terminati con PID poi riusati) non vanno sommate
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
+    import django
+
+    django.setup()
+    from parco_verismo.utils.metriche import azzera_metriche
+
+    azzera_metriche()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 # Standard library imports
+import tempfile
 from pathlib import Path
 
 # Third-party imports
@@ -43,6 +44,9 @@ SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 # HTTPS Settings (attivare in produzione)
 if not DEBUG:
     SECURE_SSL_REDIRECT = config("SECURE_SSL_REDIRECT", default=True, cast=bool)
+    # Le sonde di Docker arrivano in HTTP senza passare da nginx: un redirect
+    # 301 le farebbe sempre passare
+    SECURE_REDIRECT_EXEMPT = [r"^health/"]
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
     SECURE_HSTS_SECONDS = 31536000
@@ -74,6 +78,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Serve static files in production
+    "parco_verismo.middleware.ReplicaMiddleware",  # Letture pubbliche dalle repliche
+    "parco_verismo.middleware.ServerTimingMiddleware",  # Server-Timing e log delle richieste lente
+    "parco_verismo.middleware.MicroCacheMiddleware",  # X-Accel-Expires per la cache di nginx
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -83,6 +90,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "parco_verismo.middleware.SimpleRateLimitMiddleware",  # Rate limiting
     "parco_verismo.middleware.SecurityHeadersMiddleware",  # Security headers
+    "parco_verismo.middleware.ProfilerMiddleware",  # Profilo su richiesta (?profila=1, solo staff)
 ]
 
 ROOT_URLCONF = "mysite.urls"
@@ -91,7 +99,6 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.request",
@@ -99,10 +106,21 @@ TEMPLATES = [
                 "django.contrib.messages.context_processors.messages",
                 "parco_verismo.context_processors.google_analytics",
             ],
+            "loaders": [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
         },
     },
 ]
 
+# In produzione i template compilati restano in memoria per tutta la vita
+# del processo (in sviluppo vengono riletti a ogni modifica)
+if not DEBUG:
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        ("django.template.loaders.cached.Loader", TEMPLATES[0]["OPTIONS"]["loaders"]),
+    ]
+
 WSGI_APPLICATION = "mysite.wsgi.application"
 
 
@@ -122,29 +140,100 @@ if "postgresql" in DB_ENGINE:
             "PASSWORD": config("DB_PASSWORD", default=""),
             "HOST": config("DB_HOST", default="localhost"),
             "PORT": config("DB_PORT", default="5432"),
+            "OPTIONS": {},
+            "CONN_HEALTH_CHECKS": True,
         }
     }
+    if config("DB_POOL", default=True, cast=bool):
+        # Pool di connessioni di psycopg in ogni worker di Gunicorn: le
+        # richieste prendono una connessione già aperta invece di aprirne una
+        # nuova (incompatibile con CONN_MAX_AGE). Metriche su /metrics.
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": config("DB_POOL_MIN_SIZE", default=1, cast=int),
+            "max_size": config("DB_POOL_MAX_SIZE", default=4, cast=int),
+            # Secondi di attesa di una connessione libera prima dell'errore
+            "timeout": config("DB_POOL_TIMEOUT", default=10, cast=float),
+        }
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+    else:
+        DATABASES["default"]["CONN_MAX_AGE"] = config("CONN_MAX_AGE", default=0, cast=int)
+    if config("DB_PGBOUNCER", default=False, cast=bool):
+        # PgBouncer in transaction pooling: la connessione del server cambia a
+        # ogni transazione, quindi niente cursori lato server né prepared
+        # statement automatici di psycopg
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+        DATABASES["default"]["OPTIONS"]["prepare_threshold"] = None
+    # Repliche in sola lettura (streaming replication): host o host:porta,
+    # stesse credenziali del primario
+    for numero, replica in enumerate(config("DB_REPLICA_HOSTS", default="", cast=Csv()), start=1):
+        host, _, porta = replica.partition(":")
+        DATABASES[f"replica_{numero}"] = {
+            **DATABASES["default"],
+            "HOST": host,
+            "PORT": porta or DATABASES["default"]["PORT"],
+            "TEST": {"MIRROR": "default"},
+        }
 else:
     # SQLite per sviluppo e piccole installazioni
     # In produzione (Docker): usa /app/data/db.sqlite3 (volume persistente)
     # In sviluppo (locale): usa db.sqlite3 nella root del progetto
+    # SQLITE_PATH sceglie un altro file (es. il database del benchmark di carico)
     import os
-    if os.path.exists("/app/data"):
+    if config("SQLITE_PATH", default=""):
+        SQLITE_NAME = Path(config("SQLITE_PATH"))
+    elif os.path.exists("/app/data"):
         # Siamo in Docker
-        DATABASES = {
-            "default": {
-                "ENGINE": "django.db.backends.sqlite3",
-                "NAME": Path("/app/data/db.sqlite3"),
-            }
-        }
+        SQLITE_NAME = Path("/app/data/db.sqlite3")
     else:
         # Siamo in sviluppo locale
-        DATABASES = {
-            "default": {
-                "ENGINE": "django.db.backends.sqlite3",
-                "NAME": BASE_DIR / "db.sqlite3",
-            }
+        SQLITE_NAME = BASE_DIR / "db.sqlite3"
+
+    # Pragma eseguiti a ogni nuova connessione:
+    # - WAL: le letture non aspettano le scritture (e viceversa); resta nel file
+    # - synchronous=NORMAL: sicuro con WAL, niente fsync a ogni commit
+    # - busy_timeout: attesa massima (ms) di un lock prima di "database is locked"
+    # - mmap_size / cache_size: letture dalla memoria invece che con read()
+    SQLITE_PRAGMA = {
+        "journal_mode": config("SQLITE_JOURNAL_MODE", default="WAL"),
+        "synchronous": config("SQLITE_SYNCHRONOUS", default="NORMAL"),
+        "busy_timeout": config("SQLITE_BUSY_TIMEOUT", default=5000, cast=int),
+        "mmap_size": config("SQLITE_MMAP_SIZE", default=128 * 1024 * 1024, cast=int),
+        "cache_size": config("SQLITE_CACHE_SIZE", default=-16000, cast=int),  # negativo = KiB
+    }
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": SQLITE_NAME,
+            "OPTIONS": {
+                "init_command": ";".join(f"PRAGMA {nome}={valore}" for nome, valore in SQLITE_PRAGMA.items()),
+                # Le transazioni prendono subito il lock di scrittura: con WAL
+                # una transazione che passa da lettura a scrittura fallirebbe
+                # senza rispettare busy_timeout
+                "transaction_mode": "IMMEDIATE",
+            },
+            # Connessioni persistenti tra le richieste (0 = una per richiesta),
+            # verificate prima del riuso
+            "CONN_MAX_AGE": config("CONN_MAX_AGE", default=600, cast=int),
+            "CONN_HEALTH_CHECKS": True,
         }
+    }
+    # Copia del database usata come replica (solo per provare il router in
+    # locale: python manage.py controlla_router)
+    if config("SQLITE_REPLICA_PATH", default=""):
+        DATABASES["replica"] = {
+            **DATABASES["default"],
+            "NAME": Path(config("SQLITE_REPLICA_PATH")),
+            "TEST": {"MIRROR": "default"},
+        }
+
+# Letture delle pagine pubbliche sulle repliche, tutto il resto sul primario
+# (parco_verismo/router_database.py e ReplicaMiddleware). Dopo una POST il
+# browser legge dal primario per REPLICA_PRIMARIO_SECONDI (cookie
+# leggi_primario), così chi ha appena salvato vede subito le modifiche.
+DATABASE_ROUTERS = ["parco_verismo.router_database.RouterReplica"]
+DATABASE_REPLICHE = [alias for alias in DATABASES if alias != "default"]
+REPLICA_PRIMARIO_SECONDI = config("REPLICA_PRIMARIO_SECONDI", default=10, cast=int)
+REPLICA_PERCORSI_ESCLUSI = ("/admin/", "/richieste/", "/health/", "/metrics")
 
 
 # Cache Configuration (required for rate limiting middleware)
@@ -224,9 +313,85 @@ STATICFILES_DIRS = [
     BASE_DIR / "parco_verismo" / "static",
 ]
 
-# Whitenoise configuration for development (ensures consistent behavior including Range requests)
-WHITENOISE_USE_FINDERS = True
-WHITENOISE_AUTOREFRESH = True
+# CSS purgato e CSS critico per pagina generati da "manage.py estrai_css_pagine"
+# (da eseguire prima di collectstatic); pubblicati sotto STATIC_URL/pagine/
+CSS_PAGINE_ROOT = Path(config("CSS_PAGINE_ROOT", default=str(BASE_DIR / "build" / "css_pagine")))
+if CSS_PAGINE_ROOT.is_dir():
+    STATICFILES_DIRS.append(("pagine", CSS_PAGINE_ROOT))
+
+# HTML delle pagine statiche generato da "manage.py prerender" (dopo
+# collectstatic) e servito direttamente da nginx con try_files
+PRERENDER_ROOT = Path(config("PRERENDER_ROOT", default=str(BASE_DIR / "build" / "prerender")))
+
+# Pipeline dei file statici: bundle CSS/JS, nomi con hash del contenuto e
+# copie precompresse .gz/.br generate da collectstatic (parco_verismo/storage.py).
+# Attiva di default in produzione; richiede collectstatic prima dell'avvio.
+STATIC_PIPELINE = config("STATIC_PIPELINE", default=not DEBUG, cast=bool)
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "parco_verismo.storage.BundleManifestStaticFilesStorage"
+            if STATIC_PIPELINE
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        ),
+    },
+}
+
+# Bundle caricati da base.html (percorso del bundle -> sorgenti, in ordine)
+STATIC_BUNDLES = {
+    "bundles/base.css": [
+        "css/bootstrap.min.css",
+        "fonts/perandory/perandory.css",
+        "fonts/tex-gyre-termes/tex-gyre-termes.css",
+        "fonts/bootstrap-icons/bootstrap-icons.min.css",
+        "css/styles.css",
+        "css/index.css",
+        "css/navbar.css",
+        "css/footer.css",
+        "css/fonts.css",
+        "css/cookie_banner.css",
+        "css/aos.css",
+    ],
+    "bundles/base.js": [
+        "js/bootstrap.bundle.min.js",
+        "js/cookie_banner.js",
+        "js/offline-pack.js",
+        "js/aos.js",
+    ],
+}
+
+# Video di sfondo della homepage: sorgente e cartella delle varianti generate
+# da "manage.py transcodifica_video" (percorsi relativi ai file statici)
+VIDEO_HERO_SORGENTE = "assets/video/videobg.mp4"
+VIDEO_HERO_CARTELLA = "assets/video/hero"
+
+# Classi e id da non eliminare mai dal CSS per pagina (regex): elementi creati
+# a runtime da librerie esterne che non compaiono nell'HTML renderizzato
+CSS_PURGE_SAFELIST = [
+    r"^aos-",
+    r"^leaflet-",
+    r"^modal",
+    r"^tooltip",
+    r"^popover",
+    r"^toast",
+    r"^dropdown",
+    r"^offcanvas",
+    r"^carousel",
+    r"^collaps",
+    r"^alert",  # messaggi del modulo di contatto (caricati da /api/messaggi/)
+    r"^btn-close$",
+    r"^(show|showing|hiding|fade|active|disabled)$",
+]
+
+# Whitenoise: finders e autorefresh solo in sviluppo; in produzione serve
+# i file di STATIC_ROOT con le copie precompresse e cache "immutable"
+# per i nomi con hash
+WHITENOISE_USE_FINDERS = DEBUG
+WHITENOISE_AUTOREFRESH = DEBUG
 
 # Media files (User uploads) - Organizzati per tipo
 MEDIA_URL = config("MEDIA_URL", default="/media/")
@@ -248,6 +413,126 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # In produzione, imposta la variabile d'ambiente GA_MEASUREMENT_ID
 GA_MEASUREMENT_ID = config("GA_MEASUREMENT_ID", default="")
 
+# =============================================================================
+# MAP TILE CACHE
+# =============================================================================
+# Le mappe Leaflet caricano le tile da /tiles/{z}/{x}/{y}.png: Django le
+# scarica una sola volta dall'origine e le conserva su disco (LRU).
+# Per i test si può puntare TILE_ORIGIN_URL a un server locale.
+TILE_ORIGIN_URL = config(
+    "TILE_ORIGIN_URL", default="https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+)
+TILE_CACHE_ROOT = config("TILE_CACHE_ROOT", default=str(BASE_DIR / "tile_cache"))
+TILE_CACHE_MAX_BYTES = config("TILE_CACHE_MAX_MB", default=512, cast=int) * 1024 * 1024
+TILE_CACHE_MAX_AGE = config("TILE_CACHE_MAX_AGE", default=60 * 60 * 24 * 30, cast=int)  # 30 giorni
+TILE_ORIGIN_TIMEOUT = config("TILE_ORIGIN_TIMEOUT", default=10, cast=int)
+# Area del parco (lat_min,lng_min,lat_max,lng_max) e zoom per cui si
+# scaricano tile dall'origine: fuori da qui /tiles/ risponde 404
+_TILE_AREA = config("TILE_AREA", default="36.6,13.8,38.4,15.7", cast=Csv(cast=float))
+TILE_AREA = [_TILE_AREA[:2], _TILE_AREA[2:]]
+TILE_MIN_ZOOM = config("TILE_MIN_ZOOM", default=6, cast=int)
+TILE_MAX_ZOOM = 19
+TILE_USER_AGENT = "ParcoVerismoTileCache/1.0 (+https://parcovergacapuana.it)"
+
+# Pacchetti offline degli itinerari (service worker): zoom e limite delle tile
+OFFLINE_TILE_ZOOM = (13, 16)
+OFFLINE_MAX_TILE = 400
+
+# =============================================================================
+# SITEMAP
+# =============================================================================
+# L'XML di ogni shard (sezione + lingua) resta in cache fino al prossimo
+# salvataggio di un contenuto della sezione. Con LocMemCache l'invalidazione
+# vale solo per il worker che ha salvato: gli altri si allineano al timeout.
+SITEMAP_CACHE_TIMEOUT = config("SITEMAP_CACHE_TIMEOUT", default=60 * 60, cast=int)  # 1 ora
+
+# =============================================================================
+# PAGINE CONDIVISE (HTML uguale per tutti i visitatori)
+# =============================================================================
+# Home e contatti vengono renderizzate senza cookie (token CSRF e messaggi
+# arrivano da /api/csrf/ e /api/messaggi/) e salvate nella cache di Django;
+# il browser le riusa per PAGINE_CONDIVISE_MAX_AGE secondi.
+PAGINE_CONDIVISE_TIMEOUT = config("PAGINE_CONDIVISE_TIMEOUT", default=60 * 5, cast=int)
+PAGINE_CONDIVISE_MAX_AGE = config("PAGINE_CONDIVISE_MAX_AGE", default=60, cast=int)
+
+# Frammenti comuni a tutte le pagine (navbar, footer, banner dei cookie) in
+# cache per lingua e versione del build ({% frammento %}); 0 = disattivata
+FRAMMENTI_CACHE_TIMEOUT = config("FRAMMENTI_CACHE_TIMEOUT", default=0 if DEBUG else 60 * 60, cast=int)
+
+# =============================================================================
+# MICRO-CACHE NGINX
+# =============================================================================
+# Durata (secondi) delle risposte anonime nella cache di nginx (0 = disattiva).
+# Quando un contenuto cambia, Django rigenera le pagine coinvolte chiedendole
+# al server interno di nginx (MICRO_CACHE_REFRESH_URL, vuoto = nessun nginx).
+MICRO_CACHE_TIMEOUT = config("MICRO_CACHE_TIMEOUT", default=60, cast=int)
+MICRO_CACHE_REFRESH_URL = config("MICRO_CACHE_REFRESH_URL", default="")
+MICRO_CACHE_REFRESH_TIMEOUT = config("MICRO_CACHE_REFRESH_TIMEOUT", default=10, cast=int)
+MICRO_CACHE_HOST = config(
+    "MICRO_CACHE_HOST",
+    default=next((h.lstrip(".") for h in ALLOWED_HOSTS if h != "*"), "localhost"),
+)
+MICRO_CACHE_PERCORSI_ESCLUSI = ("/admin/", "/richieste/", "/api/", "/i18n/", "/health/", "/metrics")
+
+# =============================================================================
+# SERVER-TIMING E RICHIESTE LENTE
+# =============================================================================
+# ServerTimingMiddleware misura query SQL, rendering dei template e cache di
+# ogni richiesta. L'header Server-Timing arriva sempre allo staff e a una
+# frazione delle altre richieste (0 = nessuna, 1 = tutte); le richieste oltre
+# RICHIESTE_LENTE_MS millisecondi (0 = nessun log) vengono registrate come
+# JSON sul logger parco_verismo.prestazioni con le query più lente.
+SERVER_TIMING_CAMPIONE = config("SERVER_TIMING_CAMPIONE", default=0.0, cast=float)
+RICHIESTE_LENTE_MS = config("RICHIESTE_LENTE_MS", default=500, cast=int)
+RICHIESTE_LENTE_SQL = config("RICHIESTE_LENTE_SQL", default=5, cast=int)
+
+# =============================================================================
+# METRICHE PROMETHEUS
+# =============================================================================
+# Ogni worker di Gunicorn scrive le sue metriche (al massimo ogni
+# METRICHE_INTERVALLO secondi) in un file in METRICHE_DIR; /metrics le somma.
+# La cartella deve essere condivisa dai worker e locale al container.
+# Senza METRICHE_TOKEN /metrics è visibile solo allo staff.
+METRICHE_DIR = config("METRICHE_DIR", default=str(Path(tempfile.gettempdir()) / "parco_verismo_metriche"))
+METRICHE_INTERVALLO = config("METRICHE_INTERVALLO", default=5, cast=int)
+METRICHE_TOKEN = config("METRICHE_TOKEN", default="")
+
+# =============================================================================
+# PROFILI DELLE RICHIESTE
+# =============================================================================
+# Lo staff può profilare una richiesta con ?profila=1 (o X-Profila: 1):
+# profilo cProfile e log SQL finiscono in PROFILI_DIR, che tiene solo gli
+# ultimi PROFILI_MAX. Si scaricano da /richieste/profili/.
+PROFILI_DIR = config("PROFILI_DIR", default=str(BASE_DIR / "build" / "profili"))
+PROFILI_MAX = config("PROFILI_MAX", default=50, cast=int)
+
+# =============================================================================
+# HEALTH CHECK
+# =============================================================================
+# /health/ e /health/live/ dicono solo che il processo risponde;
+# /health/ready/ controlla database, migrazioni, cache e volume media (con
+# almeno SALUTE_SPAZIO_MINIMO_MB liberi) e tiene il risultato in memoria per
+# SALUTE_CACHE_SECONDI. Con SQLite prova anche a prendere il lock di
+# scrittura, aspettando al massimo SALUTE_LOCK_DB_SECONDI.
+SALUTE_CACHE_SECONDI = config("SALUTE_CACHE_SECONDI", default=5, cast=float)
+SALUTE_SPAZIO_MINIMO_MB = config("SALUTE_SPAZIO_MINIMO_MB", default=100, cast=int)
+SALUTE_LOCK_DB_SECONDI = config("SALUTE_LOCK_DB_SECONDI", default=1, cast=float)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        # Una riga JSON per evento (facile da filtrare con jq)
+        "json": {"format": "%(message)s"},
+    },
+    "handlers": {
+        "prestazioni": {"class": "logging.StreamHandler", "formatter": "json"},
+    },
+    "loggers": {
+        "parco_verismo.prestazioni": {"handlers": ["prestazioni"], "level": "INFO", "propagate": False},
+    },
+}
+
 # =============================================================================
 # EMAIL CONFIGURATION
 # =============================================================================
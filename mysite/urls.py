@@ -20,42 +20,31 @@ from django.conf import settings
 from django.conf.urls.i18n import i18n_patterns
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.contrib.sitemaps.views import sitemap
 from django.urls import path, include
-from django.http import HttpResponse
 
 # Local imports
-
-from parco_verismo.sitemaps import (
-    StaticViewSitemap,
-    OperaSitemap,
-    AutoreSitemap,
-    EventoSitemap,
-    NotiziaSitemap,
-    DocumentoSitemap,
-    ItinerarioSitemap,
-)
 # Custom admin site for public richieste dashboard
 from parco_verismo.admin_richieste import richieste_admin_site
-
-# Configurazione Sitemap per SEO
-sitemaps = {
-    "static": StaticViewSitemap,
-    "opere": OperaSitemap,
-    "autori": AutoreSitemap,
-    "eventi": EventoSitemap,
-    "notizie": NotiziaSitemap,
-    "documenti": DocumentoSitemap,
-    "itinerari": ItinerarioSitemap,
-}
-
-# Health check endpoint per Docker
-def health_check(request):
-    return HttpResponse("ok", content_type="text/plain")
+from parco_verismo.views import (
+    tile_view,
+    service_worker_view,
+    favicon_view,
+    robots_txt_view,
+    sitemap_index_view,
+    sitemap_sezione_view,
+    health_check_view,
+    readiness_view,
+    metriche_view,
+)
 
 urlpatterns = [
     path("i18n/", include("django.conf.urls.i18n")),
-    path("health/", health_check, name="health_check"),
+    # Health check: liveness (processo vivo) e readiness (dipendenze)
+    path("health/", health_check_view, name="health_check"),
+    path("health/live/", health_check_view, name="health_live"),
+    path("health/ready/", readiness_view, name="health_ready"),
+    # Metriche Prometheus (staff o METRICHE_TOKEN)
+    path("metrics", metriche_view, name="metriche"),
 ]
 
 # URL con prefisso lingua (it/en)
@@ -69,15 +58,16 @@ urlpatterns += [
     path("admin/", admin.site.urls),
     # Dashboard per la gestione delle richieste (admin semplificato)
     path("richieste/", richieste_admin_site.urls),
-    path(
-        "sitemap.xml",
-        sitemap,
-        {"sitemaps": sitemaps},
-        name="django.contrib.sitemaps.views.sitemap",
-    ),
-    # Root-level SEO files
-    path("favicon.ico", lambda r: HttpResponse(open(settings.BASE_DIR / "parco_verismo/static/assets/img/favicon.ico", "rb").read(), content_type="image/x-icon")),
-    path("robots.txt", lambda r: HttpResponse(open(settings.BASE_DIR / "parco_verismo/static/robots.txt", "r").read(), content_type="text/plain")),
+    # Sitemap per SEO: indice + uno shard per sezione e lingua (in cache)
+    path("sitemap.xml", sitemap_index_view, name="sitemap"),
+    path("sitemap-<slug:section>.xml", sitemap_sezione_view, name="sitemap_sezione"),
+    # Proxy con cache locale per le tile delle mappe Leaflet
+    path("tiles/<int:z>/<int:x>/<int:y>.png", tile_view, name="map_tile"),
+    # Service worker (deve stare alla radice per controllare tutto il sito)
+    path("sw.js", service_worker_view, name="service_worker"),
+    # Root-level SEO files (serviti dalla memoria con ETag)
+    path("favicon.ico", favicon_view, name="favicon"),
+    path("robots.txt", robots_txt_view, name="robots_txt"),
 ]
 
 # Serve media files in development
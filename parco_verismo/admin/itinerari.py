@@ -189,7 +189,8 @@ class ItinerarioAdmin(TranslatableAdmin):
                 html += f'<li><em>... e altre {len(tappe) - 5} tappe</em></li>'
             
             html += '</ul>'
-            html += f'<p><strong>🎯 Centro mappa:</strong> <code style="background: #e8e8e8; padding: 2px 5px; border-radius: 3px;">{obj.get_centro_mappa()}</code></p>'
+            html += f'<p><strong>🎯 Centro mappa:</strong> <code style="background: #e8e8e8; padding: 2px 5px; border-radius: 3px;">{obj.centro_mappa}</code></p>'
+            html += f'<p><strong>📏 Lunghezza stimata:</strong> {obj.lunghezza_km} km · {obj.durata_minuti} min a piedi</p>'
             html += '</div>'
             
             return format_html(html)
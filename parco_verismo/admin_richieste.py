@@ -7,11 +7,13 @@ from datetime import timedelta
 
 # Django imports
 from django.contrib import admin
+from django.http import FileResponse, Http404
 from django.shortcuts import render
 from django.urls import path
 
 # Local imports
 from .models import Richiesta
+from .services.profili_service import TIPI_FILE, elenca_profili, file_profilo
 
 
 class RichiesteAdminSite(admin.AdminSite):
@@ -35,6 +37,16 @@ class RichiesteAdminSite(admin.AdminSite):
                 self.admin_view(self.dashboard_view),
                 name="richieste_dashboard",
             ),
+            path(
+                "profili/",
+                self.admin_view(self.profili_view),
+                name="profili",
+            ),
+            path(
+                "profili/<str:nome>.<str:tipo>",
+                self.admin_view(self.scarica_profilo_view),
+                name="scarica_profilo",
+            ),
         ]
         return custom_urls + urls
 
@@ -98,6 +110,28 @@ class RichiesteAdminSite(admin.AdminSite):
 
         return render(request, "admin/richieste_dashboard.html", context)
 
+    def profili_view(self, request):
+        """Elenco dei profili delle richieste (ProfilerMiddleware)"""
+        context = {
+            **self.each_context(request),
+            "title": "Profili delle richieste",
+            "profili": elenca_profili(),
+            "tipi": list(TIPI_FILE),
+        }
+        return render(request, "admin/profili.html", context)
+
+    def scarica_profilo_view(self, request, nome, tipo):
+        """Scarica un file di un profilo (.prof, .txt o .json)"""
+        percorso = file_profilo(nome, tipo)
+        if percorso is None:
+            raise Http404
+        return FileResponse(
+            open(percorso, "rb"),
+            as_attachment=tipo == "prof",
+            filename=percorso.name,
+            content_type=TIPI_FILE[tipo],
+        )
+
 
 # Istanza del custom admin site
 richieste_admin_site = RichiesteAdminSite(name="richieste_admin")
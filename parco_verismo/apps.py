@@ -5,3 +5,8 @@ class ParcoVerismoConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "parco_verismo"
     verbose_name = "Parco Letterario Giovanni Verga e Luigi Capuana"
+
+    def ready(self):
+        from .signals import collega_signal
+
+        collega_signal()
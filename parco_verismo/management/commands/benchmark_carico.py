@@ -0,0 +1,386 @@
+"""
+Comando Django per il test di carico HTTP del sito.
+
+Senza --url avvia Gunicorn (come nel Dockerfile) su un database SQLite
+separato con i contenuti sintetici di genera_dati_sintetici (creato al primo
+avvio, riusato poi: così release diverse vengono misurate sugli stessi dati).
+Con --url misura un server già avviato (es. lo stack docker compose).
+
+Un numero fisso di visitatori in parallelo (client HTTP asincrono,
+services/carico_service.py) richiede un mix pesato di rotte: home, ricerca
+in biblioteca, elenchi, itinerari, pagine di dettaglio (prese dalla
+sitemap), sitemap e invio del modulo di contatto. Per ogni rotta vengono
+riportati throughput e latenza p50/p95/p99 in JSON e in Markdown; con
+--confronta il rapporto viene confrontato con quello di una release
+precedente e il comando esce con errore se una rotta regredisce.
+
+Le richieste del modulo di contatto creano Richieste con email
+@sintetico.invalid (rimosse da genera_dati_sintetici --elimina).
+
+Uso:
+    python manage.py benchmark_carico
+    python manage.py benchmark_carico --concorrenza 50 --durata 60 --peso home=0 --peso contatti_invio=5
+    python manage.py benchmark_carico --confronta build/benchmark/carico-20260101-120000.json
+    python manage.py benchmark_carico --url http://127.0.0.1:8000
+    python manage.py benchmark_carico --risultati nuovo.json --confronta vecchio.json   # solo confronto
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import Resolver404, resolve, reverse
+from django.utils import translation
+
+from parco_verismo.services.carico_service import (
+    ClientHTTP,
+    confronta,
+    esegui_carico,
+    rapporto_json,
+    rapporto_markdown,
+    statistiche,
+)
+from parco_verismo.services.dati_sintetici_service import DOMINIO_EMAIL, PAROLE
+
+CARTELLA_BENCHMARK = Path(settings.BASE_DIR) / "build" / "benchmark"
+
+# Peso di ogni rotta nel mix (modificabile con --peso rotta=N, 0 = esclusa)
+PESI = {
+    "home": 20,
+    "biblioteca": 4,
+    "biblioteca_ricerca": 6,
+    "eventi": 8,
+    "calendario": 2,
+    "notizie": 8,
+    "documenti": 4,
+    "itinerari_verghiani": 3,
+    "itinerari_capuaniani": 2,
+    "itinerari_tematici": 2,
+    "opera_detail": 8,
+    "evento_detail": 8,
+    "notizia_detail": 10,
+    "documento_detail": 4,
+    "itinerario_detail": 6,
+    "sitemap": 1,
+    "contatti_invio": 1,
+}
+
+# Rotte di dettaglio: URL presi dalla sitemap del server
+ROTTE_DETTAGLIO = ("opera_detail", "evento_detail", "notizia_detail", "documento_detail", "itinerario_detail")
+
+# Variazione percentuale tollerata nel confronto tra release
+SOGLIA = 10
+
+PORTA = 8765
+WORKERS = 3
+
+
+class Command(BaseCommand):
+    help = "Test di carico HTTP (Gunicorn + dati sintetici): throughput e latenze per rotta, confronto tra release"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="Server già avviato da misurare (default avvia Gunicorn)")
+        parser.add_argument("--concorrenza", type=int, default=20, help="Visitatori in parallelo (default 20)")
+        parser.add_argument("--durata", type=int, default=30, help="Secondi di misura (default 30)")
+        parser.add_argument(
+            "--riscaldamento", type=int, default=5, help="Secondi iniziali esclusi dalla misura (default 5)"
+        )
+        parser.add_argument(
+            "--peso",
+            action="append",
+            default=[],
+            metavar="ROTTA=N",
+            help=f"Peso di una rotta nel mix (ripetibile; rotte: {', '.join(PESI)})",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seme della sequenza di richieste (default 0)")
+        parser.add_argument(
+            "--output", default=str(CARTELLA_BENCHMARK), help="Cartella dei rapporti (default build/benchmark)"
+        )
+        parser.add_argument("--confronta", help="Rapporto JSON della release precedente")
+        parser.add_argument("--risultati", help="Rapporto JSON da confrontare invece di eseguire il test")
+        parser.add_argument(
+            "--soglia", type=float, default=SOGLIA, help=f"Regressione tollerata in percentuale (default {SOGLIA})"
+        )
+        gunicorn = parser.add_argument_group("Gunicorn (senza --url)")
+        gunicorn.add_argument("--workers", type=int, default=WORKERS, help=f"Worker (default {WORKERS})")
+        gunicorn.add_argument("--porta", type=int, default=PORTA, help=f"Porta locale (default {PORTA})")
+        gunicorn.add_argument(
+            "--database",
+            default=str(CARTELLA_BENCHMARK / "db.sqlite3"),
+            help="Database SQLite dei dati sintetici (default build/benchmark/db.sqlite3)",
+        )
+        gunicorn.add_argument("--rigenera", action="store_true", help="Ricrea il database dei dati sintetici")
+
+    def handle(self, *args, **options):
+        precedente = self._leggi(options["confronta"]) if options["confronta"] else None
+        cartella = Path(options["output"])
+
+        if options["risultati"]:
+            if precedente is None:
+                raise CommandError("--risultati richiede --confronta")
+            rapporto = self._leggi(options["risultati"])
+            file_base = Path(options["risultati"]).with_suffix("")
+        else:
+            rapporto = self._esegui(options)
+            cartella.mkdir(parents=True, exist_ok=True)
+            file_base = cartella / f"carico-{datetime.now():%Y%m%d-%H%M%S}"
+
+        confronto = None
+        if precedente is not None:
+            confronto = confronta(precedente, rapporto, options["soglia"])
+            rapporto["confrontato_con"] = precedente["esecuzione"]["data"]
+
+        markdown = rapporto_markdown(rapporto, confronto, options["soglia"])
+        file_base.with_suffix(".json").write_text(rapporto_json(rapporto), encoding="utf-8")
+        file_base.with_suffix(".md").write_text(markdown, encoding="utf-8")
+        self.stdout.write(markdown)
+        self.stdout.write(self.style.SUCCESS(f"✓ Rapporto scritto in {file_base}.json e {file_base}.md"))
+
+        regressioni = [riga["rotta"] for riga in confronto or () if riga["regressione"]]
+        if regressioni:
+            raise CommandError(f"Regressione oltre il {options['soglia']}%: {', '.join(regressioni)}")
+
+    def _leggi(self, percorso):
+        try:
+            return json.loads(Path(percorso).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Rapporto non leggibile: {percorso} ({exc})")
+
+    def _esegui(self, options):
+        pesi = dict(PESI)
+        for voce in options["peso"]:
+            rotta, _, valore = voce.partition("=")
+            if rotta not in PESI or not valore.isdigit():
+                raise CommandError(f"--peso non valido: {voce} (rotte: {', '.join(PESI)})")
+            pesi[rotta] = int(valore)
+
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        server = None
+        base_url = options["url"]
+        if not base_url:
+            server = self._avvia_gunicorn(options)
+            base_url = f"http://127.0.0.1:{options['porta']}"
+        try:
+            self._attendi(base_url, host)
+            stato, _, _ = self._get(base_url, host, reverse("home"))
+            if stato != 200:
+                raise CommandError(f"La home risponde {stato} (file statici raccolti? vedi gunicorn.log)")
+            rotte = self._rotte(base_url, host, pesi)
+            self.stdout.write(
+                f"Test di carico su {base_url}: {options['concorrenza']} visitatori, "
+                f"{options['durata']}s (+{options['riscaldamento']}s di riscaldamento)..."
+            )
+            campioni, secondi = esegui_carico(
+                base_url,
+                host,
+                rotte,
+                concorrenza=max(options["concorrenza"], 1),
+                durata=max(options["durata"], 1),
+                riscaldamento=max(options["riscaldamento"], 0),
+                seed=options["seed"],
+                prepara=self._prepara if pesi["contatti_invio"] else None,
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+                self._log.close()
+
+        if not campioni:
+            raise CommandError("Nessuna richiesta completata")
+        return {
+            "esecuzione": {
+                "data": datetime.now().isoformat(timespec="seconds"),
+                "server": "gunicorn" if server is not None else base_url,
+                "workers": options["workers"] if server is not None else None,
+                "versione": self._versione(),
+                "concorrenza": options["concorrenza"],
+                "durata": options["durata"],
+                "riscaldamento": options["riscaldamento"],
+                "seed": options["seed"],
+                "pesi": {rotta: peso for rotta, peso in pesi.items() if peso},
+            },
+            "rotte": statistiche(campioni, secondi),
+        }
+
+    def _avvia_gunicorn(self, options):
+        """Avvia Gunicorn sul database dei dati sintetici (creato se manca)."""
+        env = {
+            **os.environ,
+            **self._ambiente(options),
+            # Niente email vere né aggiornamenti della micro-cache di nginx
+            "EMAIL_BACKEND": "django.core.mail.backends.locmem.EmailBackend",
+            "MICRO_CACHE_REFRESH_URL": "",
+        }
+        self._prepara_database(options, env, [sys.executable, str(Path(settings.BASE_DIR) / "manage.py")])
+
+        cartella = Path(options["output"])
+        cartella.mkdir(parents=True, exist_ok=True)
+        self._log = open(cartella / "gunicorn.log", "ab")
+        return subprocess.Popen(
+            [
+                sys.executable, "-m", "gunicorn",
+                "--bind", f"127.0.0.1:{options['porta']}",
+                "--workers", str(options["workers"]),
+                "--timeout", "120",
+                "mysite.wsgi:application",
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=self._log,
+            stderr=self._log,
+        )
+
+    def _ambiente(self, options):
+        """Variabili d'ambiente del database per Gunicorn e i comandi di preparazione."""
+        if "sqlite" not in settings.DATABASES["default"]["ENGINE"]:
+            raise CommandError("Il database del benchmark è SQLite: con un altro database usa --url")
+        return {"SQLITE_PATH": str(Path(options["database"]).resolve())}
+
+    def _prepara_database(self, options, env, manage):
+        """Crea il database SQLite dei dati sintetici se manca (o con --rigenera)."""
+        database = Path(env["SQLITE_PATH"])
+        if options["rigenera"] and database.exists():
+            database.unlink()
+        if not database.exists():
+            database.parent.mkdir(parents=True, exist_ok=True)
+            self.stdout.write(f"Creazione del database dei dati sintetici in {database}...")
+            for comando in (["migrate", "--noinput"], ["genera_dati_sintetici", "--forza"]):
+                try:
+                    subprocess.run(manage + comando + ["--verbosity", "0"], env=env, check=True)
+                except subprocess.CalledProcessError:
+                    database.unlink(missing_ok=True)
+                    raise CommandError(f"{comando[0]} non riuscito sul database del benchmark")
+
+    def _attendi(self, base_url, host, secondi=60):
+        """Attende che il server risponda all'health check."""
+        percorso = reverse("health_check")
+        limite = time.monotonic() + secondi
+        while time.monotonic() < limite:
+            try:
+                stato, _, _ = self._get(base_url, host, percorso)
+                if stato == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.5)
+        raise CommandError(f"Il server {base_url} non risponde su {percorso}")
+
+    def _get(self, base_url, host, percorso):
+        async def richiesta():
+            client = ClientHTTP(base_url, host, "10.255.255.254")
+            try:
+                return await client.richiesta("GET", percorso)
+            finally:
+                await client.chiudi()
+
+        return asyncio.run(richiesta())
+
+    def _rotte(self, base_url, host, pesi):
+        """Rotte del mix con i loro URL (in tutte le lingue)."""
+        lingue = [codice for codice, _ in settings.LANGUAGES]
+
+        def percorsi(nome):
+            percorsi = []
+            for codice in lingue:
+                with translation.override(codice):
+                    percorsi.append(reverse(nome))
+            return percorsi
+
+        def get(lista, query=None):
+            def richiesta(rnd, client):
+                percorso = rnd.choice(lista)
+                if query is not None:
+                    percorso += query(rnd)
+                return "GET", percorso, None, None
+
+            return richiesta
+
+        richieste = {
+            "biblioteca_ricerca": get(percorsi("biblioteca"), lambda rnd: f"?q={rnd.choice(PAROLE)}"),
+            "sitemap": get([reverse("sitemap")]),
+            "contatti_invio": self._invio_contatti(percorsi("contatti")),
+        }
+        dettagli = self._dettagli_dalla_sitemap(base_url, host)
+        for nome in ROTTE_DETTAGLIO:
+            if pesi[nome] and not dettagli.get(nome):
+                self.stdout.write(self.style.WARNING(f"⚠ {nome}: nessun URL nella sitemap, esclusa"))
+                continue
+            richieste[nome] = get(dettagli.get(nome, []))
+
+        return [
+            {"nome": nome, "peso": peso, "richiesta": richieste.get(nome) or get(percorsi(nome))}
+            for nome, peso in pesi.items()
+            if peso and (nome in richieste or nome not in ROTTE_DETTAGLIO)
+        ]
+
+    def _dettagli_dalla_sitemap(self, base_url, host):
+        """URL delle pagine di dettaglio per nome di rotta, letti dalla sitemap del server."""
+        namespace = {"s": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+        def loc(percorso):
+            stato, _, contenuto = self._get(base_url, host, percorso)
+            if stato != 200:
+                raise CommandError(f"{percorso}: risposta {stato}")
+            return [urlsplit(el.text.strip()).path for el in ET.fromstring(contenuto).iterfind(".//s:loc", namespace)]
+
+        lingue = {codice for codice, _ in settings.LANGUAGES}
+        dettagli = {}
+        for sezione in loc(reverse("sitemap")):
+            for percorso in loc(sezione):
+                # Il prefisso di lingua viene riconosciuto solo con la lingua attiva
+                lingua = percorso.split("/")[1]
+                try:
+                    with translation.override(lingua if lingua in lingue else settings.LANGUAGE_CODE):
+                        nome = resolve(percorso).url_name
+                except Resolver404:
+                    continue
+                dettagli.setdefault(nome, []).append(percorso)
+        return dettagli
+
+    def _invio_contatti(self, pagine):
+        def richiesta(rnd, client):
+            pagina = rnd.choice(pagine)
+            corpo = {
+                "nome": rnd.choice(("Mario", "Rosa", "Turi", "Nedda")),
+                "cognome": rnd.choice(("Rossi", "Verga", "Capuana")),
+                "email": f"carico{rnd.randrange(10**9)}@{DOMINIO_EMAIL}",
+                "oggetto": "Test di carico",
+                "messaggio": " ".join(rnd.choices(PAROLE, k=30)),
+            }
+            headers = {
+                "X-CSRFToken": client.cookie.get(settings.CSRF_COOKIE_NAME, ""),
+                "Referer": f"https://{client.host}{pagina}",
+            }
+            return "POST", pagina, corpo, headers
+
+        return richiesta
+
+    @staticmethod
+    async def _prepara(client):
+        """Ottiene il cookie CSRF per l'invio del modulo di contatto (non misurato)."""
+        await client.richiesta("GET", reverse("csrf_token"))
+
+    @staticmethod
+    def _versione():
+        """Commit git corrente (vuoto fuori da un repository)."""
+        try:
+            risultato = subprocess.run(
+                ["git", "describe", "--always", "--dirty"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+        return risultato.stdout.strip()
@@ -0,0 +1,124 @@
+"""
+Comando Django per misurare il tempo di rendering delle pagine con e senza
+la cache dei frammenti comuni (navbar, footer, banner dei cookie).
+
+Ogni pagina senza parametri di parco_verismo/urls.py viene richiesta più
+volte nelle due configurazioni (FRAMMENTI_CACHE_TIMEOUT a 0 e attivo);
+per ognuna viene riportata la mediana in millisecondi e il risparmio.
+La cache delle pagine condivise (home, contatti) è disattivata durante la
+misura, altrimenti l'HTML completo arriverebbe dalla cache in entrambi i casi.
+
+Uso:
+    python manage.py benchmark_frammenti
+    python manage.py benchmark_frammenti --ripetizioni 50 --pagina home --lingua en
+"""
+
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import URLPattern, reverse
+from django.utils import translation
+
+from parco_verismo import urls as parco_urls
+
+RIPETIZIONI = 20
+
+
+class Command(BaseCommand):
+    help = "Misura il risparmio della cache dei frammenti (navbar, footer, cookie banner) per pagina"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pagina",
+            action="append",
+            default=[],
+            help="Nome URL da misurare (ripetibile, default tutte le pagine senza parametri)",
+        )
+        parser.add_argument(
+            "--ripetizioni",
+            type=int,
+            default=RIPETIZIONI,
+            help=f"Richieste per pagina e configurazione (default {RIPETIZIONI})",
+        )
+        parser.add_argument(
+            "--lingua",
+            default=settings.LANGUAGE_CODE,
+            choices=[codice for codice, _ in settings.LANGUAGES],
+            help=f"Lingua delle pagine (default {settings.LANGUAGE_CODE})",
+        )
+
+    def handle(self, *args, **options):
+        pagine = self._pagine(options["pagina"])
+        if not pagine:
+            raise CommandError("Nessuna pagina da misurare")
+        ripetizioni = max(options["ripetizioni"], 1)
+        timeout = settings.FRAMMENTI_CACHE_TIMEOUT or 60 * 60
+
+        # Il rate limiting per IP bloccherebbe le richieste in sequenza
+        middleware = [m for m in settings.MIDDLEWARE if not m.endswith("SimpleRateLimitMiddleware")]
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+
+        self.stdout.write(f"{'Pagina':<32} {'senza':>9} {'con':>9} {'risparmio':>10}")
+        totale_senza = totale_con = 0.0
+        with override_settings(MIDDLEWARE=middleware, PAGINE_CONDIVISE_TIMEOUT=0):
+            client = Client(HTTP_HOST=host)
+            for nome in pagine:
+                with translation.override(options["lingua"]):
+                    url = reverse(nome)
+                with override_settings(FRAMMENTI_CACHE_TIMEOUT=0):
+                    senza = self._misura(client, url, ripetizioni)
+                with override_settings(FRAMMENTI_CACHE_TIMEOUT=timeout):
+                    cache.clear()
+                    con = self._misura(client, url, ripetizioni)
+                if senza is None or con is None:
+                    self.stdout.write(self.style.WARNING(f"⚠ {nome}: non è una pagina HTML, saltata"))
+                    continue
+
+                totale_senza += senza
+                totale_con += con
+                self.stdout.write(
+                    f"{nome:<32} {senza:>7.2f}ms {con:>7.2f}ms {self._risparmio(senza, con):>9.1f}%"
+                )
+
+        cache.clear()
+        if totale_senza:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✓ Totale: {totale_senza:.1f}ms → {totale_con:.1f}ms "
+                    f"({self._risparmio(totale_senza, totale_con):.1f}% in meno)"
+                )
+            )
+
+    def _pagine(self, filtro):
+        """Nomi URL delle pagine HTML senza parametri."""
+        pagine = []
+        for pattern in parco_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            if str(pattern.pattern).startswith("api/") or pattern.pattern.converters:
+                continue
+            if filtro and pattern.name not in filtro:
+                continue
+            pagine.append(pattern.name)
+        return pagine
+
+    def _misura(self, client, url, ripetizioni):
+        """Mediana in millisecondi di una richiesta (la prima, di riscaldamento, è esclusa)."""
+        risposta = client.get(url, secure=True)
+        if risposta.status_code != 200 or "text/html" not in risposta.get("Content-Type", ""):
+            return None
+        tempi = []
+        for _ in range(ripetizioni):
+            inizio = time.perf_counter()
+            client.get(url, secure=True)
+            tempi.append((time.perf_counter() - inizio) * 1000)
+        return statistics.median(tempi)
+
+    @staticmethod
+    def _risparmio(senza, con):
+        return (senza - con) / senza * 100 if senza else 0.0
@@ -0,0 +1,113 @@
+"""
+Comando Django che confronta richieste al secondo e latenze del sito su
+PostgreSQL senza pool (una connessione nuova per richiesta, CONN_MAX_AGE=0)
+e con il pool di connessioni di psycopg (DB_POOL).
+
+Usa lo stesso test di carico di benchmark_carico (Gunicorn avviato due
+volte con le sole variabili del database diverse) su un PostgreSQL locale
+di prova, mai su quello configurato per il sito, per esempio:
+
+    docker run -d --name parco-pg-benchmark -p 55432:5432 \\
+        -e POSTGRES_PASSWORD=benchmark -e POSTGRES_DB=parco_benchmark postgres:16-alpine
+
+Con --prepara il database viene migrato e riempito con i dati sintetici
+(da fare una volta sola). Il rapporto (JSON e Markdown) finisce in
+build/benchmark/pool-<data>.*.
+
+Uso:
+    python manage.py benchmark_pool --prepara
+    python manage.py benchmark_pool --concorrenza 50 --workers 4 --pool-max 8
+    python manage.py benchmark_pool --pg-porta 5432 --pg-utente parco_user --pg-password segreta
+"""
+
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import CommandError
+
+from parco_verismo.services.carico_service import confronta, rapporto_json, rapporto_markdown
+
+from .benchmark_carico import Command as BenchmarkCarico
+
+
+class Command(BenchmarkCarico):
+    help = "Confronta req/s e latenze su PostgreSQL senza e con il pool di connessioni di psycopg"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        postgres = parser.add_argument_group("PostgreSQL di prova")
+        postgres.add_argument("--pg-host", default="127.0.0.1", help="Host (default 127.0.0.1)")
+        postgres.add_argument("--pg-porta", default="55432", help="Porta (default 55432)")
+        postgres.add_argument("--pg-nome", default="parco_benchmark", help="Database (default parco_benchmark)")
+        postgres.add_argument("--pg-utente", default="postgres", help="Utente (default postgres)")
+        postgres.add_argument("--pg-password", default="benchmark", help="Password (default benchmark)")
+        postgres.add_argument(
+            "--pool-max", type=int, default=4, help="Connessioni massime del pool per worker (default 4)"
+        )
+        postgres.add_argument(
+            "--prepara", action="store_true", help="Esegue migrate e genera_dati_sintetici prima delle misure"
+        )
+
+    def handle(self, *args, **options):
+        if options["url"] or options["risultati"] or options["confronta"]:
+            raise CommandError("benchmark_pool avvia sempre Gunicorn: --url, --risultati e --confronta non si usano")
+
+        rapporti = {}
+        for pool in (False, True):
+            self._pool = pool
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{'Con' if pool else 'Senza'} pool di connessioni"))
+            rapporto = self._esegui(options)
+            rapporto["esecuzione"]["pool"] = pool
+            rapporti["con_pool" if pool else "senza_pool"] = rapporto
+            # Il database va preparato una volta sola
+            options["prepara"] = False
+
+        confronto = confronta(rapporti["senza_pool"], rapporti["con_pool"], options["soglia"])
+        rapporti["con_pool"]["confrontato_con"] = "la misura senza pool"
+        markdown = "\n".join(
+            (
+                rapporto_markdown(rapporti["senza_pool"]).replace("# Test di carico", "# Senza pool", 1),
+                rapporto_markdown(rapporti["con_pool"], confronto, options["soglia"]).replace(
+                    "# Test di carico", "# Con pool", 1
+                ),
+            )
+        )
+
+        cartella = Path(options["output"])
+        cartella.mkdir(parents=True, exist_ok=True)
+        file_base = cartella / f"pool-{datetime.now():%Y%m%d-%H%M%S}"
+        file_base.with_suffix(".json").write_text(rapporto_json(rapporti), encoding="utf-8")
+        file_base.with_suffix(".md").write_text(markdown, encoding="utf-8")
+        self.stdout.write(markdown)
+
+        totale = next((riga for riga in confronto if riga["rotta"] == "totale"), None)
+        if totale is not None:
+            stile = self.style.SUCCESS if totale["rps"] >= 0 else self.style.WARNING
+            self.stdout.write(stile(f"Con il pool: {totale['rps']:+.1f}% req/s, p95 {totale['p95_ms']:+.1f}%"))
+        self.stdout.write(self.style.SUCCESS(f"✓ Rapporto scritto in {file_base}.json e {file_base}.md"))
+
+    def _ambiente(self, options):
+        return {
+            "DB_ENGINE": "django.db.backends.postgresql",
+            "DB_HOST": options["pg_host"],
+            "DB_PORT": str(options["pg_porta"]),
+            "DB_NAME": options["pg_nome"],
+            "DB_USER": options["pg_utente"],
+            "DB_PASSWORD": options["pg_password"],
+            "DB_POOL": str(self._pool),
+            "DB_POOL_MAX_SIZE": str(options["pool_max"]),
+            "CONN_MAX_AGE": "0",
+            "DB_REPLICA_HOSTS": "",
+            "SQLITE_PATH": "",
+        }
+
+    def _prepara_database(self, options, env, manage):
+        if not options["prepara"]:
+            return
+        self.stdout.write(f"Preparazione del database {options['pg_nome']} su {options['pg_host']}...")
+        for comando in (["migrate", "--noinput"], ["genera_dati_sintetici", "--forza"]):
+            try:
+                subprocess.run(manage + comando + ["--verbosity", "0"], env=env, check=True)
+            except subprocess.CalledProcessError:
+                raise CommandError(f"{comando[0]} non riuscito sul PostgreSQL di prova")
@@ -0,0 +1,254 @@
+"""
+Comando Django per misurare le letture concorrenti su SQLite mentre l'admin
+scrive, con il journal di rollback (configurazione precedente) e con i
+pragma di settings.SQLITE_PRAGMA (WAL).
+
+Il database (default quello di benchmark_carico in build/benchmark/, se
+esiste, altrimenti quello del sito) viene copiato in una cartella
+temporanea per ogni configurazione: l'originale non viene mai modificato.
+Per ogni configurazione --lettori processi (come i worker di Gunicorn)
+eseguono per --durata secondi le query delle pagine pubbliche (notizie,
+eventi, biblioteca, documenti), prima da soli e poi con un processo che
+simula i salvataggi dell'admin: una transazione che modifica una notizia,
+crea una richiesta e cambia la priorità di --righe-scrittura richieste,
+tiene il lock per --attesa-scrittura ms e si ripete ogni --pausa-scrittura ms.
+
+Uso:
+    python manage.py benchmark_sqlite
+    python manage.py benchmark_sqlite --lettori 6 --durata 20 --attesa-scrittura 200
+    python manage.py benchmark_sqlite --database build/benchmark/db.sqlite3
+"""
+
+import multiprocessing
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+
+from parco_verismo.services.carico_service import percentile
+from parco_verismo.services.dati_sintetici_service import DOMINIO_EMAIL
+
+DATABASE_BENCHMARK = Path(settings.BASE_DIR) / "build" / "benchmark" / "db.sqlite3"
+
+
+def _configurazioni():
+    """Nome -> (pragma, transaction_mode); stesso busy_timeout per entrambe."""
+    pragma = getattr(settings, "SQLITE_PRAGMA", {})
+    busy_timeout = pragma.get("busy_timeout", 5000)
+    return {
+        "rollback": ({"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": busy_timeout}, None),
+        "wal": (pragma, connection.settings_dict["OPTIONS"].get("transaction_mode")),
+    }
+
+
+def _query_pubbliche(rnd):
+    from parco_verismo.models import Documento, Evento, Notizia, Opera
+    from parco_verismo.services import get_eventi_futuri, get_notizie_recenti, ricerca_opere
+
+    id_notizie = list(Notizia.objects.filter(is_active=True).values_list("id", flat=True)) or [0]
+    id_eventi = list(Evento.objects.filter(is_active=True).values_list("id", flat=True)) or [0]
+    return (
+        lambda: list(get_notizie_recenti(limit=10)),
+        lambda: list(get_eventi_futuri(limit=10)),
+        lambda: list(ricerca_opere("verga")[:20]),
+        lambda: list(Opera.objects.with_translations().select_related("autore")[:50]),
+        lambda: list(Documento.objects.with_translations().filter(is_active=True)[:20]),
+        lambda: list(Notizia.objects.with_translations().filter(pk=rnd.choice(id_notizie))),
+        lambda: list(Evento.objects.with_translations().filter(pk=rnd.choice(id_eventi))),
+    )
+
+
+def _lettore(fine, coda, seed):
+    rnd = random.Random(seed)
+    query = _query_pubbliche(rnd)
+    latenze, errori = [], 0
+    while time.monotonic() < fine:
+        inizio = time.perf_counter()
+        try:
+            rnd.choice(query)()
+        except OperationalError:
+            errori += 1
+            continue
+        latenze.append((time.perf_counter() - inizio) * 1000)
+    connections.close_all()
+    coda.put(("lettura", latenze, errori))
+
+
+def _scrittore(fine, coda, righe, attesa, pausa, seed):
+    from parco_verismo.models import Notizia, Richiesta
+    from parco_verismo.signals import signal_sospesi
+
+    rnd = random.Random(seed)
+    id_notizie = list(Notizia.objects.values_list("id", flat=True)[:1000])
+    id_richieste = list(Richiesta.objects.values_list("id", flat=True))
+    latenze, errori = [], 0
+    with signal_sospesi():
+        while time.monotonic() < fine:
+            inizio = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    if id_notizie:
+                        notizia = Notizia.objects.language("it").get(pk=rnd.choice(id_notizie))
+                        notizia.riassunto = f"Aggiornata {time.time():.3f}"
+                        notizia.save()
+                    Richiesta.objects.create(
+                        nome="Benchmark",
+                        cognome="SQLite",
+                        email=f"benchmark-sqlite@{DOMINIO_EMAIL}",
+                        messaggio="Scrittura simulata dell'admin",
+                    )
+                    if id_richieste and righe:
+                        # Azione in blocco sull'elenco delle richieste
+                        blocco = rnd.sample(id_richieste, min(righe, len(id_richieste)))
+                        Richiesta.objects.filter(pk__in=blocco).update(priorita=rnd.choice(("bassa", "media", "alta")))
+                    time.sleep(attesa)
+            except OperationalError:
+                errori += 1
+            else:
+                latenze.append((time.perf_counter() - inizio) * 1000)
+            time.sleep(pausa)
+    connections.close_all()
+    coda.put(("scrittura", latenze, errori))
+
+
+class Command(BaseCommand):
+    help = "Misura le letture concorrenti su SQLite durante le scritture dell'admin (rollback journal e WAL)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", help="File SQLite da copiare (default build/benchmark/db.sqlite3 o quello del sito)"
+        )
+        parser.add_argument("--lettori", type=int, default=3, help="Processi di lettura in parallelo (default 3)")
+        parser.add_argument("--durata", type=float, default=10, help="Secondi per ogni misura (default 10)")
+        parser.add_argument(
+            "--righe-scrittura",
+            type=int,
+            default=500,
+            help="Richieste modificate da ogni scrittura, come un'azione in blocco dell'admin (default 500)",
+        )
+        parser.add_argument(
+            "--attesa-scrittura",
+            type=float,
+            default=50,
+            help="Millisecondi in cui ogni scrittura tiene aperta la transazione (default 50)",
+        )
+        parser.add_argument(
+            "--pausa-scrittura", type=float, default=100, help="Millisecondi tra due scritture (default 100)"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Il database configurato non è SQLite")
+        if options["database"]:
+            sorgente = Path(options["database"])
+        elif DATABASE_BENCHMARK.exists():
+            sorgente = DATABASE_BENCHMARK
+        else:
+            sorgente = Path(connection.settings_dict["NAME"])
+        if not sorgente.is_file():
+            raise CommandError(f"Database non trovato: {sorgente}")
+
+        self.stdout.write(
+            f"Database {sorgente}, {options['lettori']} lettori, {options['durata']:g} s per misura, "
+            f"scritture di {options['righe_scrittura']} righe e {options['attesa_scrittura']:g} ms "
+            f"ogni {options['pausa_scrittura']:g} ms\n"
+        )
+        risultati = []
+        cartella = Path(tempfile.mkdtemp(prefix="benchmark-sqlite-"))
+        impostazioni = connection.settings_dict
+        originali = (impostazioni["NAME"], dict(impostazioni["OPTIONS"]))
+        try:
+            for nome, (pragma, transaction_mode) in _configurazioni().items():
+                copia = cartella / f"{nome}.sqlite3"
+                self._copia(sorgente, copia, pragma.get("journal_mode", "DELETE"))
+                connections.close_all()
+                impostazioni["NAME"] = copia
+                impostazioni["OPTIONS"] = {
+                    "init_command": ";".join(f"PRAGMA {chiave}={valore}" for chiave, valore in pragma.items()),
+                    "transaction_mode": transaction_mode,
+                }
+                for con_scritture in (False, True):
+                    risultati.append((nome, con_scritture, self._misura(options, con_scritture)))
+        finally:
+            connections.close_all()
+            impostazioni["NAME"], impostazioni["OPTIONS"] = originali
+            shutil.rmtree(cartella, ignore_errors=True)
+
+        self._stampa(risultati)
+
+    def _copia(self, sorgente, destinazione, journal_mode):
+        # backup() include anche le pagine ancora nel file -wal della sorgente
+        origine, copia = sqlite3.connect(sorgente), sqlite3.connect(destinazione)
+        try:
+            origine.backup(copia)
+            copia.execute(f"PRAGMA journal_mode={journal_mode}")
+        finally:
+            origine.close()
+            copia.close()
+
+    def _misura(self, options, con_scritture):
+        contesto = multiprocessing.get_context("fork")
+        coda = contesto.Queue()
+        fine = time.monotonic() + options["durata"]
+        processi = [
+            contesto.Process(target=_lettore, args=(fine, coda, indice)) for indice in range(options["lettori"])
+        ]
+        if con_scritture:
+            processi.append(
+                contesto.Process(
+                    target=_scrittore,
+                    args=(
+                        fine,
+                        coda,
+                        options["righe_scrittura"],
+                        options["attesa_scrittura"] / 1000,
+                        options["pausa_scrittura"] / 1000,
+                        0,
+                    ),
+                )
+            )
+        connections.close_all()  # i processi figli non devono ereditare la connessione
+        for processo in processi:
+            processo.start()
+        esiti = [coda.get() for _ in processi]
+        for processo in processi:
+            processo.join()
+
+        letture = sorted(ms for tipo, latenze, _ in esiti if tipo == "lettura" for ms in latenze)
+        scritture = sorted(ms for tipo, latenze, _ in esiti if tipo == "scrittura" for ms in latenze)
+        return {
+            "letture_s": len(letture) / options["durata"],
+            "p50": percentile(letture, 50),
+            "p95": percentile(letture, 95),
+            "p99": percentile(letture, 99),
+            "errori_lettura": sum(errori for tipo, _, errori in esiti if tipo == "lettura"),
+            "scritture_s": len(scritture) / options["durata"],
+            "p95_scrittura": percentile(scritture, 95),
+            "errori_scrittura": sum(errori for tipo, _, errori in esiti if tipo == "scrittura"),
+        }
+
+    def _stampa(self, risultati):
+        self.stdout.write(
+            f"{'configurazione':<16}{'scritture':>10}{'letture/s':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'err.':>6}{'scritt./s':>11}{'p95 scr.':>10}{'err.':>6}"
+        )
+        for nome, con_scritture, misura in risultati:
+            self.stdout.write(
+                f"{nome:<16}{'sì' if con_scritture else 'no':>10}{misura['letture_s']:>11.0f}"
+                f"{misura['p50']:>9.2f}{misura['p95']:>9.2f}{misura['p99']:>9.2f}{misura['errori_lettura']:>6}"
+                f"{misura['scritture_s']:>11.1f}{misura['p95_scrittura']:>10.1f}{misura['errori_scrittura']:>6}"
+            )
+
+        base = {con_scritture: misura for nome, con_scritture, misura in risultati if nome == "rollback"}
+        for nome, con_scritture, misura in risultati:
+            if nome != "rollback" and con_scritture and base[True]["letture_s"]:
+                variazione = (misura["letture_s"] / base[True]["letture_s"] - 1) * 100
+                self.stdout.write(
+                    self.style.SUCCESS(f"\n{nome}: letture durante le scritture {variazione:+.0f}% rispetto a rollback")
+                )
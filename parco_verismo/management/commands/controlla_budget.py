@@ -0,0 +1,265 @@
+"""
+Comando Django per controllare il budget di query e di dimensione di ogni URL.
+
+Crea un database di test (come il test runner di Django), lo riempie con
+contenuti sintetici (--scala oggetti per modello, services/dati_sintetici_service.py)
+e richiede ogni URL con nome di parco_verismo/urls.py in tutte le lingue,
+la sitemap (indice e shard) e i file alla radice del sito. Numero di query
+e dimensione della risposta vengono confrontati con i budget salvati in
+BUDGET_PRESTAZIONI; se un URL li supera il comando stampa la tabella delle
+differenze ed esce con errore.
+
+La cache viene svuotata prima di ogni richiesta (si misura il caso peggiore).
+Le impostazioni che cambiano la dimensione dell'HTML (pipeline dei file
+statici e CSS critico in linea, URL statici, Google Analytics) sono fissate
+in IMPOSTAZIONI_MISURA: le misure non dipendono dall'ambiente né dall'aver
+eseguito collectstatic o estrai_css_pagine. Il CSS critico ha un limite
+proprio (estrai_css_pagine --max-critico).
+Il numero di query di un elenco non deve crescere con i contenuti: un URL
+oltre il budget indica quasi sempre una query N+1.
+
+Uso:
+    python manage.py controlla_budget
+    python manage.py controlla_budget --aggiorna            # riscrive i budget
+    python manage.py controlla_budget --scala 100 --verbosity 2
+"""
+
+import json
+import math
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, reverse
+from django.utils import translation
+
+from parco_verismo import urls as parco_urls
+from parco_verismo.models import Autore, Documento, Evento, Itinerario, Notizia, Opera
+from parco_verismo.services.dati_sintetici_service import SLUG_PREFISSO, genera_contenuti
+from parco_verismo.sitemaps import get_sitemaps
+
+BUDGET_PRESTAZIONI = Path(settings.BASE_DIR) / "budget_prestazioni.json"
+
+# Contenuti sintetici per modello
+SCALA = 30
+
+# Margine sulla dimensione misurata quando i budget vengono riscritti
+MARGINE_DIMENSIONE = 0.10
+
+# Larghezza massima della colonna URL nella tabella
+LARGHEZZA_URL = 60
+
+# Pagine con parametri: modello e parametro da cui prendere uno slug
+PAGINE_DETTAGLIO = {
+    "opere_per_autore": (Autore, "autore_slug"),
+    "opera_detail": (Opera, "slug"),
+    "evento_detail": (Evento, "slug"),
+    "notizia_detail": (Notizia, "slug"),
+    "documento_detail": (Documento, "slug"),
+    "itinerario_detail": (Itinerario, "slug"),
+    "itinerario_dati": (Itinerario, "slug"),
+    "itinerario_offline": (Itinerario, "slug"),
+}
+
+# Pagine del pianificatore: misurate con un percorso di tappe
+PAGINE_CON_TAPPE = ("pianifica_itinerario", "pianifica_itinerario_api")
+
+# URL alla radice del sito (senza prefisso di lingua)
+URL_RADICE = ("sitemap", "robots_txt", "favicon", "service_worker", "health_check")
+
+# Impostazioni fisse durante le misure: file sorgente senza bundle né CSS
+# critico (come in sviluppo), con gli URL di default
+IMPOSTAZIONI_MISURA = {
+    "STATIC_PIPELINE": False,
+    "STORAGES": {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+    "STATIC_URL": "/static/",
+    "MEDIA_URL": "/media/",
+    "GA_MEASUREMENT_ID": "",
+}
+
+
+class Command(BaseCommand):
+    help = "Controlla query e dimensione di ogni URL rispetto ai budget (budget_prestazioni.json)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scala",
+            type=int,
+            help=f"Contenuti sintetici per modello (default quella dei budget, altrimenti {SCALA})",
+        )
+        parser.add_argument(
+            "--budget",
+            default=str(BUDGET_PRESTAZIONI),
+            help="File JSON dei budget (default budget_prestazioni.json nella radice del progetto)",
+        )
+        parser.add_argument(
+            "--aggiorna",
+            action="store_true",
+            help="Riscrive i budget con i valori misurati invece di controllarli",
+        )
+
+    def handle(self, *args, **options):
+        file_budget = Path(options["budget"])
+        budget = {}
+        if file_budget.exists():
+            budget = json.loads(file_budget.read_text(encoding="utf-8"))
+        elif not options["aggiorna"]:
+            raise CommandError(f"File dei budget non trovato: {file_budget} (usa --aggiorna)")
+
+        scala = options["scala"] or budget.get("scala") or SCALA
+        if budget.get("scala") and scala != budget["scala"] and not options["aggiorna"]:
+            self.stdout.write(
+                self.style.WARNING(f"⚠ Budget misurati con scala {budget['scala']}, controllo con scala {scala}")
+            )
+
+        verbosity = options["verbosity"]
+        nome_db = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            genera_contenuti(
+                {
+                    "autori": max(scala // 5, 1),
+                    "opere": scala,
+                    "eventi": scala,
+                    "notizie": scala,
+                    "documenti": scala,
+                    "fotografie": scala,
+                    "itinerari": scala,
+                }
+            )
+            misure = self._misura_tutti()
+        finally:
+            connection.creation.destroy_test_db(nome_db, verbosity=0)
+
+        if options["aggiorna"]:
+            self._scrivi_budget(file_budget, scala, misure)
+            return
+
+        righe, oltre = self._confronta(misure, budget.get("url", {}))
+        if verbosity >= 2:
+            self._tabella(righe)
+        if oltre:
+            self.stdout.write(self.style.ERROR("URL oltre il budget:"))
+            self._tabella(oltre)
+            raise CommandError(f"{len(oltre)} URL oltre il budget (dopo una modifica voluta: --aggiorna)")
+        self.stdout.write(self.style.SUCCESS(f"✓ {len(righe)} URL entro il budget (scala {scala})"))
+
+    def _url_da_misurare(self):
+        """Restituisce le coppie (chiave del budget, URL) da richiedere."""
+        urls = []
+        for pattern in parco_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            nome = pattern.name
+            kwargs = {}
+            if pattern.pattern.converters:
+                if nome not in PAGINE_DETTAGLIO:
+                    self.stdout.write(self.style.WARNING(f"⚠ {nome}: parametri sconosciuti, saltato"))
+                    continue
+                modello, parametro = PAGINE_DETTAGLIO[nome]
+                kwargs[parametro] = modello.objects.filter(slug__startswith=SLUG_PREFISSO).order_by("pk")[0].slug
+            query_string = f"?tappe={self._tappe_di_esempio()}" if nome in PAGINE_CON_TAPPE else ""
+            for codice, _ in settings.LANGUAGES:
+                with translation.override(codice):
+                    urls.append((nome, reverse(nome, kwargs=kwargs) + query_string))
+
+        urls.extend((nome, reverse(nome)) for nome in URL_RADICE)
+        urls.extend(
+            (f"sitemap_sezione:{sezione}", reverse("sitemap_sezione", kwargs={"section": sezione}))
+            for sezione in get_sitemaps()
+        )
+        return urls
+
+    def _tappe_di_esempio(self):
+        """Prime tappe di due itinerari sintetici (chiavi del pianificatore)."""
+        slugs = Itinerario.objects.filter(slug__startswith=SLUG_PREFISSO).order_by("pk").values_list("slug", flat=True)
+        return ",".join(f"{slug}:{indice}" for slug in slugs[:2] for indice in range(3))
+
+    def _misura_tutti(self):
+        """
+        Richiede ogni URL a cache vuota.
+
+        Returns:
+            Dict chiave -> lista di (URL, stato, query, byte)
+        """
+        # Il rate limiting per IP bloccherebbe le richieste in sequenza
+        middleware = [m for m in settings.MIDDLEWARE if not m.endswith("SimpleRateLimitMiddleware")]
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+
+        misure = {}
+        with override_settings(MIDDLEWARE=middleware, **IMPOSTAZIONI_MISURA):
+            client = Client(HTTP_HOST=host)
+            for chiave, url in self._url_da_misurare():
+                cache.clear()
+                with CaptureQueriesContext(connection) as query:
+                    risposta = client.get(url, secure=True)
+                    if risposta.streaming:
+                        dimensione = sum(len(parte) for parte in risposta.streaming_content)
+                    else:
+                        dimensione = len(risposta.content)
+                misure.setdefault(chiave, []).append((url, risposta.status_code, len(query), dimensione))
+        cache.clear()
+        return misure
+
+    def _scrivi_budget(self, file_budget, scala, misure):
+        budget = {"scala": scala, "url": {}}
+        for chiave, valori in sorted(misure.items()):
+            errori = [f"{url} ({stato})" for url, stato, _, _ in valori if stato != 200]
+            if errori:
+                raise CommandError(f"Risposta diversa da 200: {', '.join(errori)}")
+            budget["url"][chiave] = {
+                "query": max(q for _, _, q, _ in valori),
+                "byte": math.ceil(max(b for _, _, _, b in valori) * (1 + MARGINE_DIMENSIONE)),
+            }
+        file_budget.write_text(json.dumps(budget, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        self.stdout.write(self.style.SUCCESS(f"✓ Budget di {len(budget['url'])} URL scritti in {file_budget}"))
+
+    def _confronta(self, misure, budget):
+        """
+        Confronta le misure con i budget.
+
+        Returns:
+            Tupla (tutte le righe, righe oltre il budget)
+        """
+        righe, oltre = [], []
+        for chiave, valori in misure.items():
+            limite = budget.get(chiave)
+            for url, stato, query, dimensione in valori:
+                problemi = []
+                if stato != 200:
+                    problemi.append(f"stato {stato}")
+                if limite is None:
+                    problemi.append("nessun budget")
+                else:
+                    if query > limite["query"]:
+                        problemi.append("query")
+                    if dimensione > limite["byte"]:
+                        problemi.append("dimensione")
+                riga = (
+                    url if len(url) <= LARGHEZZA_URL else url[: LARGHEZZA_URL - 1] + "…",
+                    query,
+                    limite["query"] if limite else "-",
+                    f"{dimensione / 1024:.1f}",
+                    f"{limite['byte'] / 1024:.1f}" if limite else "-",
+                    ", ".join(problemi),
+                )
+                righe.append(riga)
+                if problemi:
+                    oltre.append(riga)
+        for chiave in sorted(set(budget) - set(misure)):
+            self.stdout.write(self.style.WARNING(f"⚠ Budget di un URL non più esistente: {chiave}"))
+        return righe, oltre
+
+    def _tabella(self, righe):
+        intestazione = ("URL", "query", "budget", "KB", "budget KB", "problema")
+        larghezza = max([len(intestazione[0])] + [len(r[0]) for r in righe])
+        formato = f"{{:<{larghezza}}} {{:>6}} {{:>6}} {{:>7}} {{:>9}}  {{}}"
+        self.stdout.write(formato.format(*intestazione))
+        for riga in righe:
+            self.stdout.write(formato.format(*riga))
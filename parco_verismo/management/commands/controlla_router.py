@@ -0,0 +1,175 @@
+"""
+Comando Django che verifica il router del database (router_database.py) su
+due file SQLite: un primario e una sua copia usata come replica.
+
+Il comando crea i due file in una cartella temporanea (migrate sul
+primario, poi la copia) e si riesegue con SQLITE_PATH e SQLITE_REPLICA_PATH
+puntati su di essi; il database del sito non viene toccato. Per ogni caso
+registra su quale database finiscono le query:
+- GET pubbliche (elenchi, sitemap) -> replica
+- POST del modulo di contatto (RichiestaForm) -> primario, e la richiesta
+  esiste solo sul primario
+- GET dello stesso browser subito dopo la POST (cookie leggi_primario) -> primario
+- admin, aggiornamenti della micro-cache e comandi di gestione -> primario
+
+Esce con errore se un caso non va dove deve.
+
+Uso:
+    python manage.py controlla_router
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from parco_verismo.middleware import ReplicaMiddleware
+from parco_verismo.services.dati_sintetici_service import DOMINIO_EMAIL
+
+EMAIL_PROVA = f"controlla-router@{DOMINIO_EMAIL}"
+
+
+@contextmanager
+def _registra_database():
+    """Alias dei database su cui vengono eseguite le query del blocco."""
+    alias_usati = []
+
+    def registra(alias):
+        def wrapper(execute, sql, params, many, context):
+            alias_usati.append(alias)
+            return execute(sql, params, many, context)
+
+        return wrapper
+
+    with ExitStack() as stack:
+        for connessione in connections.all():
+            stack.enter_context(connessione.execute_wrapper(registra(connessione.alias)))
+        yield alias_usati
+
+
+class Command(BaseCommand):
+    help = "Verifica su due file SQLite che le letture pubbliche vadano sulla replica e il resto sul primario"
+
+    def add_arguments(self, parser):
+        # Usato dal comando stesso dopo aver preparato i due database
+        parser.add_argument("--interno", action="store_true", help="Esegue i controlli sui database configurati")
+
+    def handle(self, *args, **options):
+        if options["interno"]:
+            self._controlla()
+        else:
+            self._avvia()
+
+    def _avvia(self):
+        cartella = Path(tempfile.mkdtemp(prefix="controlla-router-"))
+        primario, replica = cartella / "primario.sqlite3", cartella / "replica.sqlite3"
+        env = {
+            **os.environ,
+            "DB_ENGINE": "django.db.backends.sqlite3",
+            "SQLITE_PATH": str(primario),
+            "SQLITE_REPLICA_PATH": str(replica),
+            # Niente aggiornamenti della micro-cache di nginx
+            "MICRO_CACHE_REFRESH_URL": "",
+        }
+        manage = [sys.executable, str(Path(settings.BASE_DIR) / "manage.py")]
+        try:
+            self.stdout.write(f"Primario {primario}, replica {replica}")
+            subprocess.run(manage + ["migrate", "--noinput", "--verbosity", "0"], env=env, check=True)
+            shutil.copyfile(primario, replica)
+            esito = subprocess.run(manage + ["controlla_router", "--interno"], env=env)
+        except subprocess.CalledProcessError:
+            raise CommandError("migrate non riuscito sul database primario di prova")
+        finally:
+            shutil.rmtree(cartella, ignore_errors=True)
+        if esito.returncode:
+            raise CommandError("Il router non manda le query dove previsto")
+
+    def _controlla(self):
+        from django.contrib.auth import get_user_model
+        from parco_verismo.models import Notizia, Richiesta
+
+        if not settings.DATABASE_REPLICHE:
+            raise CommandError("Nessuna replica configurata (SQLITE_REPLICA_PATH o DB_REPLICA_HOSTS)")
+
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        visitatore = Client(SERVER_NAME=host)
+        staff = Client(SERVER_NAME=host)
+        staff.force_login(
+            get_user_model().objects.create_superuser("controlla-router", EMAIL_PROVA, "controlla-router")
+        )
+        dati_contatto = {
+            "nome": "Mario",
+            "cognome": "Rossi",
+            "email": EMAIL_PROVA,
+            "oggetto": "Controllo del router",
+            "messaggio": "Richiesta di prova del router del database.",
+        }
+
+        casi = (
+            ("GET pubblica (notizie)", "replica", lambda: visitatore.get(reverse("notizie"), secure=True)),
+            ("GET pubblica (biblioteca)", "replica", lambda: visitatore.get(reverse("biblioteca"), secure=True)),
+            ("Sitemap", "replica", lambda: visitatore.get(reverse("sitemap"), secure=True)),
+            (
+                "POST del modulo di contatto",
+                "primario",
+                lambda: visitatore.post(reverse("contatti"), dati_contatto, secure=True),
+            ),
+            (
+                "GET pubblica dopo la POST (cookie leggi_primario)",
+                "primario",
+                lambda: visitatore.get(reverse("notizie"), secure=True),
+            ),
+            ("Admin (staff)", "primario", lambda: staff.get(reverse("admin:index"), secure=True)),
+            (
+                "Aggiornamento della micro-cache (X-Leggi-Primario)",
+                "primario",
+                lambda: Client(SERVER_NAME=host).get(
+                    reverse("notizie"), secure=True, headers={"X-Leggi-Primario": "1"}
+                ),
+            ),
+            ("Comando di gestione", "primario", lambda: list(Notizia.objects.all()[:1])),
+        )
+
+        errori = 0
+        for descrizione, atteso, esegui in casi:
+            cache.clear()
+            # In sviluppo (DEBUG) le email andrebbero sulla console
+            with _registra_database() as alias_usati, override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"
+            ):
+                esegui()
+            database = {"replica" if alias in settings.DATABASE_REPLICHE else "primario" for alias in alias_usati}
+            if database == {atteso}:
+                self.stdout.write(self.style.SUCCESS(f"✓ {descrizione}: {len(alias_usati)} query su {atteso}"))
+            else:
+                errori += 1
+                trovato = ", ".join(sorted(database)) or "nessun database"
+                self.stdout.write(
+                    self.style.ERROR(f"✗ {descrizione}: attese query su {atteso}, eseguite su {trovato}")
+                )
+
+        replica = settings.DATABASE_REPLICHE[0]
+        scritta = Richiesta.objects.using(DEFAULT_DB_ALIAS).filter(email=EMAIL_PROVA).exists()
+        copiata = Richiesta.objects.using(replica).filter(email=EMAIL_PROVA).exists()
+        if scritta and not copiata:
+            self.stdout.write(self.style.SUCCESS("✓ La richiesta inviata esiste solo sul primario"))
+        else:
+            errori += 1
+            self.stdout.write(self.style.ERROR(f"✗ Richiesta sul primario: {scritta}, sulla replica: {copiata}"))
+        if ReplicaMiddleware.COOKIE not in visitatore.cookies:
+            errori += 1
+            self.stdout.write(self.style.ERROR(f"✗ La POST non ha impostato il cookie {ReplicaMiddleware.COOKIE}"))
+
+        if errori:
+            raise CommandError(f"{errori} controlli non superati")
@@ -0,0 +1,260 @@
+"""
+Comando Django per generare il CSS purgato e il CSS critico di ogni pagina.
+
+Renderizza tutte le pagine HTML di parco_verismo/urls.py (per le pagine di
+dettaglio usa il primo contenuto disponibile) in tutte le lingue e raccoglie
+classi, id e tag effettivamente usati. Alle classi dell'HTML aggiunge quelle
+scritte nei template della pagina e in quelli che includono (componenti
+compresi), così il risultato non dipende dai contenuti presenti nel database:
+una card in un ciclo vuoto o un ramo {% if %} non renderizzato conservano le
+loro regole. Le pagine di dettaglio senza contenuti vengono saltate e usano il
+bundle completo. Per ogni pagina scrive in settings.CSS_PAGINE_ROOT:
+
+- <nome_url>.css: il bundle CSS comune senza le regole inutilizzate
+- critico.json: indice con il percorso del CSS e il CSS critico da inserire
+  in linea (regole usate dai primi elementi della pagina, al massimo
+  --max-critico KB perché stia nei primi pacchetti della risposta)
+
+Va eseguito prima di collectstatic, che pubblica i file sotto
+STATIC_URL/pagine/ con hash e compressione.
+
+Uso:
+    python manage.py estrai_css_pagine
+    python manage.py estrai_css_pagine --pagina home --pagina contatti
+    python manage.py estrai_css_pagine --fixture dati_demo.json
+    python manage.py estrai_css_pagine --elementi-critici 20 --max-critico 10
+"""
+
+import json
+import re
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.template import Template
+from django.template.loader_tags import IncludeNode
+from django.test import Client
+from django.test.utils import instrumented_test_render, override_settings
+from django.urls import URLPattern, reverse
+from django.utils import translation
+
+from parco_verismo import urls as parco_urls
+from parco_verismo.models import Autore, Documento, Evento, Itinerario, Notizia, Opera
+from parco_verismo.utils.css_purge import (
+    Usati,
+    analizza_css,
+    classi_template,
+    parole_js,
+    purga_css,
+    raccogli_usati_html,
+)
+from parco_verismo.utils.static_bundles import (
+    INDICE_CSS_PAGINE,
+    costruisci_bundle,
+    get_bundles,
+)
+
+BUNDLE_CSS = "bundles/base.css"
+BUNDLE_JS = "bundles/base.js"
+
+# Pagine con parametri: modello da cui prendere uno slug di esempio
+PAGINE_DETTAGLIO = {
+    "opere_per_autore": (Autore, "autore_slug"),
+    "opera_detail": (Opera, "slug"),
+    "evento_detail": (Evento, "slug"),
+    "notizia_detail": (Notizia, "slug"),
+    "documento_detail": (Documento, "slug"),
+    "itinerario_detail": (Itinerario, "slug"),
+}
+
+# Elementi del body considerati "above the fold" per il CSS critico
+ELEMENTI_CRITICI = 30
+
+# Dimensione massima del CSS critico in linea (KB): con l'HTML deve stare
+# nella prima finestra di congestione TCP (~14 KB)
+MAX_CRITICO_KB = 14
+
+
+@contextmanager
+def _registra_template():
+    """Come nei test: il Client riporta in risposta.templates i template renderizzati."""
+    originale = Template._render
+    Template._render = instrumented_test_render
+    try:
+        yield
+    finally:
+        Template._render = originale
+
+
+def _classi_template(templates):
+    """Classi dei template renderizzati e di quelli inclusi con nome costante."""
+    classi = set()
+    visti = set()
+    da_visitare = list(templates)
+    while da_visitare:
+        template = da_visitare.pop()
+        if template.name in visti:
+            continue
+        visti.add(template.name)
+        classi |= classi_template(template.source)
+        for nodo in template.nodelist.get_nodes_by_type(IncludeNode):
+            # {% include variabile %} resta escluso: il nome si conosce solo a runtime
+            if isinstance(nodo.template.var, str):
+                da_visitare.append(template.engine.get_template(nodo.template.var))
+    return classi
+
+
+class Command(BaseCommand):
+    help = "Genera CSS purgato e CSS critico per ogni pagina (prima di collectstatic)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pagina",
+            action="append",
+            default=[],
+            help="Nome URL da elaborare (ripetibile, default tutte)",
+        )
+        parser.add_argument(
+            "--fixture",
+            action="append",
+            default=[],
+            help="Fixture da caricare per il rendering (annullata alla fine)",
+        )
+        parser.add_argument(
+            "--elementi-critici",
+            type=int,
+            default=ELEMENTI_CRITICI,
+            help=f"Elementi del body usati per il CSS critico (default {ELEMENTI_CRITICI})",
+        )
+        parser.add_argument(
+            "--max-critico",
+            type=int,
+            default=MAX_CRITICO_KB,
+            help=f"KB massimi di CSS critico per pagina, le regole successive vengono tralasciate "
+            f"(default {MAX_CRITICO_KB})",
+        )
+
+    def handle(self, *args, **options):
+        if BUNDLE_CSS not in get_bundles():
+            raise CommandError(f"Bundle '{BUNDLE_CSS}' non definito in STATIC_BUNDLES")
+
+        destinazione = Path(settings.CSS_PAGINE_ROOT)
+        safelist = [re.compile(p) for p in getattr(settings, "CSS_PURGE_SAFELIST", [])]
+
+        # Il CSS purgato sta in pagine/: gli url() relativi vanno riscritti da lì
+        css = costruisci_bundle(BUNDLE_CSS, self._leggi_statico, destinazione="pagine/pagina.css")
+        blocchi = analizza_css(css)
+        parole_bundle_js = set()
+        if BUNDLE_JS in get_bundles():
+            parole_bundle_js = parole_js(costruisci_bundle(BUNDLE_JS, self._leggi_statico))
+
+        with transaction.atomic():
+            for fixture in options["fixture"]:
+                call_command("loaddata", fixture, verbosity=0)
+            usati_pagine = self._raccogli_pagine(options["pagina"], options["elementi_critici"])
+            transaction.set_rollback(True)
+
+        if not usati_pagine:
+            raise CommandError("Nessuna pagina renderizzata")
+
+        if destinazione.exists():
+            shutil.rmtree(destinazione)
+        destinazione.mkdir(parents=True)
+
+        indice = {}
+        dimensione_bundle = len(css.encode("utf-8"))
+        for nome, (usati, usati_critici, parole_script) in sorted(usati_pagine.items()):
+            usati.aggiungi_parole(parole_script | parole_bundle_js)
+            purgato = purga_css(blocchi, usati, safelist)
+            # Gli elementi creati a runtime (safelist) non servono al primo rendering
+            critico = purga_css(blocchi, usati_critici, critico=True, limite_byte=options["max_critico"] * 1024)
+
+            (destinazione / f"{nome}.css").write_text(purgato, encoding="utf-8")
+            indice[nome] = {
+                "css": f"pagine/{nome}.css",
+                # "</" non può comparire dentro <style>: in CSS "\/" equivale a "/"
+                "critico": critico.replace("</", "<\\/"),
+            }
+            self.stdout.write(
+                f"  {nome}: {len(purgato.encode('utf-8')) // 1024} KB "
+                f"(critico {len(critico.encode('utf-8')) // 1024} KB, "
+                f"bundle {dimensione_bundle // 1024} KB)"
+            )
+
+        (destinazione / Path(INDICE_CSS_PAGINE).name).write_text(
+            json.dumps({"pagine": indice}, ensure_ascii=False), encoding="utf-8"
+        )
+        self.stdout.write(self.style.SUCCESS(f"✓ CSS generato per {len(indice)} pagine in {destinazione}"))
+
+    def _leggi_statico(self, percorso):
+        trovato = finders.find(percorso)
+        if not trovato:
+            raise CommandError(f"File statico non trovato: {percorso}")
+        return Path(trovato).read_text(encoding="utf-8")
+
+    def _url_pagine(self, filtro):
+        """Restituisce le coppie (nome URL, kwargs) delle pagine da renderizzare."""
+        pagine = []
+        for pattern in parco_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            if str(pattern.pattern).startswith("api/"):
+                continue
+            if filtro and pattern.name not in filtro:
+                continue
+            if not pattern.pattern.converters:
+                pagine.append((pattern.name, {}))
+                continue
+            if pattern.name not in PAGINE_DETTAGLIO:
+                continue
+            modello, parametro = PAGINE_DETTAGLIO[pattern.name]
+            queryset = modello.objects.all()
+            if hasattr(modello, "is_active"):
+                queryset = queryset.filter(is_active=True)
+            oggetto = queryset.exclude(slug="").first()
+            if oggetto is None:
+                self.stdout.write(self.style.WARNING(f"⚠ {pattern.name}: nessun contenuto, saltata"))
+                continue
+            pagine.append((pattern.name, {parametro: oggetto.slug}))
+        return pagine
+
+    def _raccogli_pagine(self, filtro, elementi_critici):
+        """
+        Renderizza le pagine in tutte le lingue.
+
+        Returns:
+            Dict nome URL -> (usati, usati above the fold, parole degli script inline)
+        """
+        # Il rate limiting per IP bloccherebbe il rendering in sequenza
+        middleware = [m for m in settings.MIDDLEWARE if not m.endswith("SimpleRateLimitMiddleware")]
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+
+        risultati = {}
+        with override_settings(MIDDLEWARE=middleware), _registra_template():
+            client = Client(HTTP_HOST=host)
+            for nome, kwargs in self._url_pagine(filtro):
+                for codice, _ in settings.LANGUAGES:
+                    with translation.override(codice):
+                        url = reverse(nome, kwargs=kwargs)
+                    risposta = client.get(url, secure=True, HTTP_ACCEPT_LANGUAGE=codice)
+                    if risposta.status_code != 200 or "text/html" not in risposta.get("Content-Type", ""):
+                        continue
+
+                    html = risposta.content.decode(risposta.charset or "utf-8")
+                    usati, script = raccogli_usati_html(html)
+                    usati.classi |= _classi_template(risposta.templates)
+                    critici, _ = raccogli_usati_html(html, elementi_critici)
+
+                    precedenti = risultati.get(nome)
+                    if precedenti:
+                        precedenti[0].aggiorna(usati)
+                        precedenti[1].aggiorna(critici)
+                        precedenti[2].update(parole_js(script))
+                    else:
+                        risultati[nome] = (Usati().aggiorna(usati), critici, parole_js(script))
+        return risultati
@@ -0,0 +1,134 @@
+"""
+Comando Django per riempire il database con contenuti sintetici.
+
+Serve a vedere come si comporta il sito con molti dati (migliaia di notizie
+ed eventi, decine di migliaia di richieste, centinaia di itinerari con
+percorsi lunghi). Gli oggetti vengono creati con bulk_create a lotti,
+tradotti in tutte le lingue (services/dati_sintetici_service.py); con lo
+stesso --seed si ottengono sempre gli stessi dati. I contenuti sintetici
+hanno lo slug con prefisso "sintetico-" (le richieste un'email
+@sintetico.invalid) e si rimuovono con --elimina.
+
+Con --segnaposto immagini e PDF puntano a due file segnaposto salvati in
+MEDIA_ROOT/sintetico/, altrimenti restano vuoti (o puntano a file mancanti).
+
+Uso:
+    python manage.py genera_dati_sintetici
+    python manage.py genera_dati_sintetici --notizie 100 --eventi 100 --richieste 0 --seed 2
+    python manage.py genera_dati_sintetici --itinerari 500 --tappe-max 30 --punti-tratta 400
+    python manage.py genera_dati_sintetici --elimina
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from parco_verismo.models import Autore, Documento, Evento, Itinerario, Notizia, Opera, Richiesta
+from parco_verismo.services.dati_sintetici_service import (
+    DOMINIO_EMAIL,
+    SLUG_PREFISSO,
+    elimina_contenuti,
+    genera_contenuti,
+)
+from parco_verismo.signals import signal_sospesi
+
+# Oggetti da creare per modello (opzione --<nome>)
+QUANTITA = {
+    "autori": 20,
+    "opere": 500,
+    "eventi": 2000,
+    "notizie": 5000,
+    "documenti": 1000,
+    "fotografie": 1000,
+    "itinerari": 500,
+    "richieste": 50000,
+}
+
+LOTTO = 500
+
+
+class Command(BaseCommand):
+    help = "Genera contenuti sintetici tradotti (bulk_create a lotti, deterministici con --seed)"
+
+    def add_arguments(self, parser):
+        for nome, default in QUANTITA.items():
+            parser.add_argument(f"--{nome}", type=int, default=default, help=f"Numero di {nome} (default {default})")
+        parser.add_argument("--seed", type=int, default=0, help="Seme del generatore casuale (default 0)")
+        parser.add_argument("--lotto", type=int, default=LOTTO, help=f"Righe per ogni INSERT (default {LOTTO})")
+        parser.add_argument("--tappe-min", type=int, default=3, help="Tappe minime per itinerario (default 3)")
+        parser.add_argument("--tappe-max", type=int, default=12, help="Tappe massime per itinerario (default 12)")
+        parser.add_argument(
+            "--punti-tratta",
+            type=int,
+            default=100,
+            help="Punti del percorso stradale per tratta, 0 = nessun percorso calcolato (default 100)",
+        )
+        parser.add_argument(
+            "--segnaposto",
+            action="store_true",
+            help="Assegna un'immagine e un PDF segnaposto a tutti i contenuti",
+        )
+        parser.add_argument(
+            "--elimina",
+            action="store_true",
+            help="Elimina tutti i contenuti sintetici (di qualsiasi seed) invece di crearli",
+        )
+        parser.add_argument(
+            "--forza",
+            action="store_true",
+            help="Esegue anche con DEBUG=False (database di produzione)",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["forza"]:
+            raise CommandError("DEBUG=False: il database potrebbe essere quello di produzione (usa --forza)")
+
+        inizio = time.perf_counter()
+        if options["elimina"]:
+            with signal_sospesi(), transaction.atomic():
+                eliminati = elimina_contenuti()
+            self._riepilogo("Eliminati", eliminati, time.perf_counter() - inizio)
+            return
+
+        if not 1 <= options["tappe_min"] <= options["tappe_max"]:
+            raise CommandError("Servono 1 <= --tappe-min <= --tappe-max")
+        seed = options["seed"]
+        if self._seed_usato(seed):
+            raise CommandError(f"Contenuti sintetici con seed {seed} già presenti (usa --elimina o un altro --seed)")
+
+        quantita = {nome: max(options[nome], 0) for nome in QUANTITA}
+        self.stdout.write(f"Generazione contenuti sintetici (seed {seed}, lotti da {options['lotto']})...")
+        # bulk_create non invia signal: le sezioni vengono invalidate dopo il commit
+        with signal_sospesi(), transaction.atomic():
+            creati = genera_contenuti(
+                quantita,
+                seed=seed,
+                lotto=max(options["lotto"], 1),
+                tappe=(options["tappe_min"], options["tappe_max"]),
+                punti_tratta=options["punti_tratta"],
+                segnaposto=options["segnaposto"],
+            )
+        self._riepilogo("Creati", creati, time.perf_counter() - inizio)
+
+    def _seed_usato(self, seed):
+        """True se il database contiene già contenuti sintetici con questo seed."""
+        prefisso = f"{SLUG_PREFISSO}-{seed}-"
+        if any(
+            modello.objects.filter(slug__startswith=prefisso).exists()
+            for modello in (Autore, Opera, Evento, Notizia, Documento, Itinerario)
+        ):
+            return True
+        return Richiesta.objects.filter(
+            email__startswith=f"richiesta{seed}-", email__endswith=f"@{DOMINIO_EMAIL}"
+        ).exists()
+
+    def _riepilogo(self, azione, conteggi, secondi):
+        for nome, numero in conteggi.items():
+            self.stdout.write(f"  {nome:<12} {numero:>8}")
+        totale = sum(conteggi.values())
+        velocita = totale / secondi if secondi else 0
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ {azione} {totale} oggetti in {secondi:.1f}s ({velocita:.0f} oggetti/s)")
+        )
@@ -0,0 +1,115 @@
+"""
+Comando Django per pre-caricare nella cache locale le tile delle mappe.
+Per ogni itinerario attivo scarica le tile che coprono il bounding box
+delle tappe nell'intervallo di zoom richiesto, così i visitatori con
+connessioni lente trovano la mappa già pronta.
+
+Uso:
+    python manage.py precarica_tiles
+    python manage.py precarica_tiles --zoom-min 12 --zoom-max 17
+    python manage.py precarica_tiles --bbox 37.14,14.73,37.18,14.77
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from parco_verismo.models import Itinerario
+from parco_verismo.services.tile_service import (
+    TileNonDisponibile,
+    get_tile,
+    tile_per_bbox,
+)
+
+
+class Command(BaseCommand):
+    help = "Pre-carica nella cache locale le tile delle mappe degli itinerari"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--zoom-min", type=int, default=12, help="Zoom minimo (default 12)")
+        parser.add_argument("--zoom-max", type=int, default=16, help="Zoom massimo (default 16)")
+        parser.add_argument(
+            "--margine",
+            type=float,
+            default=0.005,
+            help="Margine in gradi attorno al bounding box (default 0.005, circa 500 m)",
+        )
+        parser.add_argument("--itinerario", help="Slug di un singolo itinerario")
+        parser.add_argument(
+            "--bbox",
+            action="append",
+            default=[],
+            help="Bounding box aggiuntivo 'lat_min,lng_min,lat_max,lng_max' (ripetibile, es. pagine dei comuni)",
+        )
+        parser.add_argument(
+            "--max-tile",
+            type=int,
+            default=5000,
+            help="Numero massimo di tile da scaricare (default 5000)",
+        )
+        parser.add_argument(
+            "--pausa",
+            type=float,
+            default=0.1,
+            help="Pausa in secondi tra i download per non sovraccaricare l'origine",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Mostra solo il numero di tile")
+
+    def handle(self, *args, **options):
+        if options["zoom_min"] > options["zoom_max"]:
+            raise CommandError("--zoom-min deve essere minore o uguale a --zoom-max")
+
+        aree = []
+        itinerari = Itinerario.objects.filter(is_active=True)
+        if options["itinerario"]:
+            itinerari = itinerari.filter(slug=options["itinerario"])
+        for itinerario in itinerari:
+            if itinerario.bbox_mappa:
+                aree.append((str(itinerario), itinerario.bbox_mappa))
+            else:
+                self.stdout.write(self.style.WARNING(f"⚠ {itinerario}: nessuna tappa, saltato"))
+
+        for valore in options["bbox"]:
+            try:
+                lat_min, lng_min, lat_max, lng_max = (float(v) for v in valore.split(","))
+            except ValueError:
+                raise CommandError(f"Bounding box non valido: {valore}")
+            aree.append((f"bbox {valore}", [[lat_min, lng_min], [lat_max, lng_max]]))
+
+        # Insieme di tile da scaricare (aree sovrapposte condividono le tile)
+        tiles = []
+        visti = set()
+        for nome, bbox in aree:
+            nuove = 0
+            for tile in tile_per_bbox(bbox, options["zoom_min"], options["zoom_max"], options["margine"]):
+                if tile not in visti:
+                    visti.add(tile)
+                    tiles.append(tile)
+                    nuove += 1
+            self.stdout.write(f"📍 {nome}: {nuove} tile")
+
+        self.stdout.write(f"\nTile totali: {len(tiles)}")
+        if len(tiles) > options["max_tile"]:
+            raise CommandError(
+                f"Troppe tile ({len(tiles)} > {options['max_tile']}): riduci lo zoom o aumenta --max-tile"
+            )
+        if options["dry_run"]:
+            return
+
+        scaricate = presenti = errori = 0
+        for z, x, y in tiles:
+            try:
+                _, hit = get_tile(z, x, y)
+            except TileNonDisponibile:
+                errori += 1
+                continue
+            if hit:
+                presenti += 1
+            else:
+                scaricate += 1
+                if options["pausa"]:
+                    time.sleep(options["pausa"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Completato: {scaricate} scaricate, {presenti} già in cache, {errori} errori"
+        ))
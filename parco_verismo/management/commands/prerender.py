@@ -0,0 +1,127 @@
+"""
+Comando Django per pre-renderizzare in HTML le pagine statiche.
+
+Le pagine istituzionali, dei comuni e di approfondimento della biblioteca
+non leggono il database: il loro HTML cambia solo con un nuovo deploy
+(template, traduzioni, file statici). Il comando le renderizza in tutte le
+lingue in settings.PRERENDER_ROOT, con la stessa struttura degli URL
+(es. en/privacy/index.html) e una copia precompressa .gz. nginx le serve
+con try_files senza passare da Gunicorn (nginx/conf.d/default.conf); se
+il file manca la richiesta arriva alla view come sempre.
+
+Va eseguito dopo collectstatic: l'HTML contiene gli URL con hash dei file
+statici e il CSS critico della pagina.
+
+Uso:
+    python manage.py prerender
+    python manage.py prerender --pagina privacy_policy --pagina mineo
+"""
+
+import gzip
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import NoReverseMatch, reverse
+from django.utils import translation
+
+# Pagine (nomi URL senza parametri) che non dipendono dal database né
+# dalla richiesta (views/istituzionale.py, comuni.py, biblioteca.py)
+PAGINE_STATICHE = (
+    "missione_visione",
+    "comitato_tecnico_scientifico",
+    "comitato_regolamento",
+    "regolamenti_documenti",
+    "partner_rete_territoriale",
+    "privacy_policy",
+    "note_legali",
+    "cookie_policy",
+    "licodia",
+    "mineo",
+    "vizzini",
+    "personaggi_lessico",
+    "luoghi_opere",
+)
+
+FILE_PAGINA = "index.html"
+
+
+class Command(BaseCommand):
+    help = "Renderizza le pagine statiche in HTML servito direttamente da nginx (dopo collectstatic)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pagina",
+            action="append",
+            default=[],
+            help="Nome URL da renderizzare (ripetibile, default tutte)",
+        )
+
+    def handle(self, *args, **options):
+        filtro = options["pagina"]
+        sconosciute = set(filtro) - set(PAGINE_STATICHE)
+        if sconosciute:
+            raise CommandError(f"Pagine non pre-renderizzabili: {', '.join(sorted(sconosciute))}")
+
+        destinazione = Path(settings.PRERENDER_ROOT)
+        destinazione.mkdir(parents=True, exist_ok=True)
+
+        scritti = set()
+        for percorso, contenuto in self._renderizza(filtro or PAGINE_STATICHE):
+            file = destinazione / percorso.strip("/") / FILE_PAGINA
+            self._scrivi(file, contenuto)
+            self._scrivi(file.with_name(f"{FILE_PAGINA}.gz"), gzip.compress(contenuto, 9, mtime=0))
+            scritti.update({file, file.with_name(f"{FILE_PAGINA}.gz")})
+            self.stdout.write(f"  {percorso}: {len(contenuto) // 1024} KB")
+
+        if not scritti:
+            raise CommandError("Nessuna pagina renderizzata")
+
+        # Pagine non più pre-renderizzabili (rimosse o diventate dinamiche):
+        # senza file nginx passa la richiesta a Django
+        if not filtro:
+            for file in destinazione.rglob(f"{FILE_PAGINA}*"):
+                if file not in scritti:
+                    file.unlink()
+                    self.stdout.write(f"  rimosso {file.relative_to(destinazione)}")
+
+        self.stdout.write(self.style.SUCCESS(f"✓ {len(scritti) // 2} pagine pre-renderizzate in {destinazione}"))
+
+    def _renderizza(self, pagine):
+        """Restituisce le coppie (percorso, HTML) di ogni pagina in ogni lingua."""
+        # Il rate limiting per IP bloccherebbe il rendering in sequenza
+        middleware = [m for m in settings.MIDDLEWARE if not m.endswith("SimpleRateLimitMiddleware")]
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+
+        with override_settings(MIDDLEWARE=middleware):
+            client = Client(HTTP_HOST=host)
+            for nome in pagine:
+                for codice, _ in settings.LANGUAGES:
+                    try:
+                        with translation.override(codice):
+                            percorso = reverse(nome)
+                    except NoReverseMatch:
+                        self.stdout.write(self.style.WARNING(f"⚠ {nome}: URL non registrato, saltata"))
+                        break
+
+                    risposta = client.get(percorso, secure=True, HTTP_ACCEPT_LANGUAGE=codice)
+                    if risposta.status_code != 200 or "text/html" not in risposta.get("Content-Type", ""):
+                        self.stdout.write(
+                            self.style.WARNING(f"⚠ {percorso}: risposta {risposta.status_code}, saltata")
+                        )
+                        continue
+                    # Un cookie (sessione, CSRF) indica una pagina legata al visitatore
+                    if risposta.cookies or "Cookie" in risposta.get("Vary", ""):
+                        self.stdout.write(self.style.WARNING(f"⚠ {percorso}: dipende dai cookie, saltata"))
+                        continue
+                    yield percorso, risposta.content
+
+    def _scrivi(self, file, contenuto):
+        """Scrive il file in modo atomico: nginx non legge mai un file a metà."""
+        file.parent.mkdir(parents=True, exist_ok=True)
+        temporaneo = file.with_name(f".{file.name}.tmp")
+        temporaneo.write_bytes(contenuto)
+        os.replace(temporaneo, file)
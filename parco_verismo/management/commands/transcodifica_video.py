@@ -0,0 +1,129 @@
+"""
+Comando Django per generare le varianti del video di sfondo della homepage.
+
+Dal video sorgente (settings.VIDEO_HERO_SORGENTE) produce con ffmpeg una
+variante per ogni risoluzione di VARIANTI_VIDEO (senza ingrandire oltre la
+risoluzione originale), un'immagine poster e il manifest letto dal template
+tag video_hero. I file vengono scritti nella cartella statica del progetto
+(settings.VIDEO_HERO_CARTELLA) e pubblicati da collectstatic.
+
+Richiede ffmpeg e ffprobe nel PATH.
+
+Uso:
+    python manage.py transcodifica_video
+    python manage.py transcodifica_video --sorgente /percorso/video.mp4
+    python manage.py transcodifica_video --dry-run
+"""
+
+import json
+import shlex
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from parco_verismo.services.video_service import (
+    MANIFEST,
+    VARIANTI_VIDEO,
+    FFmpegNonDisponibile,
+    comando_poster,
+    comando_variante,
+    dimensioni_video,
+    trova_eseguibile,
+)
+
+
+class Command(BaseCommand):
+    help = "Genera varianti (risoluzione/bitrate) e poster del video della homepage"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sorgente",
+            help="File video sorgente (default: settings.VIDEO_HERO_SORGENTE tra i file statici)",
+        )
+        parser.add_argument(
+            "--secondo-poster",
+            type=float,
+            default=1.0,
+            help="Istante (secondi) del frame usato come poster (default 1.0)",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Mostra solo i comandi ffmpeg")
+
+    def handle(self, *args, **options):
+        sorgente = self._trova_sorgente(options["sorgente"])
+        cartella_statica = settings.VIDEO_HERO_CARTELLA
+        destinazione = Path(settings.STATICFILES_DIRS[0]) / cartella_statica
+
+        try:
+            ffmpeg = trova_eseguibile("ffmpeg")
+            ffprobe = trova_eseguibile("ffprobe")
+        except FFmpegNonDisponibile as e:
+            raise CommandError(f"{e}: installa ffmpeg per generare le varianti")
+
+        _, altezza_sorgente = dimensioni_video(ffprobe, sorgente)
+        self.stdout.write(f"Sorgente: {sorgente} ({altezza_sorgente}p)")
+
+        # Nessun ingrandimento: le varianti più alte della sorgente sono saltate,
+        # ma la più piccola viene sempre generata
+        varianti = [v for v in VARIANTI_VIDEO if v["altezza"] <= altezza_sorgente] or VARIANTI_VIDEO[-1:]
+
+        lavori = []
+        for variante in varianti:
+            altezza = min(variante["altezza"], altezza_sorgente)
+            file = destinazione / f"hero-{variante['nome']}.mp4"
+            lavori.append((variante, file, comando_variante(ffmpeg, sorgente, file, altezza, variante["bitrate"])))
+        poster = destinazione / "hero-poster.jpg"
+        comando = comando_poster(ffmpeg, sorgente, poster, secondo=options["secondo_poster"])
+
+        if options["dry_run"]:
+            for _, _, comando_ffmpeg in lavori:
+                self.stdout.write(shlex.join(comando_ffmpeg))
+            self.stdout.write(shlex.join(comando))
+            return
+
+        destinazione.mkdir(parents=True, exist_ok=True)
+        manifest = {"varianti": [], "poster": f"{cartella_statica}/{poster.name}"}
+
+        for indice, (variante, file, comando_ffmpeg) in enumerate(lavori):
+            self.stdout.write(f"  → {variante['nome']} ({variante['bitrate']})...")
+            self._esegui(comando_ffmpeg)
+            larghezza, altezza = dimensioni_video(ffprobe, file)
+            manifest["varianti"].append({
+                "nome": variante["nome"],
+                "file": f"{cartella_statica}/{file.name}",
+                "larghezza": larghezza,
+                "altezza": altezza,
+                "bytes": file.stat().st_size,
+                # La variante più piccola generata non ha media query (fallback)
+                "media": variante["media"] if indice < len(lavori) - 1 else None,
+            })
+            self.stdout.write(self.style.SUCCESS(
+                f"    ✓ {file.name}: {larghezza}x{altezza}, {file.stat().st_size // 1024} KB"
+            ))
+
+        self._esegui(comando)
+        self.stdout.write(self.style.SUCCESS(f"    ✓ {poster.name}: {poster.stat().st_size // 1024} KB"))
+
+        (destinazione / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        self.stdout.write(self.style.SUCCESS(f"✓ Manifest scritto in {destinazione / MANIFEST}"))
+
+    def _trova_sorgente(self, sorgente):
+        if sorgente:
+            percorso = Path(sorgente)
+        else:
+            trovato = finders.find(settings.VIDEO_HERO_SORGENTE)
+            if not trovato:
+                raise CommandError(f"Video sorgente non trovato: {settings.VIDEO_HERO_SORGENTE}")
+            percorso = Path(trovato)
+        if not percorso.is_file():
+            raise CommandError(f"Video sorgente non trovato: {percorso}")
+        return percorso
+
+    def _esegui(self, comando):
+        try:
+            subprocess.run(comando, check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            errore = e.stderr.decode("utf-8", "replace").strip().splitlines()[-1:] or [""]
+            raise CommandError(f"ffmpeg non riuscito: {errore[0]}")
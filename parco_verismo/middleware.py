@@ -3,13 +3,30 @@ Middleware personalizzato per rate limiting e sicurezza.
 """
 
 # Standard library imports
+import cProfile
+import json
+import logging
+import random
 import time
+from contextlib import ExitStack
 
 # Django imports
+from django.conf import settings
 from django.core.cache import cache
 from django.http import HttpResponse
+from django.db import connections
+from django.utils.cache import add_never_cache_headers, cc_delim_re
 from django.utils.translation import gettext as _
 
+# Local imports
+from .router_database import lettura_da_replica
+from .services.micro_cache_service import chiavi_surrogate
+from .services.profili_service import salva_profilo
+from .utils.metriche import aggiorna_metriche_pool, incrementa, osserva
+from .utils.strumentazione import installa_strumentazione, misura_richiesta
+
+logger_prestazioni = logging.getLogger("parco_verismo.prestazioni")
+
 
 class SimpleRateLimitMiddleware:
     """
@@ -19,6 +36,8 @@ class SimpleRateLimitMiddleware:
     Per siti con buona affluenza (consigliato):
     - 10 richieste POST per minuto per IP
     - 100 richieste GET per minuto per IP
+    - 600 tile delle mappe per minuto per IP (una mappa ne chiede decine
+      alla volta, ma il proxy non deve diventare un server di tile libero)
     """
 
     def __init__(self, get_response):
@@ -27,6 +46,7 @@ class SimpleRateLimitMiddleware:
         self.limits = {
             "POST": {"requests": 10, "window": 60},  # 10 POST al minuto
             "GET": {"requests": 100, "window": 60},  # 100 GET al minuto
+            "TILE": {"requests": 600, "window": 60},  # 600 tile al minuto
         }
 
     def __call__(self, request):
@@ -41,10 +61,14 @@ class SimpleRateLimitMiddleware:
         # Ottieni IP del client
         ip_address = self.get_client_ip(request)
         method = request.method
+        # Le tile hanno un limite proprio, più alto di quello delle pagine
+        if request.path.startswith("/tiles/"):
+            method = "TILE"
 
-        # Controlla rate limit solo per POST e GET
+        # Controlla rate limit solo per POST, GET e tile
         if method in self.limits:
             if not self.check_rate_limit(ip_address, method):
+                incrementa("parco_rate_limit_rifiuti_totale", metodo=method)
                 return HttpResponse(
                     _("Troppe richieste. Riprova tra qualche minuto."),
                     status=429,
@@ -91,6 +115,160 @@ class SimpleRateLimitMiddleware:
         return True
 
 
+class ServerTimingMiddleware:
+    """
+    Middleware che misura dove va il tempo di ogni richiesta: query SQL
+    (tempo e numero), rendering dei template, hit/miss della cache
+    (vedi utils/strumentazione.py). Latenza, dimensione della risposta e
+    letture della cache finiscono anche nelle metriche di /metrics.
+
+    - Header Server-Timing (visibile negli strumenti del browser) per lo
+      staff e per una frazione SERVER_TIMING_CAMPIONE delle richieste;
+      mai sulle risposte anonime che nginx mette in micro-cache
+    - Richieste oltre RICHIESTE_LENTE_MS registrate come riga JSON sul
+      logger parco_verismo.prestazioni, con le RICHIESTE_LENTE_SQL query
+      più lente
+    """
+
+    # Caratteri di SQL riportati per ogni query lenta
+    LUNGHEZZA_SQL = 1000
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        installa_strumentazione()
+
+    def __call__(self, request):
+        inizio = time.perf_counter()
+        with misura_richiesta() as misure:
+            response = self.get_response(request)
+        durata_ms = (time.perf_counter() - inizio) * 1000
+
+        self.aggiorna_metriche(request, response, misure, durata_ms)
+        if settings.RICHIESTE_LENTE_MS and durata_ms >= settings.RICHIESTE_LENTE_MS:
+            self.registra_lenta(request, response, misure, durata_ms)
+        if self.mostra_header(request, response):
+            response["Server-Timing"] = misure.server_timing(durata_ms)
+        return response
+
+    def aggiorna_metriche(self, request, response, misure, durata_ms):
+        # Nome della vista, non il percorso: etichette in numero limitato
+        vista = request.resolver_match.view_name if request.resolver_match else "nessuna"
+        incrementa("parco_http_richieste_totale", vista=vista, stato=f"{response.status_code // 100}xx")
+        osserva("parco_http_durata_secondi", durata_ms / 1000, vista=vista)
+        if not response.streaming:
+            osserva("parco_http_risposte_byte", len(response.content), vista=vista)
+        incrementa("parco_cache_letture_totale", misure.cache_hit, esito="hit")
+        incrementa("parco_cache_letture_totale", misure.cache_miss, esito="miss")
+        aggiorna_metriche_pool()
+
+    def mostra_header(self, request, response):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            return True
+        if "X-Accel-Expires" in response:
+            return False
+        return random.random() < settings.SERVER_TIMING_CAMPIONE
+
+    def registra_lenta(self, request, response, misure, durata_ms):
+        logger_prestazioni.warning(
+            json.dumps(
+                {
+                    "evento": "richiesta_lenta",
+                    "metodo": request.method,
+                    "percorso": request.path,
+                    "vista": request.resolver_match.view_name if request.resolver_match else None,
+                    "stato": response.status_code,
+                    "durata_ms": round(durata_ms, 1),
+                    "db_ms": round(misure.db_ms, 1),
+                    "query": misure.query,
+                    "template_ms": round(misure.template_ms, 1),
+                    "cache_hit": misure.cache_hit,
+                    "cache_miss": misure.cache_miss,
+                    "sql_lente": [
+                        {"ms": round(ms, 1), "sql": sql[: self.LUNGHEZZA_SQL]}
+                        for ms, sql in misure.sql_lente(settings.RICHIESTE_LENTE_SQL)
+                    ],
+                },
+                ensure_ascii=False,
+            )
+        )
+
+
+class ProfilerMiddleware:
+    """
+    Profilo su richiesta per lo staff: con ?profila=1 (o l'header
+    X-Profila: 1) la richiesta viene eseguita sotto cProfile e con il log
+    delle query SQL; il risultato viene salvato in PROFILI_DIR (vedi
+    services/profili_service.py) e si scarica dalla dashboard delle
+    richieste (/richieste/profili/).
+
+    Va in fondo a MIDDLEWARE (serve request.user) e senza il parametro non
+    fa altro che un controllo sulla query string.
+    """
+
+    PARAMETRO = "profila"
+    HEADER = "HTTP_X_PROFILA"
+
+    # Caratteri riportati per i parametri di ogni query
+    LUNGHEZZA_PARAMETRI = 300
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if self.PARAMETRO not in request.META.get("QUERY_STRING", "") and self.HEADER not in request.META:
+            return self.get_response(request)
+        if not (request.GET.get(self.PARAMETRO) or request.META.get(self.HEADER)) or not request.user.is_staff:
+            return self.get_response(request)
+        return self.profila(request)
+
+    def profila(self, request):
+        query = []
+
+        def registra_sql(execute, sql, params, many, context):
+            inizio = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                query.append(
+                    {
+                        "ms": round((time.perf_counter() - inizio) * 1000, 2),
+                        "sql": sql,
+                        "parametri": repr(params)[: self.LUNGHEZZA_PARAMETRI],
+                    }
+                )
+
+        profiler = cProfile.Profile()
+        inizio = time.perf_counter()
+        with ExitStack() as stack:
+            for connessione in connections.all():
+                stack.enter_context(connessione.execute_wrapper(registra_sql))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        durata_ms = (time.perf_counter() - inizio) * 1000
+
+        nome = salva_profilo(
+            profiler,
+            {
+                "metodo": request.method,
+                "percorso": request.get_full_path(),
+                "vista": request.resolver_match.view_name if request.resolver_match else None,
+                "utente": request.user.get_username(),
+                "stato": response.status_code,
+                "durata_ms": round(durata_ms, 1),
+                "query": len(query),
+                "db_ms": round(sum(voce["ms"] for voce in query), 1),
+                "sql": query,
+            },
+        )
+        response["X-Profilo"] = nome
+        add_never_cache_headers(response)
+        return response
+
+
 class SecurityHeadersMiddleware:
     """
     Middleware per aggiungere header di sicurezza alle risposte
@@ -116,3 +294,95 @@ class SecurityHeadersMiddleware:
         # )
 
         return response
+
+
+class MicroCacheMiddleware:
+    """
+    Middleware che indica a nginx quali risposte può tenere nella micro-cache
+    (vedi services/micro_cache_service.py).
+
+    Solo GET/HEAD anonime con stato 200 o 404, senza cookie impostati e senza
+    Cache-Control private/no-store ricevono X-Accel-Expires. La lingua
+    dipende solo dal prefisso dell'URL, quindi l'unico Vary ammesso è
+    Accept-Language (nginx lo ignora).
+    """
+
+    STATI_CACHEABILI = (200, 404)
+    VARY_AMMESSI = {"accept-language"}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if self.cacheabile(request, response):
+            nome_url = request.resolver_match.url_name if request.resolver_match else None
+            response.headers.setdefault("X-Accel-Expires", str(settings.MICRO_CACHE_TIMEOUT))
+            response.headers.setdefault("X-Cache-Tags", " ".join(chiavi_surrogate(nome_url)))
+        return response
+
+    def cacheabile(self, request, response):
+        if settings.MICRO_CACHE_TIMEOUT <= 0:
+            return False
+        if request.method not in ("GET", "HEAD") or response.status_code not in self.STATI_CACHEABILI:
+            return False
+        if request.path.startswith(settings.MICRO_CACHE_PERCORSI_ESCLUSI):
+            return False
+        if response.cookies or response.streaming:
+            return False
+        cache_control = response.get("Cache-Control", "").lower()
+        if "private" in cache_control or "no-store" in cache_control:
+            return False
+        vary = {v.strip().lower() for v in cc_delim_re.split(response.get("Vary", "")) if v.strip()}
+        return vary <= self.VARY_AMMESSI
+
+
+class ReplicaMiddleware:
+    """
+    Middleware che manda sulle repliche le letture delle pagine pubbliche
+    (vedi router_database.py); senza repliche configurate non fa nulla.
+
+    Restano sul primario:
+    - i metodi diversi da GET/HEAD e i percorsi in REPLICA_PERCORSI_ESCLUSI
+      (admin, dashboard delle richieste, health check, metriche)
+    - le richieste con il cookie COOKIE, impostato dopo ogni POST per
+      REPLICA_PRIMARIO_SECONDI: chi ha appena salvato dall'admin o inviato
+      il modulo di contatto vede le sue modifiche anche se la replica è in
+      ritardo (nginx non usa la micro-cache per queste richieste)
+    - gli aggiornamenti della micro-cache inviati da Django (header
+      X-Leggi-Primario), che seguono subito un salvataggio
+    """
+
+    COOKIE = "leggi_primario"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICHE:
+            return self.get_response(request)
+
+        if self.da_replica(request):
+            with lettura_da_replica():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            response.set_cookie(
+                self.COOKIE,
+                "1",
+                max_age=settings.REPLICA_PRIMARIO_SECONDI,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def da_replica(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and not request.path.startswith(settings.REPLICA_PERCORSI_ESCLUSI)
+            and self.COOKIE not in request.COOKIES
+            and "X-Leggi-Primario" not in request.headers
+        )
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:14
+
+from django.db import migrations, models
+
+from parco_verismo.utils.geometry import calcola_geometria
+
+
+def calcola_geometria_esistenti(apps, schema_editor):
+    Itinerario = apps.get_model('parco_verismo', 'Itinerario')
+    for itinerario in Itinerario.objects.all():
+        geometria = calcola_geometria(itinerario.coordinate_tappe)
+        itinerario.centro_mappa = geometria['centro']
+        itinerario.bbox_mappa = geometria['bbox']
+        itinerario.lunghezza_percorso = geometria['lunghezza']
+        itinerario.durata_percorso = geometria['durata']
+        itinerario.tratte_stimate = geometria['tratte']
+        itinerario.save(update_fields=[
+            'centro_mappa', 'bbox_mappa', 'lunghezza_percorso', 'durata_percorso', 'tratte_stimate',
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parco_verismo', '0017_remove_itinerario_icona_percorso_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itinerario',
+            name='bbox_mappa',
+            field=models.JSONField(blank=True, editable=False, help_text='Bounding box delle tappe [[lat_min, lng_min], [lat_max, lng_max]]', null=True),
+        ),
+        migrations.AddField(
+            model_name='itinerario',
+            name='centro_mappa',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Centro geografico delle tappe [lat, lng]'),
+        ),
+        migrations.AddField(
+            model_name='itinerario',
+            name='durata_percorso',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Durata stimata a piedi in secondi'),
+        ),
+        migrations.AddField(
+            model_name='itinerario',
+            name='lunghezza_percorso',
+            field=models.FloatField(default=0, editable=False, help_text='Lunghezza totale in metri (distanza haversine tra tappe consecutive)'),
+        ),
+        migrations.AddField(
+            model_name='itinerario',
+            name='tratte_stimate',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Distanza (m) e durata (s) stimate per ogni tratta'),
+        ),
+        migrations.RunPython(calcola_geometria_esistenti, migrations.RunPython.noop),
+    ]
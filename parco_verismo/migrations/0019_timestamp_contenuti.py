@@ -0,0 +1,65 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Per i contenuti esistenti la data di modifica parte da quella di
+# pubblicazione, quando disponibile (lastmod realistico nelle sitemap)
+DATE_INIZIALI = {
+    'documento': 'data_pubblicazione',
+    'notizia': 'data_pubblicazione',
+    'fotoarchivio': 'data_aggiunta',
+}
+
+
+def imposta_date_iniziali(apps, schema_editor):
+    for modello, campo in DATE_INIZIALI.items():
+        Modello = apps.get_model('parco_verismo', modello)
+        Modello.objects.update(updated_at=models.F(campo))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parco_verismo', '0018_itinerario_geometria'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='autore',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Ultima modifica'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Ultima modifica'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Ultima modifica'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='fotoarchivio',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Ultima modifica'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='notizia',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Ultima modifica'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='opera',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Ultima modifica'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(imposta_date_iniziali, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parco_verismo', '0019_timestamp_contenuti'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventodocumento',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Ultima modifica'),
+        ),
+        migrations.AddField(
+            model_name='eventoimage',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Ultima modifica'),
+        ),
+        migrations.AddField(
+            model_name='itinerarioimmagine',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Ultima modifica'),
+        ),
+        migrations.AddField(
+            model_name='notiziadocumento',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Ultima modifica'),
+        ),
+        migrations.AddField(
+            model_name='notiziaimage',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Ultima modifica'),
+        ),
+    ]
@@ -9,9 +9,11 @@ from django.utils.text import slugify
 # Third-party imports
 from parler.models import TranslatableModel, TranslatedFields
 from parco_verismo.utils.image_optimizer import optimize_image
+from parco_verismo.utils.mixins import TimestampMixin
+from .managers import TraduzioniManager
 
 
-class Autore(models.Model):
+class Autore(TimestampMixin, models.Model):
     nome = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True, blank=True, help_text="Lascia vuoto per generare automaticamente dal nome.")
     # ... puoi aggiungere biografia, foto, etc.
@@ -36,7 +38,7 @@ class Autore(models.Model):
         verbose_name_plural = "Autori"
 
 
-class Opera(TranslatableModel):
+class Opera(TranslatableModel, TimestampMixin):
     autore = models.ForeignKey(Autore, on_delete=models.PROTECT, related_name='opere')
     slug = models.SlugField(max_length=200, unique=True, blank=True, help_text="Lascia vuoto per generare automaticamente dal titolo.")
     anno_pubblicazione = models.IntegerField(null=True, blank=True, verbose_name="Anno di pubblicazione")
@@ -50,6 +52,8 @@ class Opera(TranslatableModel):
         analisi=models.TextField(blank=True, null=True, help_text="Spunti di analisi o contesto storico.", verbose_name="Analisi e contesto"),
     )
 
+    objects = TraduzioniManager()
+
     class Meta:
         ordering = ['anno_pubblicazione', 'slug']
         verbose_name = "Opera"
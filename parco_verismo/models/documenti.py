@@ -10,9 +10,11 @@ from django.utils.text import slugify
 # Third-party imports
 from parler.models import TranslatableModel, TranslatedFields
 from parco_verismo.utils.image_optimizer import optimize_image
+from parco_verismo.utils.mixins import TimestampMixin
+from .managers import TraduzioniManager
 
 
-class Documento(TranslatableModel):
+class Documento(TranslatableModel, TimestampMixin):
     """
     Modello per documenti e studi pubblicati dal Parco Letterario.
     Solo gli admin possono creare e modificare questi documenti.
@@ -71,6 +73,8 @@ class Documento(TranslatableModel):
         ),
     )
 
+    objects = TraduzioniManager()
+
     class Meta:
         ordering = ["-data_pubblicazione"]
         verbose_name = "Documento"
@@ -105,7 +109,7 @@ class Documento(TranslatableModel):
         return reverse("documento_detail", kwargs={"slug": self.slug})
 
 
-class FotoArchivio(TranslatableModel):
+class FotoArchivio(TranslatableModel, TimestampMixin):
     """
     Modello per le foto dell'archivio fotografico.
     Solo gli admin possono aggiungere foto.
@@ -154,6 +158,8 @@ class FotoArchivio(TranslatableModel):
         ),
     )
 
+    objects = TraduzioniManager()
+
     class Meta:
         ordering = ["ordine", "-data_aggiunta"]
         verbose_name = "Foto Archivio"
@@ -10,9 +10,11 @@ from django.utils.text import slugify
 # Third-party imports
 from parler.models import TranslatableModel, TranslatedFields
 from parco_verismo.utils.image_optimizer import optimize_image
+from parco_verismo.utils.mixins import TimestampMixin
+from .managers import TraduzioniManager
 
 
-class Evento(TranslatableModel):
+class Evento(TranslatableModel, TimestampMixin):
     slug = models.SlugField(max_length=200, unique=True, blank=True, help_text="Lascia vuoto per generare automaticamente dal titolo.")
     data_inizio = models.DateTimeField(help_text="Data e ora di inizio dell'evento.")
     data_fine = models.DateTimeField(
@@ -39,6 +41,8 @@ class Evento(TranslatableModel):
         ),
     )
 
+    objects = TraduzioniManager()
+
     class Meta:
         ordering = ["-data_inizio"]
         verbose_name = "Evento"
@@ -79,7 +83,7 @@ class Evento(TranslatableModel):
         return self.data_inizio < timezone.now()
 
 
-class Notizia(TranslatableModel):
+class Notizia(TranslatableModel, TimestampMixin):
     slug = models.SlugField(max_length=200, unique=True, blank=True, help_text="Lascia vuoto per generare automaticamente dal titolo.")
     data_pubblicazione = models.DateTimeField(auto_now_add=True)
     immagine = models.ImageField(
@@ -100,6 +104,8 @@ class Notizia(TranslatableModel):
         ),
     )
 
+    objects = TraduzioniManager()
+
     class Meta:
         ordering = ["-data_pubblicazione"]
         verbose_name = "Notizia"
@@ -134,7 +140,7 @@ class Notizia(TranslatableModel):
         return reverse("notizia_detail", kwargs={"slug": self.slug})
 
 
-class EventoImage(models.Model):
+class EventoImage(TimestampMixin, models.Model):
     evento = models.ForeignKey(Evento, related_name='additional_images', on_delete=models.CASCADE)
     immagine = models.ImageField(upload_to="eventi/gallery/")
     didascalia = models.CharField(max_length=200, blank=True, null=True)
@@ -156,7 +162,7 @@ class EventoImage(models.Model):
         super().save(*args, **kwargs)
 
 
-class NotiziaImage(models.Model):
+class NotiziaImage(TimestampMixin, models.Model):
     notizia = models.ForeignKey(Notizia, related_name='additional_images', on_delete=models.CASCADE)
     immagine = models.ImageField(upload_to="notizie/gallery/")
     didascalia = models.CharField(max_length=200, blank=True, null=True)
@@ -178,7 +184,7 @@ class NotiziaImage(models.Model):
         super().save(*args, **kwargs)
 
 
-class EventoDocumento(models.Model):
+class EventoDocumento(TimestampMixin, models.Model):
     evento = models.ForeignKey(Evento, related_name='documenti', on_delete=models.CASCADE)
     file = models.FileField(upload_to="eventi/documenti/")
     titolo = models.CharField(max_length=200, help_text="Titolo descrittivo del documento")
@@ -193,7 +199,7 @@ class EventoDocumento(models.Model):
         return self.titolo
 
 
-class NotiziaDocumento(models.Model):
+class NotiziaDocumento(TimestampMixin, models.Model):
     notizia = models.ForeignKey(Notizia, related_name='documenti', on_delete=models.CASCADE)
     file = models.FileField(upload_to="notizie/documenti/")
     titolo = models.CharField(max_length=200, help_text="Titolo descrittivo del documento")
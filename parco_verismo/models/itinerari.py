@@ -10,6 +10,9 @@ from django.utils.text import slugify
 # Third-party imports
 from parler.models import TranslatableModel, TranslatedFields
 from parco_verismo.utils.image_optimizer import optimize_image
+from parco_verismo.utils.geometry import calcola_geometria, tappe_ordinate
+from parco_verismo.utils.mixins import TimestampMixin
+from .managers import TraduzioniManager
 
 
 class Itinerario(TranslatableModel):
@@ -84,6 +87,40 @@ class Itinerario(TranslatableModel):
         help_text="Percorsi stradali pre-calcolati tra le tappe (generati automaticamente)"
     )
     
+    # Geometria calcolata automaticamente al salvataggio (vedi utils/geometry.py)
+    centro_mappa = models.JSONField(
+        default=list,
+        blank=True,
+        editable=False,
+        help_text="Centro geografico delle tappe [lat, lng]"
+    )
+    
+    bbox_mappa = models.JSONField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Bounding box delle tappe [[lat_min, lng_min], [lat_max, lng_max]]"
+    )
+    
+    lunghezza_percorso = models.FloatField(
+        default=0,
+        editable=False,
+        help_text="Lunghezza totale in metri (distanza haversine tra tappe consecutive)"
+    )
+    
+    durata_percorso = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Durata stimata a piedi in secondi"
+    )
+    
+    tratte_stimate = models.JSONField(
+        default=list,
+        blank=True,
+        editable=False,
+        help_text="Distanza (m) e durata (s) stimate per ogni tratta"
+    )
+    
     colore_percorso = models.CharField(
         max_length=7,
         default="#4A6741",
@@ -123,6 +160,8 @@ class Itinerario(TranslatableModel):
         )
     )
     
+    objects = TraduzioniManager()
+
     class Meta:
         ordering = ["tipo", "ordine"]
         verbose_name = "Itinerario"
@@ -158,31 +197,54 @@ class Itinerario(TranslatableModel):
                 # Se l'oggetto è nuovo
                 self.immagine = optimize_image(self.immagine)
 
+        # Ricalcola la geometria una sola volta per salvataggio
+        self.aggiorna_geometria()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "coordinate_tappe" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | set(self.CAMPI_GEOMETRIA)
+
         super().save(*args, **kwargs)
 
+    CAMPI_GEOMETRIA = (
+        "centro_mappa",
+        "bbox_mappa",
+        "lunghezza_percorso",
+        "durata_percorso",
+        "tratte_stimate",
+    )
+
+    def aggiorna_geometria(self):
+        """Calcola centro, bounding box, lunghezza e durate delle tappe"""
+        geometria = calcola_geometria(self.coordinate_tappe)
+        self.centro_mappa = geometria["centro"]
+        self.bbox_mappa = geometria["bbox"]
+        self.lunghezza_percorso = geometria["lunghezza"]
+        self.durata_percorso = geometria["durata"]
+        self.tratte_stimate = geometria["tratte"]
+
     def get_absolute_url(self):
         """Return the detail URL for this itinerario."""
         return reverse("itinerario_detail", kwargs={"slug": self.slug})
     
     def get_centro_mappa(self):
-        """Calcola il centro geografico delle tappe per centrare la mappa"""
-        if not self.coordinate_tappe or not isinstance(self.coordinate_tappe, list):
-            return [37.5, 14.7]  # Centro Sicilia default
-        
-        lats = [tappa['coords'][0] for tappa in self.coordinate_tappe if 'coords' in tappa and len(tappa['coords']) >= 2]
-        lngs = [tappa['coords'][1] for tappa in self.coordinate_tappe if 'coords' in tappa and len(tappa['coords']) >= 2]
-        
-        if not lats or not lngs:
-            return [37.5, 14.7]
-        
-        return [sum(lats) / len(lats), sum(lngs) / len(lngs)]
+        """Restituisce il centro geografico delle tappe (calcolato al salvataggio)"""
+        if not self.centro_mappa:
+            self.aggiorna_geometria()
+        return self.centro_mappa
     
     def get_tappe_ordinate(self):
         """Restituisce le tappe ordinate per campo 'order'"""
-        if not self.coordinate_tappe or not isinstance(self.coordinate_tappe, list):
-            return []
-        
-        return sorted(self.coordinate_tappe, key=lambda x: x.get('order', 0))
+        return tappe_ordinate(self.coordinate_tappe)
+    
+    @property
+    def lunghezza_km(self):
+        """Lunghezza del percorso in chilometri"""
+        return round(self.lunghezza_percorso / 1000, 1)
+    
+    @property
+    def durata_minuti(self):
+        """Durata stimata a piedi in minuti"""
+        return round(self.durata_percorso / 60)
     
     def get_numero_tappe(self):
         """Restituisce il numero di tappe"""
@@ -191,7 +253,7 @@ class Itinerario(TranslatableModel):
         return len(self.coordinate_tappe)
 
 
-class ItinerarioImmagine(models.Model):
+class ItinerarioImmagine(TimestampMixin, models.Model):
     """
     Modello per le immagini della galleria di un itinerario.
     """
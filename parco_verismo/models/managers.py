@@ -0,0 +1,36 @@
+"""
+Manager e QuerySet condivisi dai modelli traducibili.
+"""
+
+# Django imports
+from django.db.models import Prefetch
+
+# Third-party imports
+from parler.managers import TranslatableManager, TranslatableQuerySet
+from parler.utils.i18n import get_active_language_choices
+
+
+class TraduzioniQuerySet(TranslatableQuerySet):
+    """QuerySet traducibile con il precaricamento delle traduzioni."""
+
+    def with_translations(self, language_code=None):
+        """
+        Precarica con una sola query le traduzioni della lingua attiva e
+        della lingua di fallback.
+
+        Senza, parler legge le traduzioni una riga alla volta (una query
+        per oggetto, due se manca la lingua attiva) quando un elenco
+        accede a titolo, descrizione, ecc.
+
+        Args:
+            language_code: Lingua da precaricare (default la lingua attiva)
+        """
+        meta = self.model._parler_meta.root
+        lingue = get_active_language_choices(language_code or self._language)
+        return self.prefetch_related(
+            Prefetch(meta.rel_name, queryset=meta.model.objects.filter(language_code__in=lingue))
+        )
+
+
+class TraduzioniManager(TranslatableManager.from_queryset(TraduzioniQuerySet)):
+    """Manager dei modelli traducibili (espone with_translations())."""
@@ -0,0 +1,64 @@
+"""
+Router del database: scritture sul primario, letture delle pagine pubbliche
+sulle repliche (settings.DATABASE_REPLICHE).
+
+Le letture vanno su una replica solo dentro lettura_da_replica(), aperto da
+ReplicaMiddleware per le GET pubbliche. Tutto il resto (admin, dashboard
+delle richieste, POST del modulo di contatto, comandi di gestione, signal
+fuori dalle richieste) legge e scrive sul primario. Senza repliche
+configurate il router manda tutto su "default".
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica = ContextVar("lettura_da_replica", default=False)
+
+
+@contextmanager
+def lettura_da_replica():
+    """Le letture del blocco vanno su una replica (se configurata)."""
+    token = _replica.set(True)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+@contextmanager
+def lettura_da_primario():
+    """Le letture del blocco vanno sul primario (anche dentro lettura_da_replica)."""
+    token = _replica.set(False)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class RouterReplica:
+    """Router di settings.DATABASE_ROUTERS."""
+
+    def db_for_read(self, model, **hints):
+        repliche = settings.DATABASE_REPLICHE
+        # Dentro una transazione sul primario si legge quello che si è appena scritto
+        if not repliche or not _replica.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(repliche)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario e repliche contengono gli stessi dati
+        database = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICHE}
+        if obj1._state.db in database and obj2._state.db in database:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Le repliche ricevono lo schema dalla replica del database, non da migrate
+        return db == DEFAULT_DB_ALIAS
@@ -16,6 +16,10 @@ from .stats_service import (
     get_stats_richieste,
     get_stats_contenuti,
 )
+from .planner_service import (
+    get_tappe_disponibili,
+    pianifica_percorso,
+)
 
 __all__ = [
     # Email
@@ -29,4 +33,7 @@ __all__ = [
     # Statistiche
     "get_stats_richieste",
     "get_stats_contenuti",
+    # Pianificatore itinerari
+    "get_tappe_disponibili",
+    "pianifica_percorso",
 ]
@@ -0,0 +1,38 @@
+"""
+Versioni delle sezioni di contenuto per la cache.
+
+Ogni sezione (opere, autori, eventi, notizie, documenti, itinerari) ha una
+versione salvata in cache: i signal dei modelli la cambiano ad ogni
+salvataggio o eliminazione. Le chiavi di cache che includono la versione
+(XML delle sitemap, HTML delle pagine condivise) diventano così obsolete
+senza doverle cercare ed eliminare una per una.
+
+Con una cache condivisa (Redis, Memcached) l'invalidazione vale subito per
+tutti i worker; con LocMemCache gli altri worker si allineano alla scadenza
+delle rispettive chiavi.
+"""
+
+import time
+
+from django.core.cache import cache
+
+
+def _chiave_versione(sezione):
+    return f"contenuti:versione:{sezione}"
+
+
+def versione_sezione(sezione):
+    """Versione corrente di una sezione (creata al primo utilizzo)."""
+    return cache.get_or_set(_chiave_versione(sezione), time.time_ns, None)
+
+
+def versioni_sezioni(sezioni):
+    """Stringa con le versioni delle sezioni indicate, da usare nelle chiavi di cache."""
+    return "|".join(f"{sezione}:{versione_sezione(sezione)}" for sezione in sezioni)
+
+
+def invalida_sezioni(sezioni):
+    """Cambia la versione delle sezioni indicate (es. dopo un salvataggio)."""
+    # Un timestamp, non un contatore: se la chiave viene espulsa dalla cache
+    # la nuova versione non può coincidere con una già usata
+    cache.set_many({_chiave_versione(sezione): time.time_ns() for sezione in sezioni}, None)
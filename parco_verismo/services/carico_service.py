@@ -0,0 +1,326 @@
+"""
+Servizi per il test di carico HTTP (comando benchmark_carico).
+
+Un client HTTP/1.1 asincrono minimo (asyncio, keep-alive, risposte con
+Content-Length o chunked) simula un numero fisso di visitatori che
+richiedono in parallelo un mix pesato di rotte. Per ogni rotta vengono
+calcolati throughput e percentili della latenza (p50/p95/p99); due
+rapporti si possono confrontare per trovare le regressioni tra release.
+
+Non dipende da Django: le rotte (URL e pesi) le prepara il comando.
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+from urllib.parse import urlencode, urlsplit
+
+# Percentili riportati per ogni rotta
+PERCENTILI = (50, 95, 99)
+
+# Timeout di una singola richiesta (secondi)
+TIMEOUT_RICHIESTA = 30
+
+
+class ErroreHTTP(Exception):
+    """Risposta non valida o connessione chiusa dal server."""
+
+
+class ClientHTTP:
+    """
+    Connessione HTTP/1.1 persistente verso un server (un visitatore).
+
+    Le richieste hanno sempre X-Forwarded-Proto: https (come dietro nginx)
+    e un X-Forwarded-For diverso per visitatore: il rate limiting per IP
+    di SimpleRateLimitMiddleware bloccherebbe un singolo client.
+    """
+
+    def __init__(self, base_url, host, ip):
+        parti = urlsplit(base_url)
+        self.indirizzo = parti.hostname
+        self.porta = parti.port or 80
+        self.host = host
+        self.ip = ip
+        self.cookie = {}
+        self._reader = self._writer = None
+
+    async def chiudi(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    async def richiesta(self, metodo, percorso, corpo=None, headers=None):
+        """
+        Esegue una richiesta e legge tutta la risposta.
+
+        Args:
+            metodo: GET o POST
+            percorso: Percorso con query string
+            corpo: Dict dei campi del form (POST)
+            headers: Header aggiuntivi
+
+        Returns:
+            Tupla (stato, header in minuscolo, corpo in byte)
+        """
+        try:
+            return await asyncio.wait_for(self._richiesta(metodo, percorso, corpo, headers), TIMEOUT_RICHIESTA)
+        except BaseException:
+            # Connessione in uno stato sconosciuto: la prossima richiesta ne apre una nuova
+            await self.chiudi()
+            raise
+
+    async def _richiesta(self, metodo, percorso, corpo, headers):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.indirizzo, self.porta)
+
+        dati = urlencode(corpo).encode() if corpo is not None else b""
+        righe = [
+            f"{metodo} {percorso} HTTP/1.1",
+            f"Host: {self.host}",
+            "Connection: keep-alive",
+            "Accept-Encoding: gzip",
+            "X-Forwarded-Proto: https",
+            f"X-Forwarded-For: {self.ip}",
+        ]
+        if self.cookie:
+            righe.append("Cookie: " + "; ".join(f"{nome}={valore}" for nome, valore in self.cookie.items()))
+        if corpo is not None:
+            righe += ["Content-Type: application/x-www-form-urlencoded", f"Content-Length: {len(dati)}"]
+        righe += [f"{nome}: {valore}" for nome, valore in (headers or {}).items()]
+        self._writer.write(("\r\n".join(righe) + "\r\n\r\n").encode("latin-1") + dati)
+        await self._writer.drain()
+
+        riga_stato = await self._reader.readline()
+        if not riga_stato:
+            raise ErroreHTTP("connessione chiusa dal server")
+        try:
+            stato = int(riga_stato.split()[1])
+        except (IndexError, ValueError):
+            raise ErroreHTTP(f"riga di stato non valida: {riga_stato[:80]!r}")
+
+        risposta_headers = {}
+        while True:
+            riga = await self._reader.readline()
+            if riga in (b"\r\n", b"\n", b""):
+                break
+            nome, _, valore = riga.decode("latin-1").partition(":")
+            nome, valore = nome.strip().lower(), valore.strip()
+            if nome == "set-cookie":
+                cookie_nome, _, cookie_valore = valore.split(";", 1)[0].partition("=")
+                self.cookie[cookie_nome.strip()] = cookie_valore.strip()
+            risposta_headers[nome] = valore
+
+        if metodo == "HEAD" or stato in (204, 304) or 100 <= stato < 200:
+            contenuto = b""
+        elif risposta_headers.get("transfer-encoding", "").lower() == "chunked":
+            contenuto = await self._leggi_chunked()
+        elif "content-length" in risposta_headers:
+            contenuto = await self._reader.readexactly(int(risposta_headers["content-length"]))
+        else:
+            contenuto = await self._reader.read()
+            await self.chiudi()
+            return stato, risposta_headers, contenuto
+
+        if risposta_headers.get("connection", "").lower() == "close":
+            await self.chiudi()
+        return stato, risposta_headers, contenuto
+
+    async def _leggi_chunked(self):
+        parti = []
+        while True:
+            dimensione = int((await self._reader.readline()).split(b";")[0], 16)
+            if dimensione == 0:
+                # Trailer (di solito vuoto) fino alla riga vuota
+                while (await self._reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(parti)
+            parti.append(await self._reader.readexactly(dimensione))
+            await self._reader.readexactly(2)
+
+
+def percentile(valori_ordinati, p):
+    """Percentile con il metodo nearest-rank (valori già ordinati)."""
+    if not valori_ordinati:
+        return 0.0
+    indice = max(math.ceil(p / 100 * len(valori_ordinati)) - 1, 0)
+    return valori_ordinati[indice]
+
+
+def ip_visitatore(indice):
+    """Indirizzo privato (10.x.y.z) del visitatore simulato numero indice."""
+    return f"10.{(indice >> 16) & 255}.{(indice >> 8) & 255}.{indice & 255}"
+
+
+async def _visitatore(indice, base_url, host, rotte, pesi, seed, inizio_misura, fine, campioni, prepara):
+    """Un visitatore: richiede rotte a caso (secondo i pesi) fino a fine."""
+    rnd = random.Random(seed * 100003 + indice)
+    client = ClientHTTP(base_url, host, ip_visitatore(indice))
+    try:
+        if prepara is not None:
+            await prepara(client)
+        while time.perf_counter() < fine:
+            rotta = rnd.choices(rotte, weights=pesi)[0]
+            metodo, percorso, corpo, headers = rotta["richiesta"](rnd, client)
+            avvio = time.perf_counter()
+            try:
+                stato, _, contenuto = await client.richiesta(metodo, percorso, corpo, headers)
+                errore = None
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ErroreHTTP) as exc:
+                stato, contenuto, errore = 0, b"", type(exc).__name__
+            if avvio >= inizio_misura:
+                campioni.append((rotta["nome"], stato, time.perf_counter() - avvio, len(contenuto), errore))
+    finally:
+        await client.chiudi()
+
+
+async def _esegui(base_url, host, rotte, concorrenza, durata, riscaldamento, seed, prepara):
+    campioni = []
+    adesso = time.perf_counter()
+    inizio_misura = adesso + riscaldamento
+    fine = inizio_misura + durata
+    pesi = [rotta["peso"] for rotta in rotte]
+    await asyncio.gather(
+        *(
+            _visitatore(i, base_url, host, rotte, pesi, seed, inizio_misura, fine, campioni, prepara)
+            for i in range(concorrenza)
+        )
+    )
+    return campioni, time.perf_counter() - inizio_misura
+
+
+def esegui_carico(base_url, host, rotte, concorrenza, durata, riscaldamento=0, seed=0, prepara=None):
+    """
+    Esegue il test di carico.
+
+    Args:
+        base_url: URL del server (es. http://127.0.0.1:8001)
+        host: Header Host delle richieste (uno degli ALLOWED_HOSTS)
+        rotte: Lista di dict con "nome", "peso" e "richiesta", funzione
+            (random.Random, ClientHTTP) -> (metodo, percorso, corpo, headers)
+        concorrenza: Visitatori in parallelo
+        durata: Secondi di misura
+        riscaldamento: Secondi iniziali esclusi dalla misura
+        seed: Seme del generatore casuale (sequenza delle rotte)
+        prepara: Coroutine (ClientHTTP) eseguita da ogni visitatore prima di iniziare
+
+    Returns:
+        Tupla (campioni, secondi effettivi di misura); ogni campione è
+        (rotta, stato, secondi, byte, errore)
+    """
+    return asyncio.run(_esegui(base_url, host, rotte, concorrenza, durata, riscaldamento, seed, prepara))
+
+
+def statistiche(campioni, secondi):
+    """
+    Throughput e latenze per rotta.
+
+    Una risposta 4xx/5xx o un errore di connessione contano come errore.
+
+    Returns:
+        Dict rotta -> statistiche, con la rotta "totale" per tutte le richieste
+    """
+    per_rotta = {}
+    for campione in campioni:
+        per_rotta.setdefault(campione[0], []).append(campione)
+        per_rotta.setdefault("totale", []).append(campione)
+
+    risultato = {}
+    for rotta, righe in sorted(per_rotta.items()):
+        latenze = sorted(durata * 1000 for _, _, durata, _, _ in righe)
+        stati = {}
+        for _, stato, _, _, errore in righe:
+            chiave = errore or str(stato)
+            stati[chiave] = stati.get(chiave, 0) + 1
+        risultato[rotta] = {
+            "richieste": len(righe),
+            "errori": sum(1 for _, stato, _, _, errore in righe if errore or stato >= 400),
+            "stati": stati,
+            "rps": round(len(righe) / secondi, 2) if secondi else 0.0,
+            "media_ms": round(sum(latenze) / len(latenze), 2),
+            **{f"p{p}_ms": round(percentile(latenze, p), 2) for p in PERCENTILI},
+            "max_ms": round(latenze[-1], 2),
+            "byte_medi": round(sum(dimensione for _, _, _, dimensione, _ in righe) / len(righe)),
+        }
+    return risultato
+
+
+def confronta(precedente, attuale, soglia):
+    """
+    Confronta due rapporti (rotte presenti in entrambi).
+
+    Una rotta regredisce se il p95 cresce o il throughput cala più della
+    soglia, o se compaiono errori.
+
+    Args:
+        precedente: Rapporto della release precedente (come scritto in JSON)
+        attuale: Rapporto della release attuale
+        soglia: Variazione tollerata in percentuale
+
+    Returns:
+        Lista di dict per rotta con le variazioni percentuali e "regressione"
+    """
+    def variazione(prima, dopo):
+        return round((dopo - prima) / prima * 100, 1) if prima else 0.0
+
+    righe = []
+    for rotta, dopo in attuale["rotte"].items():
+        prima = precedente["rotte"].get(rotta)
+        if prima is None:
+            continue
+        riga = {
+            "rotta": rotta,
+            "rps": variazione(prima["rps"], dopo["rps"]),
+            **{f"p{p}_ms": variazione(prima[f"p{p}_ms"], dopo[f"p{p}_ms"]) for p in PERCENTILI},
+        }
+        riga["regressione"] = (
+            riga["p95_ms"] > soglia or riga["rps"] < -soglia or (dopo["errori"] > 0 and prima["errori"] == 0)
+        )
+        righe.append(riga)
+    return righe
+
+
+def rapporto_json(rapporto):
+    return json.dumps(rapporto, indent=2, ensure_ascii=False) + "\n"
+
+
+def rapporto_markdown(rapporto, confronto=None, soglia=None):
+    """Rapporto in Markdown (tabella per rotta, più il confronto se presente)."""
+    meta = rapporto["esecuzione"]
+    righe = [
+        f"# Test di carico {meta['data']}",
+        "",
+        f"- Server: {meta['server']}",
+        f"- Versione: {meta.get('versione') or '-'}",
+        f"- Concorrenza: {meta['concorrenza']} visitatori, {meta['durata']}s "
+        f"(+{meta['riscaldamento']}s di riscaldamento), seed {meta['seed']}",
+        "",
+        "| Rotta | Richieste | Errori | Req/s | p50 ms | p95 ms | p99 ms | Max ms | KB medi |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for rotta, s in rapporto["rotte"].items():
+        nome = f"**{rotta}**" if rotta == "totale" else rotta
+        righe.append(
+            f"| {nome} | {s['richieste']} | {s['errori']} | {s['rps']} | {s['p50_ms']} | "
+            f"{s['p95_ms']} | {s['p99_ms']} | {s['max_ms']} | {s['byte_medi'] / 1024:.1f} |"
+        )
+
+    if confronto is not None:
+        righe += [
+            "",
+            f"## Confronto con {rapporto.get('confrontato_con', 'la release precedente')} (soglia {soglia}%)",
+            "",
+            "| Rotta | Req/s | p50 | p95 | p99 | |",
+            "|---|---:|---:|---:|---:|---|",
+        ]
+        for riga in confronto:
+            righe.append(
+                f"| {riga['rotta']} | {riga['rps']:+.1f}% | {riga['p50_ms']:+.1f}% | "
+                f"{riga['p95_ms']:+.1f}% | {riga['p99_ms']:+.1f}% | {'regressione' if riga['regressione'] else ''} |"
+            )
+    return "\n".join(righe) + "\n"
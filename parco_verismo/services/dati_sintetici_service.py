@@ -0,0 +1,346 @@
+"""
+Servizi per generare contenuti sintetici (misure di prestazioni e test di carico).
+
+I contenuti vengono creati con bulk_create a lotti, tradotti in tutte le
+lingue di settings.LANGUAGES, senza passare da save() e dai signal: niente
+ottimizzazione delle immagini né invalidazione delle cache (vedi
+invalida_sezioni). Gli slug hanno il prefisso SLUG_PREFISSO (le richieste
+un'email su DOMINIO_EMAIL) per riconoscerli e rimuoverli con
+elimina_contenuti(). Con lo stesso seed si ottengono sempre gli stessi dati.
+"""
+
+import io
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils import timezone
+
+from ..utils.geometry import VELOCITA_PEDONALE, haversine
+from .planner_service import FATTORE_STRADALE
+
+SLUG_PREFISSO = "sintetico"
+DOMINIO_EMAIL = "sintetico.invalid"
+
+# File segnaposto condivisi da tutti i contenuti sintetici (in MEDIA_ROOT)
+IMMAGINE_SEGNAPOSTO = f"{SLUG_PREFISSO}/segnaposto.jpg"
+PDF_SEGNAPOSTO = f"{SLUG_PREFISSO}/segnaposto.pdf"
+
+# PDF minimo valido di una pagina vuota
+PDF_VUOTO = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+    b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+    b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]>>endobj\n"
+    b"trailer<</Root 1 0 R>>\n%%EOF\n"
+)
+
+# Centro del Parco (Vizzini): le tappe sintetiche vengono generate intorno
+CENTRO_PARCO = (37.1614, 14.7497)
+
+PAROLE = (
+    "verga capuana vizzini mineo licodia malavoglia mastro don gesualdo novella "
+    "giacinta marchese roccaverdina cavalleria rusticana lupa fantasticheria "
+    "verismo sicilia campagna paese contadino pescatore famiglia roba festa "
+    "chiesa piazza mulino masseria strada ricordo lettera fotografia teatro"
+).split()
+
+
+def _testo(rnd, parole):
+    return " ".join(rnd.choice(PAROLE) for _ in range(parole)).capitalize()
+
+
+def _crea_tradotti(modello, righe, traduzioni, lotto):
+    """
+    Crea con bulk_create gli oggetti e le loro traduzioni in ogni lingua.
+
+    Args:
+        modello: Modello traducibile (parler)
+        righe: Oggetti non salvati del modello
+        traduzioni: Funzione (indice, codice lingua) -> dict dei campi tradotti
+        lotto: Righe per ogni INSERT
+    """
+    oggetti = modello.objects.bulk_create(righe, batch_size=lotto)
+    meta = modello._parler_meta.root
+    tradotti = [
+        meta.model(master_id=oggetto.pk, language_code=codice, **traduzioni(indice, codice))
+        for indice, oggetto in enumerate(oggetti)
+        for codice, _ in settings.LANGUAGES
+    ]
+    meta.model.objects.bulk_create(tradotti, batch_size=lotto)
+    return oggetti
+
+
+def _tappe(rnd, numero):
+    """Tappe casuali entro circa 10 km dal centro del Parco."""
+    lat, lng = CENTRO_PARCO
+    return [
+        {
+            "nome": f"Tappa {indice + 1}",
+            "coords": [round(lat + rnd.uniform(-0.1, 0.1), 6), round(lng + rnd.uniform(-0.1, 0.1), 6)],
+            "descrizione": "",
+            "order": indice + 1,
+        }
+        for indice in range(numero)
+    ]
+
+
+def _percorsi(rnd, tappe, punti):
+    """
+    Percorsi stradali finti tra tappe consecutive, nel formato di
+    calcola_percorsi_itinerari (OSRM): ``punti`` coordinate per tratta.
+    """
+    percorsi = {}
+    for i, (inizio, fine) in enumerate(zip(tappe, tappe[1:])):
+        (lat_a, lng_a), (lat_b, lng_b) = inizio["coords"], fine["coords"]
+        coords = [
+            [
+                round(lat_a + (lat_b - lat_a) * k / (punti - 1) + rnd.uniform(-0.0005, 0.0005), 6),
+                round(lng_a + (lng_b - lng_a) * k / (punti - 1) + rnd.uniform(-0.0005, 0.0005), 6),
+            ]
+            for k in range(punti)
+        ]
+        distanza = float(haversine(inizio["coords"], fine["coords"])) * FATTORE_STRADALE
+        percorsi[f"{i}_{i + 1}"] = {
+            "coords": coords,
+            "distance": round(distanza, 2),
+            "duration": round(distanza / VELOCITA_PEDONALE, 2),
+            "tratteggiato": False,
+            "punti": punti,
+        }
+    return percorsi
+
+
+def crea_segnaposto():
+    """
+    Salva in MEDIA_ROOT l'immagine e il PDF segnaposto (se mancano).
+
+    Returns:
+        Tupla (percorso immagine, percorso PDF) relativi a MEDIA_ROOT
+    """
+    from PIL import Image
+
+    if not default_storage.exists(IMMAGINE_SEGNAPOSTO):
+        buffer = io.BytesIO()
+        Image.new("RGB", (1200, 800), (74, 103, 65)).save(buffer, "JPEG", quality=80)
+        default_storage.save(IMMAGINE_SEGNAPOSTO, ContentFile(buffer.getvalue()))
+    if not default_storage.exists(PDF_SEGNAPOSTO):
+        default_storage.save(PDF_SEGNAPOSTO, ContentFile(PDF_VUOTO))
+    return IMMAGINE_SEGNAPOSTO, PDF_SEGNAPOSTO
+
+
+def genera_contenuti(quantita, seed=0, lotto=500, tappe=(3, 8), punti_tratta=0, segnaposto=False):
+    """
+    Genera contenuti sintetici pubblicati.
+
+    Args:
+        quantita: Dict nome -> numero di oggetti; nomi: autori, opere, eventi,
+            notizie, documenti, fotografie, itinerari, richieste (i mancanti valgono 0)
+        seed: Seme del generatore casuale
+        lotto: Righe per ogni INSERT
+        tappe: Numero minimo e massimo di tappe per itinerario
+        punti_tratta: Punti del percorso stradale finto per tratta (0 = nessuno)
+        segnaposto: Se True immagini e PDF puntano ai file segnaposto
+            (crea_segnaposto), altrimenti restano vuoti
+
+    Returns:
+        Dict nome -> numero di oggetti creati
+    """
+    from ..models import Autore, Documento, Evento, FotoArchivio, Itinerario, Notizia, Opera, Richiesta
+
+    rnd = random.Random(seed)
+    adesso = timezone.now()
+    immagine, pdf = crea_segnaposto() if segnaposto else ("", "")
+    creati = {}
+
+    def titolo(nome, indice, codice):
+        return f"{nome.capitalize()} {indice + 1} ({codice}) {_testo(rnd, 3)}"
+
+    def slug(nome, indice):
+        return f"{SLUG_PREFISSO}-{seed}-{nome}-{indice + 1}"
+
+    n = quantita.get("autori", 0) or (1 if quantita.get("opere") else 0)
+    autori = Autore.objects.bulk_create(
+        [Autore(nome=f"Autore sintetico {seed}-{i + 1}", slug=slug("autore", i)) for i in range(n)],
+        batch_size=lotto,
+    )
+    creati["autori"] = len(autori)
+
+    n = quantita.get("opere", 0)
+    creati["opere"] = len(_crea_tradotti(
+        Opera,
+        [
+            Opera(
+                autore=autori[i % len(autori)],
+                slug=slug("opera", i),
+                anno_pubblicazione=rnd.randint(1860, 1920),
+                link_wikisource="https://it.wikisource.org/",
+                copertina=immagine,
+            )
+            for i in range(n)
+        ],
+        lambda i, codice: {
+            "titolo": titolo("opera", i, codice),
+            "breve_descrizione": _testo(rnd, 20),
+            "trama": _testo(rnd, 120),
+            "analisi": _testo(rnd, 80),
+        },
+        lotto,
+    ))
+
+    n = quantita.get("eventi", 0)
+    creati["eventi"] = len(_crea_tradotti(
+        Evento,
+        [
+            # Eventi passati e futuri (entro un anno)
+            Evento(
+                slug=slug("evento", i),
+                data_inizio=adesso + timedelta(days=rnd.randint(-365, 365), hours=rnd.randint(0, 23)),
+                immagine=immagine,
+                is_active=True,
+            )
+            for i in range(n)
+        ],
+        lambda i, codice: {
+            "titolo": titolo("evento", i, codice),
+            "descrizione": _testo(rnd, 150),
+            "luogo": rnd.choice(("Vizzini", "Mineo", "Licodia Eubea")),
+            "indirizzo": "",
+        },
+        lotto,
+    ))
+
+    n = quantita.get("notizie", 0)
+    creati["notizie"] = len(_crea_tradotti(
+        Notizia,
+        [Notizia(slug=slug("notizia", i), immagine=immagine, is_active=True) for i in range(n)],
+        lambda i, codice: {
+            "titolo": titolo("notizia", i, codice),
+            "contenuto": _testo(rnd, 300),
+            "riassunto": _testo(rnd, 30),
+        },
+        lotto,
+    ))
+
+    n = quantita.get("documenti", 0)
+    creati["documenti"] = len(_crea_tradotti(
+        Documento,
+        [
+            Documento(
+                slug=slug("documento", i),
+                anno_pubblicazione=rnd.randint(1950, 2024),
+                pdf_file=pdf or f"documenti/{slug('documento', i)}.pdf",
+                anteprima=immagine,
+                is_active=True,
+                autori=_testo(rnd, 2),
+            )
+            for i in range(n)
+        ],
+        lambda i, codice: {
+            "titolo": titolo("documento", i, codice),
+            "descrizione": _testo(rnd, 80),
+            "riassunto": _testo(rnd, 40),
+            "parole_chiave": ", ".join(rnd.sample(PAROLE, 4)),
+        },
+        lotto,
+    ))
+
+    n = quantita.get("fotografie", 0)
+    creati["fotografie"] = len(_crea_tradotti(
+        FotoArchivio,
+        [
+            FotoArchivio(
+                # Senza slug: il nome del file identifica le foto sintetiche
+                immagine=immagine or f"archivio_fotografico/{slug('foto', i)}.jpg",
+                ordine=i,
+                is_active=True,
+                autore=rnd.choice(("VERGA", "CAPUANA", "ALTRO")),
+            )
+            for i in range(n)
+        ],
+        lambda i, codice: {"titolo": titolo("fotografia", i, codice), "descrizione": _testo(rnd, 20)},
+        lotto,
+    ))
+
+    n = quantita.get("itinerari", 0)
+    itinerari = []
+    for i in range(n):
+        coordinate_tappe = _tappe(rnd, rnd.randint(*tappe))
+        itinerario = Itinerario(
+            slug=slug("itinerario", i),
+            tipo=("verghiano", "capuaniano", "tematico")[i % 3],
+            ordine=i + 1,
+            immagine=immagine,
+            coordinate_tappe=coordinate_tappe,
+            percorsi_calcolati=_percorsi(rnd, coordinate_tappe, punti_tratta) if punti_tratta > 1 else {},
+            is_active=True,
+        )
+        # Come Itinerario.save(): la geometria viene calcolata al salvataggio
+        itinerario.aggiorna_geometria()
+        itinerari.append(itinerario)
+    creati["itinerari"] = len(_crea_tradotti(
+        Itinerario,
+        itinerari,
+        lambda i, codice: {
+            "titolo": titolo("itinerario", i, codice),
+            "descrizione": _testo(rnd, 100),
+            "note": "",
+        },
+        lotto,
+    ))
+
+    n = quantita.get("richieste", 0)
+    stati = [codice for codice, _ in Richiesta.STATO_CHOICES]
+    priorita = [codice for codice, _ in Richiesta.PRIORITA_CHOICES]
+    creati["richieste"] = len(Richiesta.objects.bulk_create(
+        [
+            Richiesta(
+                nome=rnd.choice(("Giovanni", "Luigi", "Maria", "Rosa", "Turi", "Nedda")),
+                cognome=rnd.choice(("Verga", "Capuana", "Malavoglia", "Trao", "Motta")),
+                email=f"richiesta{seed}-{i + 1}@{DOMINIO_EMAIL}",
+                messaggio=_testo(rnd, 60),
+                stato=rnd.choice(stati),
+                priorita=rnd.choice(priorita),
+                oggetto=_testo(rnd, 5),
+            )
+            for i in range(n)
+        ],
+        batch_size=lotto,
+    ))
+
+    return creati
+
+
+def _elimina(queryset):
+    """Elimina il queryset e restituisce il numero di oggetti del modello (senza le traduzioni)."""
+    return queryset.delete()[1].get(queryset.model._meta.label, 0)
+
+
+def elimina_contenuti():
+    """
+    Elimina tutti i contenuti sintetici (di qualsiasi seed).
+
+    Usa delete() del QuerySet: con i signal collegati parte un post_delete
+    per oggetto, quindi va chiamata dentro signals.signal_sospesi().
+
+    Returns:
+        Dict nome -> numero di oggetti eliminati
+    """
+    from ..models import Autore, Documento, Evento, FotoArchivio, Itinerario, Notizia, Opera, Richiesta
+
+    prefisso = f"{SLUG_PREFISSO}-"
+    return {
+        # Prima le opere: l'autore è protetto (PROTECT)
+        "opere": _elimina(Opera.objects.filter(slug__startswith=prefisso)),
+        "autori": _elimina(Autore.objects.filter(slug__startswith=prefisso)),
+        "eventi": _elimina(Evento.objects.filter(slug__startswith=prefisso)),
+        "notizie": _elimina(Notizia.objects.filter(slug__startswith=prefisso)),
+        "documenti": _elimina(Documento.objects.filter(slug__startswith=prefisso)),
+        "fotografie": _elimina(FotoArchivio.objects.filter(
+            Q(immagine=IMMAGINE_SEGNAPOSTO) | Q(immagine__startswith=f"archivio_fotografico/{prefisso}")
+        )),
+        "itinerari": _elimina(Itinerario.objects.filter(slug__startswith=prefisso)),
+        "richieste": _elimina(Richiesta.objects.filter(email__endswith=f"@{DOMINIO_EMAIL}")),
+    }
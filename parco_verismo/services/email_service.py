@@ -6,6 +6,8 @@ import logging
 from django.core.mail import send_mail
 from django.conf import settings
 
+from ..utils.metriche import cronometro
+
 
 def invia_email_richiesta_confermata(richiesta):
     """
@@ -37,17 +39,18 @@ def invia_email_richiesta_confermata(richiesta):
         Il Team del Parco Letterario Giovanni Verga e Luigi Capuana
         """
 
-        send_mail(
-            subject,
-            message,
-            (
-                settings.DEFAULT_FROM_EMAIL
-                if hasattr(settings, "DEFAULT_FROM_EMAIL")
-                else "noreply@parcovergacapuana.it"
-            ),
-            [richiesta.email],
-            fail_silently=False,
-        )
+        with cronometro("parco_email_invio_secondi", tipo="conferma"):
+            send_mail(
+                subject,
+                message,
+                (
+                    settings.DEFAULT_FROM_EMAIL
+                    if hasattr(settings, "DEFAULT_FROM_EMAIL")
+                    else "noreply@parcovergacapuana.it"
+                ),
+                [richiesta.email],
+                fail_silently=False,
+            )
 
         return True
     except Exception:
@@ -87,17 +90,18 @@ def invia_notifica_admin_nuova_richiesta(richiesta):
         # TODO: Configurare ADMIN_EMAIL in settings
         admin_email = getattr(settings, "ADMIN_EMAIL", "info@parcovergacapuana.it")
 
-        send_mail(
-            subject,
-            message,
-            (
-                settings.DEFAULT_FROM_EMAIL
-                if hasattr(settings, "DEFAULT_FROM_EMAIL")
-                else "noreply@parcovergacapuana.it"
-            ),
-            [admin_email],
-            fail_silently=False,
-        )
+        with cronometro("parco_email_invio_secondi", tipo="notifica_admin"):
+            send_mail(
+                subject,
+                message,
+                (
+                    settings.DEFAULT_FROM_EMAIL
+                    if hasattr(settings, "DEFAULT_FROM_EMAIL")
+                    else "noreply@parcovergacapuana.it"
+                ),
+                [admin_email],
+                fail_silently=False,
+            )
 
         return True
     except Exception:
@@ -0,0 +1,144 @@
+"""
+Micro-cache di nginx davanti a Gunicorn.
+
+Django decide cosa può stare nella cache di nginx: MicroCacheMiddleware
+aggiunge X-Accel-Expires (durata) e X-Cache-Tags (chiavi surrogate: le
+sezioni di contenuto mostrate dalla pagina) alle risposte anonime e
+cacheabili. nginx ignora Cache-Control/Vary di Django e usa solo
+X-Accel-Expires (nginx/conf.d/default.conf).
+
+nginx open source non ha un comando di purge: quando un contenuto cambia,
+Django richiede di nuovo le pagine delle sezioni coinvolte al server interno
+di nginx (settings.MICRO_CACHE_REFRESH_URL), che scavalca la cache e salva
+la nuova risposta al posto di quella vecchia. Le varianti con query string
+(es. ricerche) scadono da sole dopo settings.MICRO_CACHE_TIMEOUT secondi.
+"""
+
+import logging
+import threading
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.urls import NoReverseMatch, reverse
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+# Pagine (nomi URL senza parametri) che mostrano i contenuti di ogni sezione
+PAGINE_PER_SEZIONE = {
+    "eventi": ("home", "eventi", "calendario", "notizie"),
+    "notizie": ("home", "eventi", "notizie"),
+    "opere": ("biblioteca",),
+    "autori": ("biblioteca",),
+    "documenti": ("documenti",),
+    "itinerari": (
+        "itinerari_verghiani",
+        "itinerari_capuaniani",
+        "itinerari_tematici",
+        "pianifica_itinerario",
+    ),
+    "fotografie": ("verga_capuana_fotografi",),
+}
+
+# Pagine di dettaglio (nome URL -> sezioni mostrate)
+SEZIONI_PAGINE_DETTAGLIO = {
+    "opera_detail": ("opere", "autori"),
+    "opere_per_autore": ("opere", "autori"),
+    "evento_detail": ("eventi",),
+    "notizia_detail": ("notizie",),
+    "documento_detail": ("documenti",),
+    "itinerario_detail": ("itinerari",),
+    "itinerario_dati": ("itinerari",),
+    "itinerario_offline": ("itinerari",),
+}
+
+# Chiave surrogata delle pagine che non mostrano contenuti del database
+TAG_STATICHE = "statiche"
+
+# Richieste di aggiornamento in parallelo verso nginx
+MAX_RICHIESTE_PARALLELE = 4
+
+
+def chiavi_surrogate(nome_url):
+    """Sezioni di contenuto mostrate dalla pagina con il nome URL indicato."""
+    sezioni = set(SEZIONI_PAGINE_DETTAGLIO.get(nome_url, ()))
+    sezioni.update(sezione for sezione, pagine in PAGINE_PER_SEZIONE.items() if nome_url in pagine)
+    return sorted(sezioni) or [TAG_STATICHE]
+
+
+def _percorsi_oggetto(oggetto):
+    """Pagine di dettaglio di un contenuto (nella lingua attiva)."""
+    nome_modello = oggetto._meta.model_name
+    percorsi = []
+    if hasattr(oggetto, "get_absolute_url"):
+        percorsi.append(oggetto.get_absolute_url())
+    if nome_modello == "autore":
+        percorsi.append(reverse("opere_per_autore", kwargs={"autore_slug": oggetto.slug}))
+    elif nome_modello == "opera":
+        percorsi.append(reverse("opere_per_autore", kwargs={"autore_slug": oggetto.autore.slug}))
+    elif nome_modello == "itinerario":
+        percorsi.append(reverse("itinerario_dati", kwargs={"slug": oggetto.slug}))
+        percorsi.append(reverse("itinerario_offline", kwargs={"slug": oggetto.slug}))
+    return percorsi
+
+
+def percorsi_da_aggiornare(sezioni, oggetto=None):
+    """
+    Percorsi (in tutte le lingue) da aggiornare nella micro-cache.
+
+    Args:
+        sezioni: Sezioni di contenuto modificate
+        oggetto: Contenuto salvato o eliminato (per le sue pagine di dettaglio)
+    """
+    percorsi = []
+    for codice, _ in settings.LANGUAGES:
+        with translation.override(codice):
+            for sezione in sezioni:
+                percorsi.extend(reverse(nome) for nome in PAGINE_PER_SEZIONE.get(sezione, ()))
+            if oggetto is not None and getattr(oggetto, "slug", ""):
+                try:
+                    percorsi.extend(_percorsi_oggetto(oggetto))
+                except NoReverseMatch:
+                    pass
+    return list(dict.fromkeys(percorsi))
+
+
+def _aggiorna_percorso(percorso):
+    richiesta = urllib.request.Request(
+        settings.MICRO_CACHE_REFRESH_URL.rstrip("/") + percorso,
+        # Subito dopo un salvataggio: le letture non devono andare su una replica in ritardo
+        headers={"Host": settings.MICRO_CACHE_HOST, "X-Leggi-Primario": "1"},
+    )
+    try:
+        with urllib.request.urlopen(richiesta, timeout=settings.MICRO_CACHE_REFRESH_TIMEOUT) as risposta:
+            risposta.read()
+    except urllib.error.HTTPError:
+        # 404 di un contenuto eliminato: nginx salva anche quella
+        pass
+    except (urllib.error.URLError, TimeoutError, OSError) as e:
+        logger.warning("Aggiornamento micro-cache non riuscito per %s: %s", percorso, e)
+
+
+def aggiorna_micro_cache(percorsi):
+    """
+    Rigenera in background le pagine indicate nella micro-cache di nginx.
+
+    Senza settings.MICRO_CACHE_REFRESH_URL (sviluppo, nessun nginx) non fa nulla.
+    """
+    if not settings.MICRO_CACHE_REFRESH_URL or not percorsi:
+        return
+
+    coda = list(percorsi)
+    lock = threading.Lock()
+
+    def lavora():
+        while True:
+            with lock:
+                if not coda:
+                    return
+                percorso = coda.pop()
+            _aggiorna_percorso(percorso)
+
+    for _ in range(min(MAX_RICHIESTE_PARALLELE, len(coda))):
+        threading.Thread(target=lavora, daemon=True).start()
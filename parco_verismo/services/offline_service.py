@@ -0,0 +1,158 @@
+"""
+Servizi per il service worker e i pacchetti offline degli itinerari.
+
+Il service worker pre-carica le risorse statiche comuni a tutte le pagine
+(quelle incluse da ``base.html``). Ogni itinerario espone inoltre un
+manifest versionato con pagina, dati, immagini e tile della mappa: il
+service worker confronta le revisioni con il manifest già scaricato e
+aggiorna solo le risorse cambiate.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.urls import reverse
+
+from ..utils.static_bundles import file_bundle
+from .tile_service import tile_per_bbox
+
+# Bundle caricati da base.html su ogni pagina (vedi settings.STATIC_BUNDLES)
+BUNDLE_BASE = ["bundles/base.css", "bundles/base.js"]
+
+# Altre risorse statiche condivise (CSS delle pagine itinerario)
+RISORSE_EXTRA = ["css/itinerari.css"]
+
+
+def percorsi_risorse_base():
+    """Percorsi statici da pre-caricare: i bundle (o i loro sorgenti in sviluppo)."""
+    percorsi = []
+    for nome in BUNDLE_BASE:
+        percorsi.extend(file_bundle(nome))
+    return percorsi + RISORSE_EXTRA
+
+
+def _hash(*parti):
+    digest = hashlib.sha256()
+    for parte in parti:
+        digest.update(str(parte).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _hash_file_statico(percorso):
+    """Hash del contenuto di un file statico (stringa vuota se non trovato)."""
+    trovato = finders.find(percorso)
+    if not trovato and staticfiles_storage.exists(percorso):
+        # Bundle generati da collectstatic: esistono solo in STATIC_ROOT
+        trovato = staticfiles_storage.path(percorso)
+    if not trovato:
+        return ""
+    with open(trovato, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def _calcola_risorse_base():
+    risorse = []
+    for percorso in percorsi_risorse_base():
+        url = static(percorso)
+        risorse.append({"url": url, "revisione": _hash_file_statico(percorso)})
+    return risorse
+
+
+@lru_cache(maxsize=1)
+def _risorse_base_cache():
+    return _calcola_risorse_base()
+
+
+def get_risorse_base():
+    """
+    Restituisce le risorse statiche da pre-caricare con la loro revisione.
+
+    In produzione il calcolo (hash dei file) avviene una sola volta per processo.
+    """
+    if settings.DEBUG:
+        return _calcola_risorse_base()
+    return _risorse_base_cache()
+
+
+def versione_service_worker():
+    """Versione del service worker: cambia quando cambia una risorsa statica."""
+    return _hash(*(f"{r['url']}@{r['revisione']}" for r in get_risorse_base()))
+
+
+def _immagini_itinerario(itinerario):
+    """URL della copertina, della galleria e delle immagini delle tappe."""
+    urls = []
+    if itinerario.immagine:
+        urls.append(itinerario.immagine.url)
+    urls.extend(img.immagine.url for img in itinerario.galleria.all() if img.immagine)
+    for tappa in itinerario.get_tappe_ordinate():
+        immagine = tappa.get("immagine") if isinstance(tappa, dict) else None
+        if immagine and immagine.startswith("/"):
+            urls.append(immagine)
+    return list(dict.fromkeys(urls))
+
+
+def _tile_itinerario(itinerario):
+    """URL delle tile che coprono l'itinerario negli zoom del pacchetto offline."""
+    if not itinerario.bbox_mappa:
+        return []
+    zoom_min, zoom_max = settings.OFFLINE_TILE_ZOOM
+    urls = []
+    for z, x, y in tile_per_bbox(itinerario.bbox_mappa, zoom_min, zoom_max, margine=0.005):
+        urls.append(reverse("map_tile", kwargs={"z": z, "x": x, "y": y}))
+        if len(urls) >= settings.OFFLINE_MAX_TILE:
+            break
+    return urls
+
+
+def get_pacchetto_offline(itinerario):
+    """
+    Costruisce il manifest del pacchetto offline di un itinerario.
+
+    Ogni risorsa ha una revisione: il service worker scarica solo quelle
+    nuove o con revisione diversa rispetto al manifest precedente.
+
+    Returns:
+        Dict con versione, itinerario e lista di risorse {url, revisione}
+    """
+    revisione_contenuto = _hash(itinerario.pk, itinerario.updated_at.isoformat())
+
+    risorse = [
+        {"url": itinerario.get_absolute_url(), "revisione": revisione_contenuto},
+        {
+            "url": reverse("itinerario_dati", kwargs={"slug": itinerario.slug}),
+            "revisione": revisione_contenuto,
+        },
+    ]
+    risorse.extend({"url": url, "revisione": revisione_contenuto} for url in _immagini_itinerario(itinerario))
+    # Le tile non dipendono dal contenuto dell'itinerario
+    risorse.extend({"url": url, "revisione": "1"} for url in _tile_itinerario(itinerario))
+
+    return {
+        "versione": _hash(*(f"{r['url']}@{r['revisione']}" for r in risorse)),
+        "itinerario": itinerario.slug,
+        "risorse": risorse,
+    }
+
+
+def dati_mappa_itinerario(itinerario):
+    """Payload JSON della mappa di un itinerario (tappe, centro, bbox, tratte)."""
+    return {
+        "tappe": itinerario.get_tappe_ordinate(),
+        "centro": itinerario.get_centro_mappa(),
+        "bbox": itinerario.bbox_mappa,
+        "tratte": itinerario.tratte_stimate,
+        "percorsi": itinerario.percorsi_calcolati or {},
+        "colore": itinerario.colore_percorso,
+    }
+
+
+def precache_json():
+    """Lista JSON degli URL da pre-caricare nel service worker."""
+    return json.dumps([r["url"] for r in get_risorse_base()])
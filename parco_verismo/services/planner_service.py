@@ -0,0 +1,319 @@
+"""
+Servizi per il pianificatore di itinerari personalizzati.
+
+Mantiene in memoria l'elenco delle tappe note (da tutti gli itinerari
+attivi) con le tratte stradali già calcolate e, a ogni pianificazione,
+costruisce la matrice distanza/durata delle sole tappe scelte dal
+visitatore (al massimo MAX_TAPPE_PIANIFICABILI) per calcolarne un ordine di
+visita efficiente.
+
+L'elenco viene aggiornato in modo incrementale: ad ogni richiesta si
+confronta il timestamp ``updated_at`` di ogni itinerario con quello usato
+per l'ultimo caricamento e si ricaricano solo gli itinerari modificati. Per
+le tappe consecutive dello stesso itinerario si usano le distanze stradali
+già salvate in ``percorsi_calcolati`` (cache OSRM), per le altre la linea
+d'aria corretta da FATTORE_STRADALE.
+"""
+
+import threading
+
+import numpy as np
+
+from ..utils.geometry import VELOCITA_PEDONALE, haversine
+
+# Fattore di tortuosità per stimare la distanza stradale dalla linea d'aria
+FATTORE_STRADALE = 1.3
+
+# Oltre questo numero di tappe si passa dalla programmazione dinamica
+# esatta all'euristica nearest-neighbour + 2-opt
+MAX_TAPPE_ESATTO = 10
+
+# Numero massimo di tappe selezionabili in una singola pianificazione
+MAX_TAPPE_PIANIFICABILI = 30
+
+# Le query al database avvengono fuori dal lock; sotto il lock si
+# sostituiscono soltanto i dizionari (mai modificati dopo la pubblicazione,
+# quindi chi li sta leggendo non vede stati intermedi)
+_lock = threading.Lock()
+_stato = {
+    "tappe": {},  # chiave -> dati tappa
+    "tratte": {},  # slug itinerario -> {(chiave, chiave): (distanza_m, durata_s)}
+    "firme": {},  # pk itinerario -> (slug, updated_at)
+}
+
+
+def chiave_tappa(slug, indice):
+    """Restituisce la chiave pubblica di una tappa (es. 'catania-verghiana:2')."""
+    return f"{slug}:{indice}"
+
+
+def _estrai_tappe(itinerario):
+    """Estrae le tappe valide di un itinerario con le relative chiavi."""
+    tappe = {}
+    if not isinstance(itinerario.coordinate_tappe, list):
+        return tappe
+
+    titolo = itinerario.safe_translation_getter("titolo", any_language=True) or itinerario.slug
+    for indice, tappa in enumerate(itinerario.coordinate_tappe):
+        coords = tappa.get("coords") if isinstance(tappa, dict) else None
+        if not coords or len(coords) < 2:
+            continue
+        chiave = chiave_tappa(itinerario.slug, indice)
+        tappe[chiave] = {
+            "chiave": chiave,
+            "nome": tappa.get("nome", f"Tappa {indice + 1}"),
+            "coords": [float(coords[0]), float(coords[1])],
+            "itinerario": itinerario.slug,
+            "itinerario_titolo": titolo,
+            "indice": indice,
+        }
+    return tappe
+
+
+def _tratte_stradali(itinerario):
+    """Restituisce le tratte pre-calcolate (OSRM) di un itinerario."""
+    tratte = {}
+    percorsi = itinerario.percorsi_calcolati or {}
+    if not isinstance(percorsi, dict):
+        return tratte
+
+    for nome, percorso in percorsi.items():
+        if percorso.get("straight_line") or "distance" not in percorso:
+            continue
+        try:
+            i, j = (int(x) for x in nome.split("_"))
+        except ValueError:
+            continue
+        distanza = float(percorso["distance"])
+        durata = float(percorso.get("duration") or distanza / VELOCITA_PEDONALE)
+        a = chiave_tappa(itinerario.slug, i)
+        b = chiave_tappa(itinerario.slug, j)
+        tratte[(a, b)] = (distanza, durata)
+        tratte[(b, a)] = (distanza, durata)
+    return tratte
+
+
+def aggiorna_tappe():
+    """
+    Sincronizza l'elenco delle tappe con gli itinerari attivi nel database.
+
+    Esegue una sola query leggera (pk, slug, updated_at) e ricarica
+    soltanto gli itinerari nuovi o modificati.
+
+    Returns:
+        Dict chiave -> dati tappa di tutte le tappe note
+    """
+    from ..models import Itinerario
+
+    firme_correnti = {
+        pk: (slug, updated_at)
+        for pk, slug, updated_at in Itinerario.objects.filter(is_active=True).values_list(
+            "pk", "slug", "updated_at"
+        )
+    }
+    firme = _stato["firme"]
+    if firme == firme_correnti:
+        return _stato["tappe"]
+
+    modificati = [pk for pk, firma in firme_correnti.items() if firme.get(pk) != firma]
+    caricati = [
+        (itinerario.pk, _estrai_tappe(itinerario), _tratte_stradali(itinerario))
+        for itinerario in Itinerario.objects.filter(pk__in=modificati).prefetch_related("translations")
+    ]
+
+    with _lock:
+        # Un'altra richiesta può aver già applicato lo stesso aggiornamento
+        firme = dict(_stato["firme"])
+        tappe = dict(_stato["tappe"])
+        tratte = dict(_stato["tratte"])
+        for pk in [pk for pk in firme if pk not in firme_correnti or pk in modificati]:
+            slug = firme.pop(pk)[0]
+            tratte.pop(slug, None)
+            for chiave in [c for c, t in tappe.items() if t["itinerario"] == slug]:
+                del tappe[chiave]
+        for pk, nuove_tappe, nuove_tratte in caricati:
+            tappe.update(nuove_tappe)
+            tratte[firme_correnti[pk][0]] = nuove_tratte
+            firme[pk] = firme_correnti[pk]
+        _stato.update(tappe=tappe, tratte=tratte, firme=firme)
+        return tappe
+
+
+def _matrice(selezionate, tappe, tratte):
+    """
+    Distanze e durate tra le tappe selezionate (liste n x n): tratte
+    stradali dove note, altrimenti linea d'aria per FATTORE_STRADALE.
+    """
+    coords = np.array([tappe[c]["coords"] for c in selezionate], dtype=np.float64)
+    distanze = haversine(coords[:, None, :], coords[None, :, :]) * FATTORE_STRADALE
+    durate = distanze / VELOCITA_PEDONALE
+    np.fill_diagonal(distanze, 0.0)
+    np.fill_diagonal(durate, 0.0)
+    distanze, durate = distanze.tolist(), durate.tolist()
+
+    for i, a in enumerate(selezionate):
+        stradali = tratte.get(tappe[a]["itinerario"], {})
+        for j, b in enumerate(selezionate):
+            if (a, b) in stradali:
+                distanze[i][j], durate[i][j] = stradali[(a, b)]
+    return distanze, durate
+
+
+def get_tappe_disponibili():
+    """
+    Restituisce tutte le tappe selezionabili, raggruppate per itinerario.
+
+    Returns:
+        Lista di tuple (titolo itinerario, lista di tappe)
+    """
+    gruppi = {}
+    for tappa in aggiorna_tappe().values():
+        gruppi.setdefault((tappa["itinerario"], tappa["itinerario_titolo"]), []).append(tappa)
+
+    return [
+        (titolo, sorted(tappe, key=lambda t: t["indice"]))
+        for (_, titolo), tappe in sorted(gruppi.items(), key=lambda g: g[0][1])
+    ]
+
+
+def _costo_percorso(ordine, costi):
+    return sum(costi[ordine[k]][ordine[k + 1]] for k in range(len(ordine) - 1))
+
+
+def _ordine_partenza_libera(costi, ordina):
+    """
+    Ordine di visita senza partenza imposta: si aggiunge un nodo fittizio
+    a costo zero verso tutte le tappe, da cui parte il percorso.
+    """
+    n = len(costi)
+    estesi = [[0.0] * (n + 1)] + [[0.0] + riga for riga in costi]
+    return [k - 1 for k in ordina(estesi)[1:]]
+
+
+def _ordine_esatto(costi):
+    """
+    Held-Karp: percorso aperto di costo minimo che parte dal nodo 0.
+    Complessità O(2^n * n^2), usato solo per pochi nodi.
+    """
+    n = len(costi)
+    if n <= 2:
+        return list(range(n))
+
+    pieno = 1 << (n - 1)
+    # dp[(maschera, ultimo)] = (costo, precedente); i nodi 1..n-1 sono i bit 0..n-2
+    dp = {(1 << (k - 1), k): (costi[0][k], 0) for k in range(1, n)}
+
+    for maschera in range(1, pieno):
+        for ultimo in range(1, n):
+            bit = 1 << (ultimo - 1)
+            if not maschera & bit or (maschera, ultimo) not in dp:
+                continue
+            costo, _ = dp[(maschera, ultimo)]
+            for prossimo in range(1, n):
+                bit_prossimo = 1 << (prossimo - 1)
+                if maschera & bit_prossimo:
+                    continue
+                stato = (maschera | bit_prossimo, prossimo)
+                nuovo = costo + costi[ultimo][prossimo]
+                if stato not in dp or nuovo < dp[stato][0]:
+                    dp[stato] = (nuovo, ultimo)
+
+    maschera = pieno - 1
+    ultimo = min(range(1, n), key=lambda k: dp[(maschera, k)][0])
+    ordine = []
+    while ultimo != 0:
+        ordine.append(ultimo)
+        _, precedente = dp[(maschera, ultimo)]
+        maschera &= ~(1 << (ultimo - 1))
+        ultimo = precedente
+    ordine.append(0)
+    return ordine[::-1]
+
+
+def _ordine_euristico(costi):
+    """Nearest-neighbour dal nodo 0 seguito da miglioramento 2-opt (percorso aperto)."""
+    n = len(costi)
+    ordine = [0]
+    rimanenti = set(range(1, n))
+    while rimanenti:
+        ultimo = ordine[-1]
+        prossimo = min(rimanenti, key=lambda k: costi[ultimo][k])
+        ordine.append(prossimo)
+        rimanenti.remove(prossimo)
+
+    migliorato = True
+    while migliorato:
+        migliorato = False
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                a, b = ordine[i - 1], ordine[i]
+                c = ordine[j]
+                d = ordine[j + 1] if j + 1 < n else None
+                prima = costi[a][b] + (costi[c][d] if d is not None else 0)
+                dopo = costi[a][c] + (costi[b][d] if d is not None else 0)
+                if dopo < prima - 1e-9:
+                    ordine[i:j + 1] = reversed(ordine[i:j + 1])
+                    migliorato = True
+    return ordine
+
+
+def pianifica_percorso(chiavi, partenza=None):
+    """
+    Calcola un ordine di visita efficiente per le tappe selezionate.
+
+    Il percorso è aperto (non si torna all'inizio) e ottimizza la durata
+    totale. Senza una partenza valida si sceglie anche la tappa da cui
+    conviene partire.
+
+    Args:
+        chiavi: Lista di chiavi tappa ('slug:indice')
+        partenza: Chiave della tappa di partenza (aggiunta alle selezionate
+            se manca), oppure None
+
+    Returns:
+        Dict con tappe ordinate, tratte, distanza e durata totali,
+        oppure None se nessuna chiave è valida
+    """
+    tappe = aggiorna_tappe()
+    tratte = _stato["tratte"]
+    if partenza not in tappe:
+        partenza = None
+    selezionate = list(dict.fromkeys(c for c in [partenza, *chiavi] if c in tappe))[:MAX_TAPPE_PIANIFICABILI]
+    if not selezionate:
+        return None
+
+    distanze, durate = _matrice(selezionate, tappe, tratte)
+
+    if len(selezionate) <= MAX_TAPPE_ESATTO:
+        ordina, metodo = _ordine_esatto, "esatto"
+    else:
+        ordina, metodo = _ordine_euristico, "euristico"
+    # Con la partenza indicata è il nodo 0, da cui partono entrambi gli algoritmi
+    ordine = ordina(durate) if partenza else _ordine_partenza_libera(durate, ordina)
+
+    sequenza = [selezionate[k] for k in ordine]
+    tratte = []
+    for i, j in zip(ordine, ordine[1:]):
+        a, b = selezionate[i], selezionate[j]
+        distanza, durata = distanze[i][j], durate[i][j]
+        tratte.append({
+            "da": a,
+            "a": b,
+            "distanza": round(distanza),
+            "durata": round(durata),
+        })
+
+    distanza_totale = sum(t["distanza"] for t in tratte)
+    durata_totale = round(_costo_percorso(ordine, durate))
+
+    return {
+        "tappe": [tappe[c] for c in sequenza],
+        "tratte": tratte,
+        "distanza_totale": distanza_totale,
+        "durata_totale": durata_totale,
+        "distanza_km": round(distanza_totale / 1000, 1),
+        "durata_minuti": round(durata_totale / 60),
+        "metodo": metodo,
+        "partenza": sequenza[0],
+        "partenza_scelta": partenza is not None,
+    }
@@ -0,0 +1,106 @@
+"""
+Servizi per i profili delle richieste (ProfilerMiddleware).
+
+Ogni profilo è un gruppo di file con lo stesso nome in PROFILI_DIR:
+- <nome>.prof: statistiche di cProfile (pstats, snakeviz, ...)
+- <nome>.txt: le funzioni più costose in ordine di tempo cumulato
+- <nome>.json: dati della richiesta e log delle query SQL
+
+Restano solo gli ultimi PROFILI_MAX profili (i più vecchi vengono eliminati).
+"""
+
+import io
+import json
+import os
+import pstats
+import re
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.text import slugify
+
+# Estensioni dei file di un profilo e loro content type
+TIPI_FILE = {
+    "prof": "application/octet-stream",
+    "txt": "text/plain; charset=utf-8",
+    "json": "application/json",
+}
+
+# Funzioni riportate nel riepilogo testuale
+FUNZIONI_RIEPILOGO = 60
+
+# Nomi generati da salva_profilo(): slugify() lascia anche "_" (es. home_view)
+_NOME_VALIDO = re.compile(r"^[0-9]{8}-[0-9]{6}-[a-z0-9_-]+$")
+
+
+def _cartella():
+    return Path(settings.PROFILI_DIR)
+
+
+def salva_profilo(profiler, dati):
+    """
+    Salva un profilo e ruota la cartella.
+
+    Args:
+        profiler: cProfile.Profile già fermato
+        dati: Dict JSON-serializzabile della richiesta (percorso, vista, sql, ...)
+
+    Returns:
+        Nome del profilo
+    """
+    cartella = _cartella()
+    cartella.mkdir(parents=True, exist_ok=True)
+    vista = slugify(dati.get("vista") or "nessuna")[:40] or "vista"
+    adesso = datetime.now()
+    nome = f"{adesso:%Y%m%d-%H%M%S}-{vista}-{os.getpid()}-{adesso:%f}"
+
+    profiler.dump_stats(cartella / f"{nome}.prof")
+    riepilogo = io.StringIO()
+    statistiche = pstats.Stats(profiler, stream=riepilogo)
+    statistiche.sort_stats("cumulative").print_stats(FUNZIONI_RIEPILOGO)
+    intestazione = f"{dati.get('metodo')} {dati.get('percorso')} ({dati.get('vista')}) {dati.get('durata_ms')} ms\n"
+    (cartella / f"{nome}.txt").write_text(intestazione + riepilogo.getvalue(), encoding="utf-8")
+    (cartella / f"{nome}.json").write_text(json.dumps(dati, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    _ruota(cartella)
+    return nome
+
+
+def _ruota(cartella):
+    profili = sorted(cartella.glob("*.json"), key=lambda file: file.name, reverse=True)
+    for vecchio in profili[settings.PROFILI_MAX:]:
+        for tipo in TIPI_FILE:
+            vecchio.with_suffix(f".{tipo}").unlink(missing_ok=True)
+
+
+def elenca_profili():
+    """
+    Profili salvati, dal più recente.
+
+    Returns:
+        Lista di dict con nome, data e i dati della richiesta (senza SQL)
+    """
+    cartella = _cartella()
+    if not cartella.is_dir():
+        return []
+    profili = []
+    for file in sorted(cartella.glob("*.json"), key=lambda file: file.name, reverse=True):
+        try:
+            dati = json.loads(file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        dati.pop("sql", None)
+        profili.append({"nome": file.stem, "data": datetime.fromtimestamp(file.stat().st_mtime), **dati})
+    return profili
+
+
+def file_profilo(nome, tipo):
+    """
+    Percorso di un file di un profilo, o None se il nome non è valido o il
+    file non esiste (il nome arriva dall'URL: niente percorsi arbitrari).
+    """
+    if tipo not in TIPI_FILE or not _NOME_VALIDO.match(nome):
+        return None
+    percorso = _cartella() / f"{nome}.{tipo}"
+    return percorso if percorso.is_file() else None
@@ -0,0 +1,132 @@
+"""
+Controlli di prontezza (readiness) per /health/ready/.
+
+Ogni controllo misura la sua latenza e riporta l'eventuale errore:
+- database: andata e ritorno su una tabella reale e, con SQLite, prova del
+  lock di scrittura (BEGIN IMMEDIATE; ROLLBACK con attesa breve): in WAL le
+  letture non si bloccano mai, un lock di scrittura tenuto troppo a lungo sì
+- migrazioni: nessuna migrazione in attesa
+- cache: set/get/delete di una chiave temporanea
+- media: scrittura di un file temporaneo in MEDIA_ROOT e spazio libero
+
+Il risultato resta in memoria nel processo per SALUTE_CACHE_SECONDI, così
+le sonde frequenti (Docker, nginx, monitoraggio) non pesano sul sito.
+"""
+
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_ultimo = None  # (istante monotonic, risultato)
+
+
+def _misura(controllo):
+    inizio = time.perf_counter()
+    try:
+        dettagli = controllo() or {}
+        esito = {"ok": True, **dettagli}
+    except Exception as errore:
+        esito = {"ok": False, "errore": f"{type(errore).__name__}: {errore}"[:300]}
+    esito["ms"] = round((time.perf_counter() - inizio) * 1000, 2)
+    return esito
+
+
+def _database():
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM django_migrations")
+        cursor.fetchone()
+    if connection.vendor == "sqlite" and not connection.is_in_memory_db():
+        _lock_scrittura_sqlite(connection.settings_dict["NAME"])
+    return {"vendor": connection.vendor}
+
+
+def _lock_scrittura_sqlite(percorso):
+    # Connessione a parte: quella di Django può essere dentro una transazione
+    # e ha il busy_timeout lungo delle richieste
+    sonda = sqlite3.connect(percorso, timeout=settings.SALUTE_LOCK_DB_SECONDI, isolation_level=None)
+    try:
+        sonda.execute("BEGIN IMMEDIATE")
+        sonda.execute("ROLLBACK")
+    finally:
+        sonda.close()
+
+
+def _migrazioni():
+    from django.db import connection
+    from django.db.migrations.executor import MigrationExecutor
+
+    executor = MigrationExecutor(connection)
+    in_attesa = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if in_attesa:
+        nomi = ", ".join(f"{migrazione.app_label}.{migrazione.name}" for migrazione, _ in in_attesa[:5])
+        raise RuntimeError(f"{len(in_attesa)} migrazioni da applicare ({nomi})")
+
+
+def _cache():
+    from django.core.cache import cache
+
+    chiave = f"salute:{uuid.uuid4().hex}"
+    valore = uuid.uuid4().hex
+    cache.set(chiave, valore, 10)
+    try:
+        if cache.get(chiave) != valore:
+            raise RuntimeError("il valore letto non corrisponde a quello scritto")
+    finally:
+        cache.delete(chiave)
+
+
+def _media():
+    cartella = settings.MEDIA_ROOT
+    with tempfile.NamedTemporaryFile(dir=cartella, prefix=".salute-") as file:
+        file.write(b"ok")
+        file.flush()
+    libero_mb = shutil.disk_usage(cartella).free // (1024 * 1024)
+    if libero_mb < settings.SALUTE_SPAZIO_MINIMO_MB:
+        raise RuntimeError(f"spazio libero {libero_mb} MB (minimo {settings.SALUTE_SPAZIO_MINIMO_MB} MB)")
+    return {"libero_mb": libero_mb}
+
+
+CONTROLLI = {
+    "database": _database,
+    "migrazioni": _migrazioni,
+    "cache": _cache,
+    "media": _media,
+}
+
+
+def controlla_prontezza():
+    """
+    Esegue i controlli (o riusa il risultato recente del processo).
+
+    Returns:
+        Dict con "pronto" (bool), "controlli" (esito e ms per dipendenza),
+        "verificato" (epoch dei controlli) e "in_cache" (bool)
+    """
+    global _ultimo
+    with _lock:
+        adesso = time.monotonic()
+        if _ultimo is not None and adesso - _ultimo[0] < settings.SALUTE_CACHE_SECONDI:
+            return {**_ultimo[1], "in_cache": True}
+
+        controlli = {}
+        for nome, controllo in CONTROLLI.items():
+            if nome == "migrazioni" and not controlli["database"]["ok"]:
+                # Con il database bloccato si aspetterebbe un altro timeout
+                controlli[nome] = {"ok": False, "errore": "database non raggiungibile", "ms": 0.0}
+            else:
+                controlli[nome] = _misura(controllo)
+        risultato = {
+            "pronto": all(esito["ok"] for esito in controlli.values()),
+            "controlli": controlli,
+            "verificato": round(time.time(), 3),
+        }
+        _ultimo = (adesso, risultato)
+        return {**risultato, "in_cache": False}
@@ -19,7 +19,7 @@ def ricerca_opere(query, queryset=None):
     from ..models import Opera
 
     if queryset is None:
-        queryset = Opera.objects.all()
+        queryset = Opera.objects.with_translations().select_related("autore")
 
     if not query:
         return queryset
@@ -46,7 +46,7 @@ def ricerca_documenti(query, tipo=None, queryset=None):
     from ..models import Documento
 
     if queryset is None:
-        queryset = Documento.objects.filter(is_active=True)
+        queryset = Documento.objects.with_translations().filter(is_active=True)
 
     if tipo:
         queryset = queryset.filter(tipo=tipo)
@@ -75,7 +75,7 @@ def get_eventi_futuri(limit=None):
     from django.utils import timezone
     from ..models import Evento
 
-    eventi = Evento.objects.filter(
+    eventi = Evento.objects.with_translations().filter(
         is_active=True, data_inizio__gte=timezone.now()
     ).order_by("data_inizio")
 
@@ -97,7 +97,7 @@ def get_notizie_recenti(limit=None):
     """
     from ..models import Notizia
 
-    notizie = Notizia.objects.filter(is_active=True).order_by("-data_pubblicazione")
+    notizie = Notizia.objects.with_translations().filter(is_active=True).order_by("-data_pubblicazione")
 
     if limit:
         notizie = notizie[:limit]
@@ -0,0 +1,41 @@
+"""
+Servizi per la cache dell'XML delle sitemap.
+
+La chiave di ogni shard include la versione della sua sezione
+(services/cache_service.py): un salvataggio rende obsoleto solo l'XML delle
+sezioni coinvolte. Con LocMemCache gli altri worker si allineano alla
+scadenza (settings.SITEMAP_CACHE_TIMEOUT).
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache_service import versioni_sezioni
+
+
+def chiave_sitemap(request, nome, sezioni):
+    """
+    Chiave di cache dell'XML di uno shard (o dell'indice).
+
+    Dipende da host e schema (gli URL sono assoluti), dalla pagina richiesta
+    e dalla versione di ogni sezione coinvolta.
+    """
+    parti = [
+        request.scheme,
+        request.get_host(),
+        nome,
+        request.GET.get("p", "1"),
+        versioni_sezioni(sezioni),
+    ]
+    impronta = hashlib.sha256("|".join(parti).encode("utf-8")).hexdigest()[:32]
+    return f"sitemap:xml:{impronta}"
+
+
+def get_xml_in_cache(chiave):
+    return cache.get(chiave)
+
+
+def salva_xml_in_cache(chiave, dati):
+    cache.set(chiave, dati, settings.SITEMAP_CACHE_TIMEOUT)
@@ -0,0 +1,211 @@
+"""
+Servizi per la cache locale delle tile delle mappe (proxy OpenStreetMap).
+
+Le tile vengono salvate su disco come ``{z}/{x}/{y}.png`` sotto
+``settings.TILE_CACHE_ROOT``. La dimensione totale è limitata da
+``settings.TILE_CACHE_MAX_BYTES``: quando viene superata si eliminano le
+tile usate meno di recente (LRU basato sul mtime, aggiornato ad ogni hit).
+
+Dall'origine si scaricano solo le tile dell'area del parco
+(``settings.TILE_AREA``) negli zoom da ``settings.TILE_MIN_ZOOM`` a
+``settings.TILE_MAX_ZOOM``: il proxy non serve mappe di altre zone.
+"""
+
+import logging
+import math
+import os
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Dopo l'eviction si scende a questa frazione del limite, per non
+# ripetere la scansione della cartella ad ogni nuova tile
+SOGLIA_EVICTION = 0.9
+
+_lock = threading.Lock()
+_dimensione = {"bytes": None}
+
+
+class TileNonDisponibile(Exception):
+    """La tile non è in cache e l'origine non ha risposto correttamente."""
+
+
+class TileFuoriArea(TileNonDisponibile):
+    """La tile non è in cache ed è fuori dall'area o dagli zoom del parco."""
+
+
+def tile_valida(z, x, y):
+    """Verifica che le coordinate tile siano nel range ammesso."""
+    if z < 0 or z > settings.TILE_MAX_ZOOM:
+        return False
+    limite = 1 << z
+    return 0 <= x < limite and 0 <= y < limite
+
+
+def tile_nell_area(z, x, y):
+    """Verifica che la tile intersechi l'area del parco in uno zoom ammesso."""
+    if z < settings.TILE_MIN_ZOOM or z > settings.TILE_MAX_ZOOM:
+        return False
+    (lat_min, lng_min), (lat_max, lng_max) = settings.TILE_AREA
+    x_min, y_min = tile_per_coordinate(lat_max, lng_min, z)
+    x_max, y_max = tile_per_coordinate(lat_min, lng_max, z)
+    return x_min <= x <= x_max and y_min <= y <= y_max
+
+
+def _percorso_tile(z, x, y):
+    return Path(settings.TILE_CACHE_ROOT) / str(z) / str(x) / f"{y}.png"
+
+
+def _scansiona():
+    """Restituisce la lista (mtime, dimensione, percorso) di tutte le tile."""
+    radice = Path(settings.TILE_CACHE_ROOT)
+    if not radice.exists():
+        return []
+    voci = []
+    for percorso in radice.glob("*/*/*.png"):
+        try:
+            stat = percorso.stat()
+        except FileNotFoundError:
+            continue
+        voci.append((stat.st_mtime, stat.st_size, percorso))
+    return voci
+
+
+def dimensione_cache():
+    """Dimensione totale (bytes) della cache su disco."""
+    return sum(dimensione for _, dimensione, _ in _scansiona())
+
+
+def _registra_scrittura(dimensione):
+    """Aggiorna il contatore della dimensione ed esegue l'eviction LRU se serve."""
+    with _lock:
+        if _dimensione["bytes"] is None:
+            _dimensione["bytes"] = dimensione_cache()
+        else:
+            _dimensione["bytes"] += dimensione
+
+        limite = settings.TILE_CACHE_MAX_BYTES
+        if _dimensione["bytes"] <= limite:
+            return
+
+        voci = sorted(_scansiona())
+        totale = sum(d for _, d, _ in voci)
+        obiettivo = limite * SOGLIA_EVICTION
+        for _, dimensione_tile, percorso in voci:
+            if totale <= obiettivo:
+                break
+            try:
+                percorso.unlink()
+                totale -= dimensione_tile
+            except FileNotFoundError:
+                continue
+        _dimensione["bytes"] = totale
+
+
+def leggi_tile(z, x, y):
+    """
+    Legge una tile dalla cache su disco.
+
+    Returns:
+        Bytes della tile oppure None se non presente
+    """
+    percorso = _percorso_tile(z, x, y)
+    try:
+        contenuto = percorso.read_bytes()
+    except FileNotFoundError:
+        return None
+    # Aggiorna il mtime: è il riferimento per l'eviction LRU
+    try:
+        os.utime(percorso)
+    except OSError:
+        pass
+    return contenuto
+
+
+def scarica_tile(z, x, y):
+    """
+    Scarica una tile dall'origine configurata e la salva in cache.
+
+    Raises:
+        TileNonDisponibile: se l'origine non risponde o restituisce un errore
+    """
+    url = settings.TILE_ORIGIN_URL.format(z=z, x=x, y=y)
+    richiesta = urllib.request.Request(url, headers={"User-Agent": settings.TILE_USER_AGENT})
+    try:
+        with urllib.request.urlopen(richiesta, timeout=settings.TILE_ORIGIN_TIMEOUT) as risposta:
+            contenuto = risposta.read()
+    except (urllib.error.URLError, TimeoutError, OSError) as e:
+        logger.warning("Tile %s/%s/%s non disponibile dall'origine: %s", z, x, y, e)
+        raise TileNonDisponibile(str(e)) from e
+
+    percorso = _percorso_tile(z, x, y)
+    percorso.parent.mkdir(parents=True, exist_ok=True)
+
+    # Scrittura atomica: più worker possono scaricare la stessa tile
+    fd, temporaneo = tempfile.mkstemp(dir=percorso.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(contenuto)
+    os.replace(temporaneo, percorso)
+
+    _registra_scrittura(len(contenuto))
+    return contenuto
+
+
+def get_tile(z, x, y):
+    """
+    Restituisce una tile dalla cache, scaricandola dall'origine se assente.
+
+    Returns:
+        Tupla (bytes, hit) dove hit indica se la tile era già in cache
+
+    Raises:
+        TileFuoriArea: se la tile va scaricata ma è fuori dall'area del parco
+        TileNonDisponibile: se l'origine non risponde o restituisce un errore
+    """
+    contenuto = leggi_tile(z, x, y)
+    if contenuto is not None:
+        return contenuto, True
+    if not tile_nell_area(z, x, y):
+        raise TileFuoriArea(f"{z}/{x}/{y}")
+    return scarica_tile(z, x, y), False
+
+
+def tile_per_coordinate(lat, lng, z):
+    """Converte una coordinata [lat, lng] nella tile (x, y) allo zoom z."""
+    lat = max(min(lat, 85.0511), -85.0511)
+    n = 1 << z
+    x = int((lng + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_per_bbox(bbox, zoom_min, zoom_max, margine=0.0):
+    """
+    Elenca le tile che coprono un bounding box per un intervallo di zoom.
+
+    Args:
+        bbox: [[lat_min, lng_min], [lat_max, lng_max]]
+        zoom_min: Zoom minimo (incluso)
+        zoom_max: Zoom massimo (incluso)
+        margine: Margine in gradi aggiunto su ogni lato
+
+    Yields:
+        Tuple (z, x, y)
+    """
+    (lat_min, lng_min), (lat_max, lng_max) = bbox
+    lat_min, lng_min = lat_min - margine, lng_min - margine
+    lat_max, lng_max = lat_max + margine, lng_max + margine
+
+    for z in range(zoom_min, zoom_max + 1):
+        x_min, y_min = tile_per_coordinate(lat_max, lng_min, z)
+        x_max, y_max = tile_per_coordinate(lat_min, lng_max, z)
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                yield z, x, y
@@ -0,0 +1,141 @@
+"""
+Servizi per il video di sfondo della homepage.
+
+Il comando ``transcodifica_video`` genera, a partire dal video sorgente, più
+varianti (risoluzione/bitrate) e un'immagine poster, più un manifest JSON
+nella stessa cartella statica. Il template tag ``video_hero`` legge il
+manifest e sceglie la variante in base alla larghezza della finestra;
+senza manifest usa il video sorgente.
+"""
+
+import json
+import shutil
+import subprocess
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+
+# Varianti generate: nome, altezza (px), bitrate massimo, media query.
+# L'ultima variante non ha media query ed è il fallback per gli schermi piccoli.
+VARIANTI_VIDEO = [
+    {"nome": "1080p", "altezza": 1080, "bitrate": "4000k", "media": "(min-width: 1400px)"},
+    {"nome": "720p", "altezza": 720, "bitrate": "2000k", "media": "(min-width: 768px)"},
+    {"nome": "480p", "altezza": 480, "bitrate": "800k", "media": None},
+]
+
+# Altezza del poster (frame estratto dal video)
+ALTEZZA_POSTER = 720
+
+MANIFEST = "manifest.json"
+
+
+class FFmpegNonDisponibile(Exception):
+    """ffmpeg/ffprobe non sono installati o non sono eseguibili."""
+
+
+def percorso_manifest():
+    """Percorso statico del manifest delle varianti."""
+    return f"{settings.VIDEO_HERO_CARTELLA}/{MANIFEST}"
+
+
+def trova_eseguibile(nome):
+    """Restituisce il percorso di ffmpeg/ffprobe o solleva FFmpegNonDisponibile."""
+    percorso = shutil.which(nome)
+    if not percorso:
+        raise FFmpegNonDisponibile(f"'{nome}' non trovato nel PATH")
+    return percorso
+
+
+def dimensioni_video(ffprobe, percorso):
+    """
+    Legge larghezza e altezza del primo stream video.
+
+    Returns:
+        Tupla (larghezza, altezza)
+    """
+    risultato = subprocess.run(
+        [
+            ffprobe, "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "stream=width,height", "-of", "json", str(percorso),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    stream = json.loads(risultato.stdout)["streams"][0]
+    return int(stream["width"]), int(stream["height"])
+
+
+def comando_variante(ffmpeg, sorgente, destinazione, altezza, bitrate):
+    """
+    Comando ffmpeg per una variante H.264 senza audio (il video è sempre muto).
+
+    Qualità costante con tetto di bitrate; ``faststart`` sposta l'indice
+    all'inizio del file così la riproduzione parte prima del download completo.
+    """
+    massimo = int(bitrate.rstrip("k"))
+    return [
+        ffmpeg, "-y", "-i", str(sorgente),
+        "-an",
+        "-vf", f"scale=-2:{altezza}",
+        "-c:v", "libx264", "-preset", "slow", "-profile:v", "high", "-crf", "26",
+        "-maxrate", bitrate, "-bufsize", f"{massimo * 2}k",
+        "-pix_fmt", "yuv420p",
+        "-movflags", "+faststart",
+        str(destinazione),
+    ]
+
+
+def comando_poster(ffmpeg, sorgente, destinazione, secondo=1.0, altezza=ALTEZZA_POSTER):
+    """Comando ffmpeg per estrarre il frame del poster."""
+    return [
+        ffmpeg, "-y", "-ss", str(secondo), "-i", str(sorgente),
+        "-frames:v", "1",
+        "-vf", f"scale=-2:{altezza}",
+        "-q:v", "4",
+        str(destinazione),
+    ]
+
+
+def _leggi_manifest():
+    trovato = finders.find(percorso_manifest())
+    try:
+        if trovato:
+            with open(trovato, encoding="utf-8") as f:
+                return json.load(f)
+        with staticfiles_storage.open(percorso_manifest()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=1)
+def _manifest_cache():
+    return _leggi_manifest()
+
+
+def get_video_hero():
+    """
+    Restituisce sorgenti e poster del video della homepage.
+
+    Returns:
+        Dict con 'sorgenti' (lista di {url, media, tipo}, dalla più grande)
+        e 'poster' (URL o None)
+    """
+    manifest = _leggi_manifest() if settings.DEBUG else _manifest_cache()
+    if not manifest or not manifest.get("varianti"):
+        return {
+            "sorgenti": [{"url": static(settings.VIDEO_HERO_SORGENTE), "media": None, "tipo": "video/mp4"}],
+            "poster": None,
+        }
+
+    return {
+        "sorgenti": [
+            {"url": static(variante["file"]), "media": variante.get("media"), "tipo": "video/mp4"}
+            for variante in manifest["varianti"]
+        ],
+        "poster": static(manifest["poster"]) if manifest.get("poster") else None,
+    }
@@ -0,0 +1,123 @@
+"""
+Signal dell'app parco_verismo.
+
+Collegati in ParcoVerismoConfig.ready().
+"""
+
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import (
+    Autore,
+    Documento,
+    Evento,
+    EventoDocumento,
+    EventoImage,
+    FotoArchivio,
+    Itinerario,
+    ItinerarioImmagine,
+    Notizia,
+    NotiziaDocumento,
+    NotiziaImage,
+    Opera,
+)
+from .services.cache_service import invalida_sezioni
+from .services.micro_cache_service import aggiorna_micro_cache, percorsi_da_aggiornare
+
+# Sezioni di contenuto (sitemap, pagine in cache, micro-cache di nginx) da
+# invalidare quando cambia un modello
+# (la pagina dell'autore elenca le sue opere)
+SEZIONI_PER_MODELLO = {
+    Opera: ("opere", "autori"),
+    Autore: ("autori",),
+    Evento: ("eventi",),
+    Notizia: ("notizie",),
+    Documento: ("documenti",),
+    Itinerario: ("itinerari",),
+    FotoArchivio: ("fotografie",),
+}
+
+# Modelli inline (immagini, documenti) -> ForeignKey del contenuto a cui
+# appartengono: modificarli cambia la pagina del contenuto
+GENITORE_PER_FIGLIO = {
+    EventoImage: "evento",
+    EventoDocumento: "evento",
+    NotiziaImage: "notizia",
+    NotiziaDocumento: "notizia",
+    ItinerarioImmagine: "itinerario",
+}
+
+
+def _aggiorna_micro_cache_in_attesa(connessione):
+    percorsi = list(getattr(connessione, "percorsi_micro_cache", {}))
+    connessione.percorsi_micro_cache = {}
+    aggiorna_micro_cache(percorsi)
+
+
+def _invalida(sezioni, oggetto):
+    invalida_sezioni(sezioni)
+    # Dopo il commit: una richiesta anticipata rimetterebbe in cache i dati vecchi.
+    # I percorsi si accumulano sulla connessione e il primo callback della
+    # transazione li aggiorna tutti una volta sola (gli altri trovano la coda vuota)
+    connessione = transaction.get_connection()
+    if not hasattr(connessione, "percorsi_micro_cache"):
+        connessione.percorsi_micro_cache = {}
+    connessione.percorsi_micro_cache.update(dict.fromkeys(percorsi_da_aggiornare(sezioni, oggetto)))
+    transaction.on_commit(lambda: _aggiorna_micro_cache_in_attesa(connessione))
+
+
+def invalida_contenuti(sender, instance, **kwargs):
+    """Invalida la cache (sitemap, pagine, nginx) delle sezioni del modello salvato/eliminato."""
+    if kwargs.get("raw"):
+        return
+    _invalida(SEZIONI_PER_MODELLO[sender], instance)
+
+
+def aggiorna_genitore(sender, instance, **kwargs):
+    """Aggiorna updated_at del contenuto quando cambia una sua immagine o un suo documento."""
+    if kwargs.get("raw"):
+        return
+    campo = sender._meta.get_field(GENITORE_PER_FIGLIO[sender])
+    genitore = campo.related_model
+    # update() non invia post_save: le sezioni vanno invalidate qui
+    oggetti = genitore.objects.filter(pk=getattr(instance, campo.attname))
+    oggetti.update(updated_at=timezone.now())
+    _invalida(SEZIONI_PER_MODELLO[genitore], oggetti.first())
+
+
+def collega_signal():
+    for modello in SEZIONI_PER_MODELLO:
+        post_save.connect(invalida_contenuti, sender=modello, dispatch_uid=f"sezioni_save_{modello.__name__}")
+        post_delete.connect(invalida_contenuti, sender=modello, dispatch_uid=f"sezioni_delete_{modello.__name__}")
+    for modello in GENITORE_PER_FIGLIO:
+        post_save.connect(aggiorna_genitore, sender=modello, dispatch_uid=f"genitore_save_{modello.__name__}")
+        post_delete.connect(aggiorna_genitore, sender=modello, dispatch_uid=f"genitore_delete_{modello.__name__}")
+
+
+@contextmanager
+def signal_sospesi():
+    """
+    Scollega i signal durante operazioni in blocco (es. delete() di migliaia
+    di righe, che invierebbe un post_delete per oggetto) e alla fine
+    invalida una sola volta tutte le sezioni (cache e micro-cache di nginx).
+
+    Dentro una transazione l'invalidazione avviene al commit: va usato come
+    ``with signal_sospesi(), transaction.atomic():``, o comunque con la
+    transazione aperta fuori, mai il contrario.
+    """
+    for modello in SEZIONI_PER_MODELLO:
+        post_save.disconnect(sender=modello, dispatch_uid=f"sezioni_save_{modello.__name__}")
+        post_delete.disconnect(sender=modello, dispatch_uid=f"sezioni_delete_{modello.__name__}")
+    for modello in GENITORE_PER_FIGLIO:
+        post_save.disconnect(sender=modello, dispatch_uid=f"genitore_save_{modello.__name__}")
+        post_delete.disconnect(sender=modello, dispatch_uid=f"genitore_delete_{modello.__name__}")
+    try:
+        yield
+    finally:
+        collega_signal()
+        sezioni = {sezione for sezioni in SEZIONI_PER_MODELLO.values() for sezione in sezioni}
+        # Prima del commit una richiesta rimetterebbe in cache i dati vecchi
+        transaction.on_commit(lambda: _invalida(sezioni, None))
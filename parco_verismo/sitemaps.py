@@ -1,5 +1,8 @@
 # Django imports
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
+from django.db.models import Max
+from django.db.models.functions import Coalesce, Greatest
 from django.urls import reverse
 
 # Local imports
@@ -23,6 +26,7 @@ class StaticViewSitemap(Sitemap):
             'itinerari_verghiani',
             'itinerari_capuaniani',
             'itinerari_tematici',
+            'pianifica_itinerario',
             'missione_visione',
             'comitato_tecnico_scientifico',
             'comitato_regolamento',
@@ -50,8 +54,7 @@ class OperaSitemap(Sitemap):
         return Opera.objects.all()
 
     def lastmod(self, obj):
-        # Le opere non hanno data di modifica, usa None
-        return None
+        return obj.updated_at
 
 
 class AutoreSitemap(Sitemap):
@@ -60,11 +63,19 @@ class AutoreSitemap(Sitemap):
     priority = 0.7
 
     def items(self):
-        return Autore.objects.all()
+        # La pagina dell'autore elenca le sue opere: cambia anche quando cambiano loro
+        return Autore.objects.annotate(
+            ultima_modifica=Greatest(
+                'updated_at', Coalesce(Max('opere__updated_at'), 'updated_at')
+            )
+        ).order_by('nome')
 
     def location(self, obj):
         return reverse('opere_per_autore', kwargs={'autore_slug': obj.slug})
 
+    def lastmod(self, obj):
+        return obj.ultima_modifica
+
 
 class EventoSitemap(Sitemap):
     """Sitemap per gli eventi"""
@@ -75,7 +86,7 @@ class EventoSitemap(Sitemap):
         return Evento.objects.filter(is_active=True)
 
     def lastmod(self, obj):
-        return obj.data_inizio
+        return obj.updated_at
 
 
 class NotiziaSitemap(Sitemap):
@@ -87,7 +98,7 @@ class NotiziaSitemap(Sitemap):
         return Notizia.objects.filter(is_active=True)
 
     def lastmod(self, obj):
-        return obj.data_pubblicazione
+        return obj.updated_at
 
 
 class DocumentoSitemap(Sitemap):
@@ -99,7 +110,7 @@ class DocumentoSitemap(Sitemap):
         return Documento.objects.filter(is_active=True)
 
     def lastmod(self, obj):
-        return obj.data_pubblicazione
+        return obj.updated_at
 
 
 class ItinerarioSitemap(Sitemap):
@@ -111,5 +122,32 @@ class ItinerarioSitemap(Sitemap):
         return Itinerario.objects.filter(is_active=True)
 
     def lastmod(self, obj):
-        # Gli itinerari non hanno data di modifica
-        return None
+        return obj.updated_at
+
+
+# Sezioni della sitemap (nome -> classe)
+SEZIONI = {
+    "static": StaticViewSitemap,
+    "opere": OperaSitemap,
+    "autori": AutoreSitemap,
+    "eventi": EventoSitemap,
+    "notizie": NotiziaSitemap,
+    "documenti": DocumentoSitemap,
+    "itinerari": ItinerarioSitemap,
+}
+
+
+def get_sitemaps():
+    """
+    Shard della sitemap, uno per sezione e lingua (es. 'opere-it', 'opere-en').
+
+    Ogni shard è una sottoclasse con i18n attivo su una sola lingua: gli URL
+    vengono generati con il prefisso della lingua (i18n_patterns).
+    """
+    sitemaps = {}
+    for nome, classe in SEZIONI.items():
+        for codice, _ in settings.LANGUAGES:
+            sitemaps[f"{nome}-{codice}"] = type(
+                f"{classe.__name__}_{codice}", (classe,), {"i18n": True, "languages": [codice]}
+            )
+    return sitemaps
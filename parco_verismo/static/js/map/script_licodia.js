@@ -2,7 +2,7 @@ document.addEventListener("DOMContentLoaded", function() {
   // Inizializza mappa
   var map = L.map(document.querySelector(".map-container"), { zoomControl: false }).setView([37.1564, 14.7043], 17);
 
-  L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+  L.tileLayer('/tiles/{z}/{x}/{y}.png', {
     maxZoom: 19,
     attribution: '© OpenStreetMap contributors'
   }).addTo(map);
@@ -2,7 +2,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // Inizializza la mappa centrata su Mineo
     var map = L.map(document.querySelector(".map-container"), { zoomControl: false }).setView([37.26647353811028, 14.69049488989791], 17);
 
-    L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+    L.tileLayer('/tiles/{z}/{x}/{y}.png', {
         maxZoom: 19,
         attribution: '© OpenStreetMap contributors'
     }).addTo(map);
@@ -2,7 +2,7 @@ document.addEventListener("DOMContentLoaded", function() {
   // Inizializza mappa centrata su Vizzini
   var map = L.map(document.querySelector(".map-container"), { zoomControl: false }).setView([37.1607, 14.7490], 17);
 
-  L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+  L.tileLayer('/tiles/{z}/{x}/{y}.png', {
     maxZoom: 19,
     attribution: '© OpenStreetMap contributors'
   }).addTo(map);
@@ -0,0 +1,51 @@
+// Modulo di contatto nelle pagine in cache (home, contatti)
+// L'HTML è uguale per tutti: il token CSRF viene richiesto solo quando si
+// inizia a compilare il modulo, i messaggi solo dopo un invio.
+
+(function () {
+    'use strict';
+
+    function caricaJson(url) {
+        return fetch(url, { credentials: 'same-origin', cache: 'no-store' }).then(function (risposta) {
+            if (!risposta.ok) throw new Error('HTTP ' + risposta.status);
+            return risposta.json();
+        });
+    }
+
+    document.querySelectorAll('form[data-csrf-url]').forEach(function (form) {
+        const campo = form.querySelector('input[name="csrfmiddlewaretoken"]');
+        let richiesta = null;
+
+        function caricaToken() {
+            if (!richiesta) {
+                richiesta = caricaJson(form.dataset.csrfUrl)
+                    .then(function (dati) { campo.value = dati.token; })
+                    .catch(function (errore) {
+                        richiesta = null;
+                        throw errore;
+                    });
+            }
+            return richiesta;
+        }
+
+        form.addEventListener('focusin', function () {
+            if (!campo.value) caricaToken().catch(function () {});
+        });
+
+        form.addEventListener('submit', function (event) {
+            if (campo.value) return;
+            event.preventDefault();
+            // form.submit() non riattiva l'evento submit; senza token il server risponde 403
+            caricaToken().finally(function () { form.submit(); }).catch(function () {});
+        });
+    });
+
+    // Dopo l'invio la view reindirizza a #richiesta-contatto con un messaggio in sessione
+    const contenitore = document.querySelector('[data-messaggi-url]');
+    if (contenitore && window.location.hash === '#richiesta-contatto') {
+        fetch(contenitore.dataset.messaggiUrl, { credentials: 'same-origin', cache: 'no-store' })
+            .then(function (risposta) { return risposta.ok ? risposta.text() : ''; })
+            .then(function (html) { contenitore.innerHTML = html; })
+            .catch(function () {});
+    }
+})();
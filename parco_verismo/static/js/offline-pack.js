@@ -0,0 +1,47 @@
+// ================================================
+// SERVICE WORKER E PACCHETTI OFFLINE
+// Registra /sw.js e gestisce il pulsante "Scarica per uso offline"
+// ================================================
+
+(function() {
+    'use strict';
+
+    if (!('serviceWorker' in navigator)) return;
+
+    window.addEventListener('load', function() {
+        navigator.serviceWorker.register('/sw.js', { scope: '/' }).catch(function() {});
+    });
+
+    document.addEventListener('DOMContentLoaded', function() {
+        const btn = document.getElementById('btnPacchettoOffline');
+        if (!btn) return;
+
+        const label = btn.querySelector('.offline-label');
+        btn.classList.remove('d-none');
+
+        navigator.serviceWorker.addEventListener('message', function(event) {
+            const dati = event.data || {};
+            if (dati.tipo === 'pacchetto-progresso') {
+                label.textContent = btn.dataset.testoProgresso + ' ' + dati.completate + '/' + dati.totale;
+            } else if (dati.tipo === 'pacchetto-completato') {
+                // Con risorse mancanti il pacchetto non è ancora utilizzabile offline
+                label.textContent = dati.fallite ? btn.dataset.testoErrore : btn.dataset.testoCompletato;
+                btn.disabled = false;
+            } else if (dati.tipo === 'pacchetto-errore') {
+                label.textContent = btn.dataset.testoErrore;
+                btn.disabled = false;
+            }
+        });
+
+        btn.addEventListener('click', function() {
+            btn.disabled = true;
+            label.textContent = btn.dataset.testoProgresso;
+            navigator.serviceWorker.ready.then(function(registration) {
+                registration.active.postMessage({
+                    tipo: 'scarica-pacchetto',
+                    manifest: btn.dataset.manifestUrl
+                });
+            });
+        });
+    });
+})();
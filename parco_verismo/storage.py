@@ -0,0 +1,54 @@
+"""
+Storage dei file statici in produzione.
+
+Durante ``collectstatic`` genera i bundle definiti in
+``settings.STATIC_BUNDLES``, poi delega a WhiteNoise: ogni file riceve un
+nome con l'hash del contenuto (cache "immutable" lato browser) e una copia
+precompressa ``.gz`` e ``.br`` servita senza compressione a runtime.
+"""
+
+import logging
+
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .utils.static_bundles import costruisci_bundle, get_bundles
+
+logger = logging.getLogger(__name__)
+
+
+class BundleManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Storage con bundle CSS/JS, nomi con hash e file precompressi."""
+
+    # Un file presente in STATIC_ROOT ma non nel manifest riceve comunque
+    # il nome con hash (calcolato al volo) invece di un errore
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for nome in get_bundles():
+                self._salva_bundle(nome, paths)
+                paths[nome] = (self, nome)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def stored_name(self, name):
+        # Un file citato nei template ma assente da STATIC_ROOT (es. un video
+        # non ancora caricato) produce l'URL senza hash invece di un errore 500
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            logger.warning("File statico %s assente da STATIC_ROOT: URL senza hash", name)
+            return name
+
+    def _salva_bundle(self, nome, paths):
+        def leggi(sorgente):
+            if sorgente not in paths:
+                raise ValueError(f"Il bundle '{nome}' include '{sorgente}', file statico non trovato.")
+            storage, percorso = paths[sorgente]
+            with storage.open(percorso) as f:
+                return f.read().decode("utf-8")
+
+        contenuto = costruisci_bundle(nome, leggi)
+        if self.exists(nome):
+            self.delete(nome)
+        self.save(nome, ContentFile(contenuto.encode("utf-8")))
@@ -0,0 +1,177 @@
+/* ================================================
+   SERVICE WORKER - Parco Letterario Verga e Capuana
+   Generato da Django (views/offline.py): non modificare a mano.
+   Versione: {{ versione }}
+   ================================================ */
+
+const VERSIONE = '{{ versione }}';
+const CACHE_STATICI = 'parco-statici-' + VERSIONE;
+const CACHE_PAGINE = 'parco-pagine';
+const CACHE_PACCHETTI = 'parco-pacchetti';
+const PRECACHE = {{ precache|safe }};
+// Pagine visitate conservate per l'uso offline (le più vecchie escono)
+const MAX_PAGINE = 50;
+// Oltre questo tempo, se c'è una copia salvata, si mostra quella
+const TIMEOUT_PAGINE_MS = 4000;
+
+// Installazione: pre-carica le risorse comuni di base.html
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(CACHE_STATICI)
+            .then(cache => cache.addAll(PRECACHE))
+            .then(() => self.skipWaiting())
+    );
+});
+
+// Attivazione: elimina le cache statiche delle versioni precedenti
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(nomi => Promise.all(
+                nomi
+                    .filter(nome => nome.startsWith('parco-statici-') && nome !== CACHE_STATICI)
+                    .map(nome => caches.delete(nome))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+function isRisorsaStatica(url) {
+    return url.pathname.startsWith('{{ static_url }}')
+        || url.pathname.startsWith('{{ media_url }}')
+        || url.pathname.startsWith('/tiles/');
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+    // Aree amministrative: sempre e solo dalla rete
+    if (url.pathname.startsWith('/admin/') || url.pathname.startsWith('/richieste/')) return;
+
+    // Static, media e tile: cache-first
+    if (isRisorsaStatica(url)) {
+        event.respondWith(
+            caches.match(request).then(trovata => trovata || fetch(request))
+        );
+        return;
+    }
+
+    // Pagine: network-first con copia di riserva per l'uso offline
+    if (request.mode === 'navigate') {
+        event.respondWith(paginaNetworkFirst(request));
+        return;
+    }
+
+    // Dati JSON dei pacchetti offline: network-first, poi cache
+    if (url.pathname.endsWith('/dati.json')) {
+        event.respondWith(fetch(request).catch(() => caches.match(request)));
+    }
+});
+
+async function salvaPagina(request, risposta) {
+    const cache = await caches.open(CACHE_PAGINE);
+    await cache.put(request, risposta);
+    // cache.keys() restituisce le voci in ordine di salvataggio
+    const chiavi = await cache.keys();
+    const eccedenti = chiavi.slice(0, Math.max(chiavi.length - MAX_PAGINE, 0));
+    await Promise.all(eccedenti.map(chiave => cache.delete(chiave)));
+}
+
+// Rete lenta: dopo TIMEOUT_PAGINE_MS si interrompe la richiesta e si
+// mostra la copia salvata; senza copia si continua ad aspettare la rete
+function paginaNetworkFirst(request) {
+    const controller = new AbortController();
+    // Una richiesta 'navigate' non si può ricreare con un signal: si usa l'URL
+    const rete = fetch(request.url, {
+        headers: request.headers,
+        credentials: 'same-origin',
+        redirect: 'manual',
+        signal: controller.signal,
+    }).then(risposta => {
+        if (risposta.ok) salvaPagina(request, risposta.clone());
+        return risposta;
+    });
+    const copiaSalvata = () => caches.match(request, { ignoreSearch: true });
+
+    const timeout = new Promise(resolve => {
+        const timer = setTimeout(async () => {
+            const copia = await copiaSalvata();
+            if (copia) {
+                controller.abort();
+                resolve(copia);
+            }
+        }, TIMEOUT_PAGINE_MS);
+        rete.finally(() => clearTimeout(timer)).catch(() => {});
+    });
+    return Promise.race([rete, timeout]).catch(copiaSalvata);
+}
+
+// Download incrementale di un pacchetto offline
+async function scaricaPacchetto(manifestUrl, client) {
+    const cache = await caches.open(CACHE_PACCHETTI);
+    const risposta = await fetch(manifestUrl, { cache: 'no-cache' });
+    if (!risposta.ok) throw new Error('Manifest non disponibile');
+    const manifest = await risposta.json();
+
+    // Revisioni del manifest già scaricato (se presente)
+    const precedenti = {};
+    const vecchia = await cache.match(manifestUrl);
+    if (vecchia) {
+        const vecchioManifest = await vecchia.json();
+        vecchioManifest.risorse.forEach(r => { precedenti[r.url] = r.revisione; });
+    }
+
+    const nuove = manifest.risorse.filter(r => precedenti[r.url] !== r.revisione);
+    const attuali = new Set(manifest.risorse.map(r => r.url));
+    const rimosse = Object.keys(precedenti).filter(url => !attuali.has(url));
+
+    let completate = 0;
+    const fallite = new Set();
+    for (const risorsa of nuove) {
+        try {
+            const r = await fetch(risorsa.url, { cache: 'reload' });
+            if (!r.ok) throw new Error(r.status);
+            await cache.put(risorsa.url, r);
+        } catch (e) {
+            fallite.add(risorsa.url);
+        }
+        completate += 1;
+        if (client) {
+            client.postMessage({ tipo: 'pacchetto-progresso', completate, totale: nuove.length });
+        }
+    }
+    await Promise.all(rimosse.map(url => cache.delete(url)));
+    // Le risorse non scaricate restano nel manifest salvato senza revisione:
+    // verranno ritentate al prossimo aggiornamento
+    const salvato = {
+        ...manifest,
+        risorse: manifest.risorse.map(r => (fallite.has(r.url) ? { ...r, revisione: null } : r)),
+    };
+    await cache.put(manifestUrl, new Response(JSON.stringify(salvato), {
+        headers: { 'Content-Type': 'application/json' },
+    }));
+
+    if (client) {
+        client.postMessage({
+            tipo: 'pacchetto-completato',
+            versione: manifest.versione,
+            scaricate: nuove.length - fallite.size,
+            fallite: fallite.size,
+            totale: manifest.risorse.length,
+        });
+    }
+}
+
+self.addEventListener('message', event => {
+    const dati = event.data || {};
+    if (dati.tipo === 'scarica-pacchetto' && dati.manifest) {
+        event.waitUntil(
+            scaricaPacchetto(dati.manifest, event.source).catch(() => {
+                if (event.source) event.source.postMessage({ tipo: 'pacchetto-errore' });
+            })
+        );
+    }
+});
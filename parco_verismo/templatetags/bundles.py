@@ -0,0 +1,60 @@
+"""
+Template tag per includere i bundle statici definiti in settings.STATIC_BUNDLES.
+
+Uso:
+    {% load bundles %}
+    {% bundle 'bundles/base.css' %}
+    {% bundle 'bundles/base.js' %}
+    {% css_pagina 'bundles/base.css' %}
+"""
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from ..utils.static_bundles import file_bundle, get_css_pagina
+
+register = template.Library()
+
+
+@register.simple_tag
+def bundle(nome):
+    """
+    Genera i tag <link>/<script> di un bundle.
+
+    Con la pipeline attiva produce un solo tag verso il file con hash,
+    altrimenti un tag per ogni file sorgente.
+    """
+    percorsi = file_bundle(nome)
+    if nome.endswith(".css"):
+        return format_html_join(
+            "\n", '<link rel="stylesheet" href="{}">', ((static(p),) for p in percorsi)
+        )
+    return format_html_join("\n", '<script src="{}"></script>', ((static(p),) for p in percorsi))
+
+
+@register.simple_tag(takes_context=True)
+def css_pagina(context, nome):
+    """
+    CSS della pagina corrente.
+
+    Se per la pagina esiste un CSS purgato (estrai_css_pagine) inserisce il
+    CSS critico in linea e carica il foglio purgato senza bloccare il
+    rendering; altrimenti include il bundle comune.
+    """
+    request = context.get("request")
+    corrispondenza = getattr(request, "resolver_match", None)
+    pagina = get_css_pagina(corrispondenza.url_name if corrispondenza else None)
+    if not pagina:
+        return bundle(nome)
+
+    url = static(pagina["css"])
+    return format_html(
+        "<style>{}</style>\n"
+        '<link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '<noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(pagina["critico"]),
+        url,
+        url,
+    )
@@ -0,0 +1,67 @@
+"""
+Template tag per la cache dei frammenti comuni a tutte le pagine
+(navbar, footer, banner dei cookie).
+
+Come {% cache %} di Django, ma la chiave include sempre la lingua attiva e
+la versione del build (template, traduzioni, manifest dei file statici):
+dopo un deploy i frammenti vengono rigenerati senza svuotare la cache.
+La durata è settings.FRAMMENTI_CACHE_TIMEOUT (0 = nessuna cache).
+
+Uso:
+    {% load frammenti %}
+    {% frammento "navbar" is_homepage %}...{% endframmento %}
+"""
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils import translation
+
+from ..utils.decorators import versione_build
+
+register = template.Library()
+
+
+class FrammentoNode(template.Node):
+    def __init__(self, nodelist, nome, vary_on):
+        self.nodelist = nodelist
+        self.nome = nome
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = settings.FRAMMENTI_CACHE_TIMEOUT
+        if not timeout:
+            return self.nodelist.render(context)
+
+        vary_on = [translation.get_language(), versione_build()[0]]
+        vary_on += [var.resolve(context) for var in self.vary_on]
+        chiave = make_template_fragment_key(self.nome, vary_on)
+        contenuto = cache.get(chiave)
+        if contenuto is None:
+            contenuto = self.nodelist.render(context)
+            cache.set(chiave, contenuto, timeout)
+        return contenuto
+
+
+@register.tag
+def frammento(parser, token):
+    """
+    Frammento in cache per lingua e versione del build.
+
+    Gli argomenti dopo il nome sono le variabili da cui dipende il frammento
+    (es. la variante della navbar per la homepage).
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' richiede il nome del frammento")
+    nodelist = parser.parse(("endframmento",))
+    parser.delete_first_token()
+    nome = bits[1].strip("'\"")
+    return FrammentoNode(nodelist, nome, [parser.compile_filter(bit) for bit in bits[2:]])
+
+
+@register.filter
+def pagina_home(request):
+    """True se la richiesta è per la homepage (in qualsiasi lingua)."""
+    return request.path in ("/", "/it/", "/en/")
@@ -0,0 +1,25 @@
+"""
+Template tag per il cambio lingua.
+
+Uso:
+    {% load lingue %}
+    <a href="{% url_in_lingua 'en' %}">English</a>
+"""
+
+from django import template
+from django.urls import translate_url
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def url_in_lingua(context, codice):
+    """
+    URL della pagina corrente nella lingua indicata.
+
+    La lingua dipende solo dal prefisso dell'URL (i18n_patterns): un
+    semplice link sostituisce il POST a set_language, che richiedeva un
+    token CSRF (e quindi un cookie) in ogni pagina.
+    """
+    request = context["request"]
+    return translate_url(request.get_full_path(), codice)
@@ -0,0 +1,24 @@
+"""
+Template tag per il video di sfondo della homepage.
+
+Uso:
+    {% load video %}
+    {% video_hero %}
+"""
+
+from django import template
+
+from ..services.video_service import get_video_hero
+
+register = template.Library()
+
+
+@register.inclusion_tag("parco_verismo/components/video_hero.html")
+def video_hero(classe="videobg"):
+    """
+    Video con una sorgente per fascia di larghezza (attributo media) e poster.
+
+    Il video non viene scaricato finché lo script della pagina non decide di
+    avviarlo: su mobile, con Save-Data o con movimento ridotto resta il poster.
+    """
+    return {"video": get_video_hero(), "classe": classe}
@@ -0,0 +1,35 @@
+"""
+CSS purgato per pagina (estrai_css_pagine) indipendente dai contenuti.
+
+Con il database vuoto le card dei cicli {% for %} non compaiono nell'HTML:
+le loro classi arrivano dai sorgenti dei template inclusi.
+"""
+
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from parco_verismo.utils.css_purge import classi_template
+
+
+class ClassiTemplateTest(TestCase):
+    def test_ignora_tag_e_variabili(self):
+        sorgente = (
+            '<a class="nav-link {% if attiva == "home" %}active{% endif %} {{ extra }}">'
+            "<div class='col-md-6 mb-4'>{# class=\"commento\" #}</div>"
+        )
+        self.assertEqual(classi_template(sorgente), {"nav-link", "active", "col-md-6", "mb-4"})
+
+
+class EstraiCssPagineTest(TestCase):
+    def test_card_degli_eventi_con_database_vuoto(self):
+        with tempfile.TemporaryDirectory() as cartella, override_settings(CSS_PAGINE_ROOT=cartella):
+            call_command("estrai_css_pagine", pagina=["eventi"], stdout=StringIO())
+            css = (Path(cartella) / "eventi.css").read_text(encoding="utf-8")
+
+        # Classi di components/evento_card.html, incluso solo dentro il ciclo
+        for classe in ("col-md-6", "col-lg-4", "mb-4"):
+            self.assertIn(f".{classe}{{", css)
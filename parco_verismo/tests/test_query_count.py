@@ -0,0 +1,85 @@
+"""
+Numero di query costante per le pagine con elenchi di contenuti.
+
+Ogni pagina viene richiesta con N contenuti per modello e poi con 3N: le
+traduzioni (with_translations) e gli autori delle opere vengono letti con
+un numero fisso di query, quindi il conteggio non deve cambiare.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import translation
+
+from parco_verismo.services.dati_sintetici_service import genera_contenuti
+
+# Contenuti per modello nella prima misura (la seconda ne ha il triplo)
+N = 4
+
+PAGINE_ELENCO = (
+    "home",
+    "biblioteca",
+    "eventi",
+    "calendario",
+    "notizie",
+    "documenti",
+    "verga_capuana_fotografi",
+    "itinerari_verghiani",
+    "itinerari_capuaniani",
+    "itinerari_tematici",
+)
+
+
+def _crea_contenuti(quantita, seed):
+    genera_contenuti(
+        {
+            "autori": max(quantita // 2, 1),
+            "opere": quantita,
+            "eventi": quantita,
+            "notizie": quantita,
+            "documenti": quantita,
+            "fotografie": quantita,
+            "itinerari": quantita,
+        },
+        seed=seed,
+    )
+
+
+# Il rate limiting per IP bloccherebbe le richieste in sequenza
+@override_settings(MIDDLEWARE=[m for m in settings.MIDDLEWARE if not m.endswith("SimpleRateLimitMiddleware")])
+class QueryCostantiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _crea_contenuti(N, seed=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def _url(self, nome, lingua):
+        with translation.override(lingua):
+            return reverse(nome)
+
+    def _richiedi(self, url):
+        # A cache vuota: si misura sempre il rendering completo
+        cache.clear()
+        risposta = self.client.get(url, secure=True)
+        self.assertEqual(risposta.status_code, 200, url)
+        return risposta
+
+    def test_query_costanti_con_il_triplo_dei_contenuti(self):
+        url = [self._url(nome, lingua) for nome in PAGINE_ELENCO for lingua, _ in settings.LANGUAGES]
+
+        query = {}
+        for indirizzo in url:
+            with CaptureQueriesContext(connection) as catturate:
+                self._richiedi(indirizzo)
+            query[indirizzo] = len(catturate)
+
+        _crea_contenuti(2 * N, seed=2)
+
+        for indirizzo in url:
+            with self.subTest(url=indirizzo), self.assertNumQueries(query[indirizzo]):
+                self._richiedi(indirizzo)
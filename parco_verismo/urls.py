@@ -11,11 +11,13 @@ from .views import (
     documenti_view, documento_detail_view, verga_capuana_fotografi_view,
     itinerari_verghiani_view, itinerari_capuaniani_view, 
     itinerari_tematici_view, itinerario_detail_view,
+    pianifica_itinerario_view, pianifica_itinerario_api_view,
+    itinerario_dati_view, pacchetto_offline_view,
     licodia_view, mineo_view, vizzini_view,
     missione_visione_view, comitato_tecnico_scientifico_view,
     comitato_regolamento_view, regolamenti_documenti_view,
     partner_rete_territoriale_view, accrediti_finanziamenti_view,
-    contatti_view,
+    contatti_view, csrf_token_view, messaggi_view,
     privacy_policy_view, note_legali_view, cookie_policy_view,
 )
 
@@ -79,7 +81,17 @@ urlpatterns = [
     path('itinerari/capuaniani/', itinerari_capuaniani_view, name='itinerari_capuaniani'),
     path('itinerari/tematici/', itinerari_tematici_view, name='itinerari_tematici'),
     path('itinerario/<slug:slug>/', itinerario_detail_view, name='itinerario_detail'),
+    path('itinerario/<slug:slug>/dati.json', itinerario_dati_view, name='itinerario_dati'),
+    path('itinerario/<slug:slug>/offline.json', pacchetto_offline_view, name='itinerario_offline'),
+
+    # Pianificatore di itinerari personalizzati
+    path('itinerari/pianifica/', pianifica_itinerario_view, name='pianifica_itinerario'),
+    path('api/itinerari/pianifica/', pianifica_itinerario_api_view, name='pianifica_itinerario_api'),
     
+    # Frammenti dinamici delle pagine in cache (token CSRF e messaggi del modulo di contatto)
+    path('api/csrf/', csrf_token_view, name='csrf_token'),
+    path('api/messaggi/', messaggi_view, name='messaggi'),
+
     # Pagine di conformità GDPR e PA
     path('privacy/', privacy_policy_view, name='privacy_policy'),
     path('note-legali/', note_legali_view, name='note_legali'),
@@ -12,6 +12,8 @@ from .helpers import (
 from .decorators import (
     cache_page_custom,
     require_ajax,
+    risposta_condizionale,
+    pagina_condivisa,
 )
 
 from .mixins import (
@@ -28,6 +30,8 @@ __all__ = [
     # Decorators
     "cache_page_custom",
     "require_ajax",
+    "risposta_condizionale",
+    "pagina_condivisa",
     # Mixins
     "FormSuccessMessageMixin",
     "ActiveOnlyMixin",
@@ -0,0 +1,341 @@
+"""
+Utility per eliminare il CSS inutilizzato e ricavare il CSS critico di una pagina.
+
+Il CSS viene scomposto in blocchi (regole, gruppi @media/@supports, altre
+at-rule); una regola si conserva se almeno uno dei suoi selettori usa solo
+classi, id, tag e attributi presenti nella pagina. L'analisi è volutamente
+conservativa: pseudo-classi, valori degli attributi e selettori funzionali
+(:not, :is, ...) non escludono mai una regola.
+"""
+
+import re
+from html.parser import HTMLParser
+
+# At-rule che contengono altre regole
+GRUPPI = ("@media", "@supports", "@container", "@layer", "@document")
+
+# At-rule sempre conservate nel CSS completo (non nel CSS critico)
+_FONT_FACE = "@font-face"
+_KEYFRAMES = re.compile(r"@(?:-[a-z]+-)?keyframes\s+([\w-]+)", re.I)
+
+_PSEUDO_FUNZIONALE = re.compile(r":{1,2}[\w-]+\([^()]*(?:\([^()]*\)[^()]*)*\)")
+_ATTRIBUTO = re.compile(r"\[\s*([\w-]+)[^\]]*\]")
+_PSEUDO = re.compile(r":{1,2}[\w-]+")
+_CLASSE = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+_ID = re.compile(r"#(-?[_a-zA-Z][\w-]*)")
+_COMBINATORI = re.compile(r"[\s>+~]+")
+_TAG = re.compile(r"^([a-zA-Z][a-zA-Z0-9-]*)")
+_STRINGA_JS = re.compile(r"""(["'`])((?:\\.|(?!\1)[^\\\n])*)\1""")
+_PAROLA = re.compile(r"-?[_a-zA-Z][\w-]*")
+_TAG_TEMPLATE = re.compile(r"{{.*?}}|{%.*?%}|{#.*?#}", re.S)
+_CLASS_TEMPLATE = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.I)
+
+# Tag sempre considerati presenti
+TAG_SEMPRE = {"html", "body", "head"}
+
+
+class Usati:
+    """Insieme di classi, id, tag e nomi di attributi usati da una pagina."""
+
+    def __init__(self):
+        self.classi = set()
+        self.id = set()
+        self.tag = set(TAG_SEMPRE)
+        self.attributi = set()
+
+    def aggiorna(self, altro):
+        self.classi |= altro.classi
+        self.id |= altro.id
+        self.tag |= altro.tag
+        self.attributi |= altro.attributi
+        return self
+
+    def aggiungi_parole(self, parole):
+        """Aggiunge parole che possono essere classi, id o attributi (es. stringhe JS)."""
+        self.classi.update(parole)
+        self.id.update(parole)
+        self.attributi.update(parole)
+
+
+class _RaccoltaHTML(HTMLParser):
+    def __init__(self, limite_elementi=None):
+        super().__init__(convert_charrefs=True)
+        self.usati = Usati()
+        self.script = []
+        self.limite = limite_elementi
+        self.elementi_body = 0
+        self._in_body = False
+        self._in_script = False
+
+    def handle_starttag(self, tag, attrs):
+        if self._in_body:
+            self.elementi_body += 1
+            if self.limite is not None and self.elementi_body > self.limite:
+                return
+        elif tag == "body":
+            self._in_body = True
+
+        self.usati.tag.add(tag.lower())
+        for nome, valore in attrs:
+            self.usati.attributi.add(nome)
+            if nome == "class" and valore:
+                self.usati.classi.update(valore.split())
+            elif nome == "id" and valore:
+                self.usati.id.add(valore)
+        self._in_script = tag == "script"
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self._in_script = False
+
+    def handle_data(self, data):
+        if self._in_script:
+            self.script.append(data)
+
+
+def raccogli_usati_html(html, limite_elementi=None):
+    """
+    Raccoglie classi, id e tag di un documento HTML.
+
+    Args:
+        html: Markup della pagina
+        limite_elementi: Se indicato, considera solo i primi N elementi del
+            body (approssimazione della parte "above the fold")
+
+    Returns:
+        Tupla (Usati, testo degli script inline)
+    """
+    parser = _RaccoltaHTML(limite_elementi)
+    parser.feed(html)
+    parser.close()
+    return parser.usati, "\n".join(parser.script)
+
+
+def parole_js(testo):
+    """Parole contenute nelle stringhe di un sorgente JS (classi aggiunte a runtime)."""
+    parole = set()
+    for match in _STRINGA_JS.finditer(testo):
+        parole.update(_PAROLA.findall(match.group(2)))
+    return parole
+
+
+def classi_template(sorgente):
+    """
+    Classi scritte negli attributi class di un sorgente di template Django.
+
+    Tag e variabili del template vengono ignorati: restano i nomi letterali,
+    compresi quelli dei rami {% if %} e dei cicli {% for %} che con i dati
+    attuali non producono HTML.
+    """
+    classi = set()
+    for match in _CLASS_TEMPLATE.finditer(_TAG_TEMPLATE.sub(" ", sorgente)):
+        classi.update(_PAROLA.findall(match.group(1) or match.group(2) or ""))
+    return classi
+
+
+def _fine_prelude(testo, inizio):
+    """Posizione del primo '{', ';' o '}' fuori dalle stringhe."""
+    i = inizio
+    n = len(testo)
+    while i < n:
+        c = testo[i]
+        if c in "\"'":
+            i = _fine_stringa(testo, i)
+        elif c in "{;}":
+            return i
+        i += 1
+    return n
+
+
+def _fine_stringa(testo, inizio):
+    quote = testo[inizio]
+    i = inizio + 1
+    while i < len(testo):
+        if testo[i] == "\\":
+            i += 2
+            continue
+        if testo[i] == quote:
+            return i
+        i += 1
+    return len(testo)
+
+
+def _chiusura_blocco(testo, apertura):
+    """Posizione della '}' che chiude il blocco aperto in 'apertura'."""
+    profondita = 0
+    i = apertura
+    n = len(testo)
+    while i < n:
+        c = testo[i]
+        if c in "\"'":
+            i = _fine_stringa(testo, i)
+        elif c == "{":
+            profondita += 1
+        elif c == "}":
+            profondita -= 1
+            if profondita == 0:
+                return i
+        i += 1
+    return n
+
+
+def analizza_css(testo):
+    """
+    Scompone un foglio di stile (senza commenti) in blocchi.
+
+    Returns:
+        Lista di tuple (tipo, prelude, contenuto) con tipo 'regola',
+        'gruppo' (contenuto = lista di blocchi), 'at' (contenuto testuale)
+        o 'istruzione' (es. @import, contenuto None)
+    """
+    blocchi = []
+    i = 0
+    n = len(testo)
+    while i < n:
+        j = _fine_prelude(testo, i)
+        prelude = testo[i:j].strip()
+        if j >= n:
+            break
+        if testo[j] == ";":
+            if prelude:
+                blocchi.append(("istruzione", prelude, None))
+            i = j + 1
+            continue
+        if testo[j] == "}":
+            i = j + 1
+            continue
+
+        k = _chiusura_blocco(testo, j)
+        corpo = testo[j + 1:k]
+        minuscolo = prelude.lower()
+        if minuscolo.startswith(GRUPPI):
+            blocchi.append(("gruppo", prelude, analizza_css(corpo)))
+        elif minuscolo.startswith("@"):
+            blocchi.append(("at", prelude, corpo))
+        else:
+            blocchi.append(("regola", prelude, corpo))
+        i = k + 1
+    return blocchi
+
+
+def _selettore_usato(selettore, usati, safelist):
+    semplice = _PSEUDO_FUNZIONALE.sub("", selettore)
+    for attributo in _ATTRIBUTO.findall(semplice):
+        if attributo.lower() not in usati.attributi:
+            return False
+    semplice = _ATTRIBUTO.sub("", semplice)
+    semplice = _PSEUDO.sub("", semplice)
+
+    for classe in _CLASSE.findall(semplice):
+        if classe not in usati.classi and not _in_safelist(classe, safelist):
+            return False
+    for id_ in _ID.findall(semplice):
+        if id_ not in usati.id and not _in_safelist(id_, safelist):
+            return False
+
+    semplice = _CLASSE.sub(" ", _ID.sub(" ", semplice))
+    for parte in _COMBINATORI.split(semplice):
+        tag = _TAG.match(parte)
+        if tag and tag.group(1).lower() not in usati.tag:
+            return False
+    return True
+
+
+def _in_safelist(nome, safelist):
+    return any(pattern.search(nome) for pattern in safelist)
+
+
+def _separa_selettori(prelude):
+    """Divide una lista di selettori sulle virgole esterne alle parentesi."""
+    selettori = []
+    profondita = 0
+    inizio = 0
+    for i, c in enumerate(prelude):
+        if c in "([":
+            profondita += 1
+        elif c in ")]":
+            profondita -= 1
+        elif c == "," and profondita == 0:
+            selettori.append(prelude[inizio:i])
+            inizio = i + 1
+    selettori.append(prelude[inizio:])
+    return [s.strip() for s in selettori if s.strip()]
+
+
+def _filtra(blocchi, usati, safelist, critico):
+    risultato = []
+    for tipo, prelude, contenuto in blocchi:
+        if tipo == "regola":
+            selettori = [s for s in _separa_selettori(prelude) if _selettore_usato(s, usati, safelist)]
+            if selettori:
+                risultato.append(f"{','.join(selettori)}{{{contenuto}}}")
+        elif tipo == "gruppo":
+            interno = _filtra(contenuto, usati, safelist, critico)
+            if interno:
+                risultato.append(f"{prelude}{{{''.join(interno)}}}")
+        elif tipo == "at":
+            if critico and prelude.lower().startswith(_FONT_FACE):
+                continue
+            risultato.append(f"{prelude}{{{contenuto}}}")
+        else:
+            risultato.append(f"{prelude};")
+    return risultato
+
+
+def _serializza(blocchi):
+    parti = []
+    for tipo, prelude, contenuto in blocchi:
+        if tipo == "gruppo":
+            parti.append(f"{prelude}{{{_serializza(contenuto)}}}")
+        elif tipo == "istruzione":
+            parti.append(f"{prelude};")
+        else:
+            parti.append(f"{prelude}{{{contenuto}}}")
+    return "".join(parti)
+
+
+def _rimuovi_keyframes_inutili(css):
+    """Elimina i @keyframes il cui nome non compare nel resto del foglio."""
+    blocchi = analizza_css(css)
+    keyframes = {
+        i: match.group(1)
+        for i, (tipo, prelude, _) in enumerate(blocchi)
+        if tipo == "at" and (match := _KEYFRAMES.match(prelude))
+    }
+    resto = _serializza([b for i, b in enumerate(blocchi) if i not in keyframes])
+    return _serializza([
+        b for i, b in enumerate(blocchi) if i not in keyframes or keyframes[i] in resto
+    ])
+
+
+def _entro_limite(parti, limite_byte):
+    """Prime regole (nell'ordine del foglio) che stanno entro limite_byte."""
+    risultato = []
+    totale = 0
+    for parte in parti:
+        totale += len(parte.encode("utf-8"))
+        if totale > limite_byte:
+            break
+        risultato.append(parte)
+    return risultato
+
+
+def purga_css(blocchi, usati, safelist=(), critico=False, limite_byte=None):
+    """
+    Restituisce il CSS con le sole regole usate dalla pagina.
+
+    Args:
+        blocchi: Risultato di analizza_css()
+        usati: Istanza Usati della pagina
+        safelist: Pattern regex compilati di classi/id da conservare sempre
+        critico: Se True omette @font-face (i font arrivano col foglio completo)
+        limite_byte: Dimensione massima: raggiunta questa, le regole
+            successive vengono tralasciate (arrivano col foglio completo)
+
+    Returns:
+        CSS minificato
+    """
+    parti = _filtra(blocchi, usati, safelist, critico)
+    if limite_byte is not None:
+        parti = _entro_limite(parti, limite_byte)
+    return _rimuovi_keyframes_inutili("".join(parti))
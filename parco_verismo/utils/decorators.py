@@ -2,9 +2,18 @@
 Decoratori custom per il progetto.
 """
 
-from functools import wraps
+import hashlib
+from functools import lru_cache, wraps
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
 from django.core.cache import cache
-from django.http import HttpResponse
+from django.http import HttpResponse, QueryDict
+from django.utils.cache import get_conditional_response, has_vary_header, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
 
 
 def cache_page_custom(timeout=300, key_prefix="view"):
@@ -52,3 +61,162 @@ def require_ajax(view_func):
         return view_func(request, *args, **kwargs)
 
     return wrapper
+
+
+def _calcola_versione_build():
+    """
+    Impronta dei file che cambiano l'HTML a parità di contenuti: template,
+    traduzioni compilate e manifest dei file statici (URL con hash).
+
+    Returns:
+        Tupla (impronta, timestamp del file modificato più di recente)
+    """
+    cartelle = [Path(apps.get_app_config("parco_verismo").path) / "templates"]
+    cartelle += [Path(p) for p in settings.LOCALE_PATHS]
+    digest = hashlib.sha256()
+    ultima_modifica = 0
+    for cartella in cartelle:
+        for file in sorted(cartella.rglob("*")):
+            if file.suffix not in (".html", ".txt", ".xml", ".mo"):
+                continue
+            stat = file.stat()
+            digest.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+            ultima_modifica = max(ultima_modifica, int(stat.st_mtime))
+    read_manifest = getattr(staticfiles_storage, "read_manifest", None)
+    if read_manifest:
+        digest.update((read_manifest() or "").encode())
+    return digest.hexdigest()[:16], ultima_modifica
+
+
+@lru_cache(maxsize=1)
+def _versione_build_cache():
+    return _calcola_versione_build()
+
+
+def versione_build():
+    """Impronta e data dell'ultimo build (vedi _calcola_versione_build)."""
+    # In sviluppo i template cambiano senza riavviare il processo
+    return _calcola_versione_build() if settings.DEBUG else _versione_build_cache()
+
+
+def risposta_condizionale(modello, campi_data=("updated_at",), **filtri):
+    """
+    Decoratore per le view di dettaglio con parametro ``slug``: risponde 304
+    a If-None-Match/If-Modified-Since con una sola query sull'indice dello
+    slug, prima di caricare l'oggetto e le sue traduzioni.
+
+    ETag e Last-Modified dipendono dalle date di modifica, dalla lingua e
+    dalla versione di template e file statici (cambiano ad ogni deploy).
+    La risposta ha Cache-Control no-cache: il browser la riusa solo dopo
+    averla rivalidata.
+
+    Args:
+        modello: Modello con campo slug
+        campi_data: Date di modifica che influiscono sulla pagina, anche di
+            modelli collegati (es. "autore__updated_at")
+        **filtri: Filtri aggiuntivi della view (es. is_active=True)
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, slug, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, slug, *args, **kwargs)
+
+            date = modello.objects.filter(slug=slug, **filtri).values_list(*campi_data).first()
+            if date is None:
+                # Contenuto inesistente: la view risponde 404
+                return view_func(request, slug, *args, **kwargs)
+
+            versione, data_build = versione_build()
+            date = [d for d in date if d is not None]
+            ultima_modifica = int(max([d.timestamp() for d in date] + [data_build]))
+            impronta = "|".join([slug, get_language() or "", versione, *(d.isoformat() for d in date)])
+            etag = quote_etag(hashlib.sha256(impronta.encode("utf-8")).hexdigest()[:16])
+
+            response = get_conditional_response(request, etag=etag, last_modified=ultima_modifica)
+            if response is None:
+                response = view_func(request, slug, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers.setdefault("ETag", etag)
+                response.headers.setdefault("Last-Modified", http_date(ultima_modifica))
+                patch_cache_control(response, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def pagina_condivisa(sezioni=()):
+    """
+    Decoratore per le pagine identiche per tutti i visitatori (es. home e
+    contatti): l'HTML della GET viene salvato nella cache di Django e servito
+    con Cache-Control public ed ETag, così può stare anche in una cache
+    condivisa.
+
+    Il rendering della GET non deve usare sessione, token CSRF o messaggi
+    (arrivano dai frammenti di views/frammenti.py): se il rendering legge la
+    sessione o chiede il token CSRF, o la risposta imposta cookie, la pagina
+    non viene salvata. Vary: Cookie e il cookie CSRF vengono aggiunti dopo,
+    dai middleware esterni: qui si controllano request.session.accessed e
+    CSRF_COOKIE_NEEDS_UPDATE. Le POST passano direttamente
+    alla view. La query string non cambia la pagina e non entra nella chiave:
+    viene tolta dalla richiesta prima del rendering, così gli URL assoluti
+    (og:url) e i link alle altre lingue dell'HTML salvato non la contengono.
+
+    Args:
+        sezioni: Sezioni di contenuto mostrate dalla pagina: un salvataggio
+            in una di queste rende obsoleta la copia in cache
+    """
+
+    # Import locale: i modelli importano parco_verismo.utils
+    from ..services.cache_service import versioni_sezioni
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, *args, **kwargs)
+
+            if request.META.get("QUERY_STRING"):
+                request.META["QUERY_STRING"] = ""
+                request.GET = QueryDict()
+
+            impronta = "|".join([
+                request.get_host(), request.path, get_language() or "",
+                versione_build()[0], versioni_sezioni(sezioni),
+            ])
+            chiave = f"pagina:{hashlib.sha256(impronta.encode('utf-8')).hexdigest()[:32]}"
+
+            dati = cache.get(chiave)
+            if dati is None:
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, "render"):
+                    response.render()
+                sessione = getattr(request, "session", None)
+                if (
+                    response.status_code != 200
+                    or response.cookies
+                    or has_vary_header(response, "Cookie")
+                    or request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+                    or (sessione is not None and sessione.accessed)
+                ):
+                    return response
+                dati = {
+                    "contenuto": response.content,
+                    "content_type": response["Content-Type"],
+                    "etag": quote_etag(hashlib.sha256(response.content).hexdigest()[:16]),
+                }
+                cache.set(chiave, dati, settings.PAGINE_CONDIVISE_TIMEOUT)
+
+            response = get_conditional_response(request, etag=dati["etag"])
+            if response is None:
+                response = HttpResponse(dati["contenuto"], content_type=dati["content_type"])
+            response["ETag"] = dati["etag"]
+            patch_cache_control(response, public=True, max_age=settings.PAGINE_CONDIVISE_MAX_AGE)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,120 @@
+"""
+Utility geometriche per itinerari e tappe (calcoli vettoriali con NumPy).
+
+Le coordinate seguono la convenzione di Leaflet: [lat, lng] in gradi.
+"""
+
+import numpy as np
+
+RAGGIO_TERRA = 6371000.0  # metri
+
+# Velocità media a piedi (m/s), circa 4.5 km/h
+VELOCITA_PEDONALE = 1.25
+
+# Centro Sicilia, usato quando non ci sono coordinate valide
+CENTRO_DEFAULT = [37.5, 14.7]
+
+
+def tappe_ordinate(tappe):
+    """
+    Restituisce le tappe ordinate per campo 'order'.
+
+    Args:
+        tappe: Lista di tappe (dict con 'coords' e 'order')
+
+    Returns:
+        Nuova lista ordinata (lista vuota se il JSON non è valido)
+    """
+    if not tappe or not isinstance(tappe, list):
+        return []
+    return sorted(tappe, key=lambda x: x.get("order", 0))
+
+
+def coordinate_array(tappe):
+    """
+    Estrae le coordinate valide delle tappe in un array (n, 2).
+
+    Args:
+        tappe: Lista di tappe nell'ordine di percorrenza
+
+    Returns:
+        Array NumPy float64 di forma (n, 2) con [lat, lng]
+    """
+    coords = [
+        tappa["coords"][:2]
+        for tappa in tappe or []
+        if isinstance(tappa, dict) and "coords" in tappa and len(tappa["coords"]) >= 2
+    ]
+    return np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+
+
+def haversine(a, b):
+    """
+    Distanza haversine in metri, vettorializzata.
+
+    Args:
+        a: Array (..., 2) di coordinate [lat, lng]
+        b: Array (..., 2) di coordinate [lat, lng], broadcastable con a
+
+    Returns:
+        Array (o scalare) di distanze in metri
+    """
+    a = np.radians(np.asarray(a, dtype=np.float64))
+    b = np.radians(np.asarray(b, dtype=np.float64))
+    dlat = b[..., 0] - a[..., 0]
+    dlng = b[..., 1] - a[..., 1]
+    h = np.sin(dlat / 2) ** 2 + np.cos(a[..., 0]) * np.cos(b[..., 0]) * np.sin(dlng / 2) ** 2
+    return 2 * RAGGIO_TERRA * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def bounding_box(coords):
+    """Restituisce [[lat_min, lng_min], [lat_max, lng_max]] o None se vuoto."""
+    if not len(coords):
+        return None
+    return [coords.min(axis=0).tolist(), coords.max(axis=0).tolist()]
+
+
+def centroide(coords):
+    """Restituisce il centro medio [lat, lng] o il centro di default se vuoto."""
+    if not len(coords):
+        return list(CENTRO_DEFAULT)
+    return coords.mean(axis=0).tolist()
+
+
+def distanze_tratte(coords):
+    """Distanze haversine (metri) tra tappe consecutive, array di lunghezza n-1."""
+    if len(coords) < 2:
+        return np.zeros(0)
+    return haversine(coords[:-1], coords[1:])
+
+
+def durate_tratte(distanze, velocita=VELOCITA_PEDONALE):
+    """Durate stimate (secondi) a piedi per ogni tratta."""
+    return np.asarray(distanze, dtype=np.float64) / velocita
+
+
+def calcola_geometria(tappe):
+    """
+    Calcola in un solo passaggio tutti i dati geometrici di un itinerario.
+
+    Args:
+        tappe: Lista di tappe (anche non ordinate)
+
+    Returns:
+        Dict con centro, bounding box, lunghezza totale (m), durata (s)
+        e dettaglio per tratta
+    """
+    coords = coordinate_array(tappe_ordinate(tappe))
+    distanze = distanze_tratte(coords)
+    durate = durate_tratte(distanze)
+
+    return {
+        "centro": centroide(coords),
+        "bbox": bounding_box(coords),
+        "lunghezza": round(float(distanze.sum()), 1),
+        "durata": int(round(float(durate.sum()))),
+        "tratte": [
+            {"distanza": round(float(d), 1), "durata": int(round(float(t)))}
+            for d, t in zip(distanze, durate)
+        ],
+    }
@@ -4,6 +4,10 @@ from PIL import Image
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import InMemoryUploadedFile
 
+from .metriche import cronometro
+
+
+@cronometro("parco_immagini_ottimizzazione_secondi")
 def optimize_image(image_field, max_width=1920, quality=85):
     """
     Ottimizza un'immagine: la converte in WebP e applica una compressione 
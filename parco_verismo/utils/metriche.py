@@ -0,0 +1,269 @@
+"""
+Registro delle metriche in formato Prometheus, condiviso tra i worker di
+Gunicorn.
+
+Ogni processo accumula contatori e istogrammi in memoria e li scrive (al
+massimo ogni METRICHE_INTERVALLO secondi, e all'uscita) in un file JSON
+suo in METRICHE_DIR; la vista /metrics somma i file di tutti i processi.
+I file dei worker terminati restano: i contatori non tornano indietro
+quando Gunicorn ricicla un worker. I gauge (valori istantanei) invece
+contano solo per i processi ancora vivi. Ogni processo ha un file con un
+suffisso casuale, così un PID riusato non sovrascrive i contatori di un
+worker terminato; il master di Gunicorn svuota la cartella all'avvio
+(azzera_metriche, hook on_starting in gunicorn.conf.py).
+
+Uso:
+    incrementa("parco_rate_limit_rifiuti_totale", metodo="GET")
+    imposta("parco_db_pool_connessioni", 3, database="default")
+    osserva("parco_http_risposte_byte", len(contenuto), vista="home")
+    with cronometro("parco_email_invio_secondi", tipo="conferma"):
+        send_mail(...)
+"""
+
+import atexit
+import json
+import math
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+BUCKET_SECONDI = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKET_BYTE = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Nome -> (tipo, descrizione, bucket degli istogrammi)
+METRICHE = {
+    "parco_http_richieste_totale": ("counter", "Richieste per nome URL e classe di stato", None),
+    "parco_http_durata_secondi": ("histogram", "Latenza delle richieste per nome URL", BUCKET_SECONDI),
+    "parco_http_risposte_byte": ("histogram", "Dimensione delle risposte per nome URL", BUCKET_BYTE),
+    "parco_cache_letture_totale": ("counter", "Letture della cache di Django per esito (hit/miss)", None),
+    "parco_rate_limit_rifiuti_totale": ("counter", "Richieste rifiutate dal rate limiting (429)", None),
+    "parco_immagini_ottimizzazione_secondi": ("histogram", "Durata dell'ottimizzazione delle immagini", BUCKET_SECONDI),
+    "parco_email_invio_secondi": ("histogram", "Durata dell'invio delle email", BUCKET_SECONDI),
+    "parco_db_pool_connessioni": ("gauge", "Connessioni aperte nei pool di PostgreSQL", None),
+    "parco_db_pool_disponibili": ("gauge", "Connessioni libere nei pool di PostgreSQL", None),
+    "parco_db_pool_in_attesa": ("gauge", "Richieste in attesa di una connessione del pool", None),
+    "parco_db_pool_richieste_totale": ("counter", "Connessioni prese dal pool", None),
+    "parco_db_pool_attesa_secondi_totale": ("counter", "Tempo totale di attesa di una connessione del pool", None),
+    "parco_db_pool_errori_totale": ("counter", "Richieste al pool fallite (timeout)", None),
+    "parco_db_pool_connessioni_create_totale": ("counter", "Connessioni aperte dal pool verso PostgreSQL", None),
+}
+
+# Statistiche di psycopg_pool (pop_stats) -> metrica; i contatori arrivano
+# come differenza dall'ultima lettura, i gauge come valore attuale
+STATISTICHE_POOL = {
+    "pool_size": "parco_db_pool_connessioni",
+    "pool_available": "parco_db_pool_disponibili",
+    "requests_waiting": "parco_db_pool_in_attesa",
+    "requests_num": "parco_db_pool_richieste_totale",
+    "requests_wait_ms": "parco_db_pool_attesa_secondi_totale",
+    "requests_errors": "parco_db_pool_errori_totale",
+    "connections_num": "parco_db_pool_connessioni_create_totale",
+}
+
+
+class _Registro:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._suffisso = secrets.token_hex(4)
+        self._valori = {}
+        self._scritto = 0.0
+
+    def _chiave(self, nome, etichette):
+        if nome not in METRICHE:
+            raise KeyError(f"Metrica non registrata: {nome}")
+        return json.dumps([nome, sorted(etichette.items())])
+
+    def _controlla_pid(self):
+        # Dopo un fork (gunicorn --preload) il figlio riparte da zero
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._suffisso = secrets.token_hex(4)
+            self._valori = {}
+            self._scritto = 0.0
+
+    def incrementa(self, nome, valore, etichette):
+        chiave = self._chiave(nome, etichette)
+        with self._lock:
+            self._controlla_pid()
+            self._valori[chiave] = self._valori.get(chiave, 0) + valore
+        self._scrivi_se_scaduto()
+
+    def imposta(self, nome, valore, etichette):
+        chiave = self._chiave(nome, etichette)
+        with self._lock:
+            self._controlla_pid()
+            self._valori[chiave] = valore
+        self._scrivi_se_scaduto()
+
+    def osserva(self, nome, valore, etichette):
+        chiave = self._chiave(nome, etichette)
+        bucket = METRICHE[nome][2]
+        with self._lock:
+            self._controlla_pid()
+            istogramma = self._valori.setdefault(chiave, {"bucket": [0] * len(bucket), "somma": 0, "conteggio": 0})
+            for indice, limite in enumerate(bucket):
+                if valore <= limite:
+                    istogramma["bucket"][indice] += 1
+                    break
+            istogramma["somma"] += valore
+            istogramma["conteggio"] += 1
+        self._scrivi_se_scaduto()
+
+    def _scrivi_se_scaduto(self):
+        if time.monotonic() - self._scritto >= settings.METRICHE_INTERVALLO:
+            self.scrivi()
+
+    def scrivi(self):
+        """Scrive i valori del processo nel suo file (scrittura atomica)."""
+        with self._lock:
+            self._controlla_pid()
+            self._scritto = time.monotonic()
+            if not self._valori:
+                return
+            contenuto = json.dumps(self._valori)
+            nome = f"metriche-{self._pid}-{self._suffisso}"
+        cartella = Path(settings.METRICHE_DIR)
+        try:
+            cartella.mkdir(parents=True, exist_ok=True)
+            temporaneo = cartella / f".{nome}.tmp"
+            temporaneo.write_text(contenuto, encoding="utf-8")
+            os.replace(temporaneo, cartella / f"{nome}.json")
+        except OSError:
+            # Le metriche non devono mai far fallire una richiesta
+            pass
+
+
+_registro = _Registro()
+atexit.register(_registro.scrivi)
+
+
+def incrementa(nome, valore=1, **etichette):
+    """Incrementa un contatore."""
+    if valore:
+        _registro.incrementa(nome, valore, etichette)
+
+
+def imposta(nome, valore, **etichette):
+    """Imposta il valore attuale di un gauge."""
+    _registro.imposta(nome, valore, etichette)
+
+
+def osserva(nome, valore, **etichette):
+    """Aggiunge un'osservazione a un istogramma."""
+    _registro.osserva(nome, valore, etichette)
+
+
+@contextmanager
+def cronometro(nome, **etichette):
+    """Osserva in un istogramma la durata in secondi del blocco (usabile anche come decoratore)."""
+    inizio = time.perf_counter()
+    try:
+        yield
+    finally:
+        osserva(nome, time.perf_counter() - inizio, **etichette)
+
+
+def aggiorna_metriche_pool():
+    """Registra le statistiche dei pool di connessioni PostgreSQL del processo."""
+    from django.db import connections
+
+    for alias in connections:
+        connessione = connections[alias]
+        if connessione.vendor != "postgresql" or not connessione.settings_dict["OPTIONS"].get("pool"):
+            continue
+        statistiche = connessione.pool.pop_stats()
+        for chiave, nome in STATISTICHE_POOL.items():
+            valore = statistiche.get(chiave, 0)
+            if nome == "parco_db_pool_attesa_secondi_totale":
+                valore /= 1000
+            if METRICHE[nome][0] == "gauge":
+                imposta(nome, valore, database=alias)
+            else:
+                incrementa(nome, valore, database=alias)
+
+
+def azzera_metriche():
+    """Cancella i file delle metriche in METRICHE_DIR; da chiamare nel master di Gunicorn prima dei worker."""
+    cartella = Path(settings.METRICHE_DIR)
+    for file in [*cartella.glob("metriche-*.json"), *cartella.glob(".metriche-*.tmp")]:
+        file.unlink(missing_ok=True)
+
+
+def _vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _somma_processi():
+    """Valori di tutti i processi (file in METRICHE_DIR) sommati."""
+    _registro.scrivi()
+    totali = {}
+    for file in Path(settings.METRICHE_DIR).glob("metriche-*.json"):
+        try:
+            valori = json.loads(file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        vivo = _vivo(int(file.stem.split("-")[1]))
+        for chiave, valore in valori.items():
+            if not vivo and METRICHE.get(json.loads(chiave)[0], ("",))[0] == "gauge":
+                continue
+            if isinstance(valore, dict):
+                totale = totali.setdefault(chiave, {"bucket": [0] * len(valore["bucket"]), "somma": 0, "conteggio": 0})
+                totale["bucket"] = [a + b for a, b in zip(totale["bucket"], valore["bucket"])]
+                totale["somma"] += valore["somma"]
+                totale["conteggio"] += valore["conteggio"]
+            else:
+                totali[chiave] = totali.get(chiave, 0) + valore
+    return totali
+
+
+def _etichette(coppie, extra=()):
+    def escape(valore):
+        return str(valore).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    coppie = list(coppie) + list(extra)
+    if not coppie:
+        return ""
+    return "{" + ",".join(f'{nome}="{escape(valore)}"' for nome, valore in coppie) + "}"
+
+
+def _numero(valore):
+    if isinstance(valore, float) and not valore.is_integer():
+        return repr(valore)
+    return str(int(valore)) if math.isfinite(valore) else str(valore)
+
+
+def esposizione_prometheus():
+    """Tutte le metriche nel formato testuale di Prometheus (0.0.4)."""
+    per_nome = {}
+    for chiave, valore in _somma_processi().items():
+        nome, coppie = json.loads(chiave)
+        if nome in METRICHE:
+            per_nome.setdefault(nome, []).append((coppie, valore))
+
+    righe = []
+    for nome, (tipo, descrizione, bucket) in METRICHE.items():
+        righe += [f"# HELP {nome} {descrizione}", f"# TYPE {nome} {tipo}"]
+        for coppie, valore in sorted(per_nome.get(nome, []), key=lambda voce: voce[0]):
+            if tipo in ("counter", "gauge"):
+                righe.append(f"{nome}{_etichette(coppie)} {_numero(valore)}")
+                continue
+            cumulato = 0
+            for limite, conteggio in zip(bucket, valore["bucket"]):
+                cumulato += conteggio
+                righe.append(f"{nome}_bucket{_etichette(coppie, [('le', limite)])} {cumulato}")
+            righe.append(f"{nome}_bucket{_etichette(coppie, [('le', '+Inf')])} {valore['conteggio']}")
+            righe.append(f"{nome}_sum{_etichette(coppie)} {_numero(valore['somma'])}")
+            righe.append(f"{nome}_count{_etichette(coppie)} {valore['conteggio']}")
+    return "\n".join(righe) + "\n"
@@ -3,6 +3,7 @@ Mixins riutilizzabili per views e modelli.
 """
 
 from django.contrib import messages
+from django.db import models
 
 
 class FormSuccessMessageMixin:
@@ -28,10 +29,16 @@ class ActiveOnlyMixin:
         return queryset.filter(is_active=True)
 
 
-class TimestampMixin:
+class TimestampMixin(models.Model):
     """
-    Mixin per aggiungere campi di timestamp ai modelli.
-    Questo andrebbe aggiunto ai modelli base se necessario.
+    Mixin (modello astratto) con la data di ultima modifica.
+
+    Aggiornata ad ogni save(), anche quando cambiano solo le traduzioni
+    (parler le salva dal save() del modello). Usata per lastmod delle
+    sitemap e per le risposte condizionali (ETag/Last-Modified).
     """
 
-    pass  # Placeholder per future implementazioni
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Ultima modifica")
+
+    class Meta:
+        abstract = True
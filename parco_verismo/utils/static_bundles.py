@@ -0,0 +1,155 @@
+"""
+Bundle dei file statici (CSS/JS) caricati da base.html.
+
+I bundle sono definiti in ``settings.STATIC_BUNDLES`` (percorso del bundle ->
+lista dei file sorgente). Con ``settings.STATIC_PIPELINE`` attivo vengono
+generati durante ``collectstatic`` dallo storage del progetto
+(``parco_verismo.storage``) e poi trattati come ogni altro file statico:
+nome con hash del contenuto e copie precompresse ``.gz``/``.br``.
+In sviluppo i template includono direttamente i file sorgente.
+
+Se è stato eseguito ``manage.py estrai_css_pagine``, le pagine analizzate
+usano al posto del bundle CSS comune un foglio purgato e un blocco di CSS
+critico in linea (indice in ``pagine/critico.json``).
+"""
+
+import json
+import posixpath
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+# Stringhe CSS (da preservare) oppure commenti (da eliminare)
+_TOKEN_CSS = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|/\*.*?\*/", re.S)
+_SPAZI_CSS = re.compile(r"\s+")
+_SPAZI_SEPARATORI_CSS = re.compile(r"\s*([{};,>])\s*")
+_CHARSET_CSS = re.compile(r"@charset\s+(\"[^\"]*\"|'[^']*')\s*;", re.I)
+_URL_CSS = re.compile(r"""url\(\s*(?:"(?P<doppi>[^"]*)"|'(?P<singoli>[^']*)'|(?P<url>[^)\s]*))\s*\)""", re.I)
+_SOURCEMAP = re.compile(r"^\s*(//|/\*)# sourceMappingURL=.*$", re.M)
+
+
+def get_bundles():
+    """Restituisce la configurazione dei bundle (percorso -> sorgenti)."""
+    return getattr(settings, "STATIC_BUNDLES", {})
+
+
+def pipeline_attiva():
+    """Indica se i template devono usare i bundle al posto dei singoli file."""
+    return getattr(settings, "STATIC_PIPELINE", False)
+
+
+def file_bundle(nome):
+    """
+    Restituisce i percorsi statici da includere per un bundle.
+
+    Args:
+        nome: Percorso del bundle (es. 'bundles/base.css')
+
+    Returns:
+        [nome] se la pipeline è attiva, altrimenti la lista dei file sorgente
+    """
+    sorgenti = get_bundles()[nome]
+    if pipeline_attiva():
+        return [nome]
+    return list(sorgenti)
+
+
+# Indice generato da estrai_css_pagine: nome URL -> {css, critico}
+INDICE_CSS_PAGINE = "pagine/critico.json"
+
+
+@lru_cache(maxsize=1)
+def _indice_css_pagine():
+    try:
+        with staticfiles_storage.open(INDICE_CSS_PAGINE) as f:
+            return json.load(f).get("pagine", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def get_css_pagina(nome_url):
+    """
+    Restituisce CSS purgato e CSS critico di una pagina, se generati.
+
+    Args:
+        nome_url: Nome della URL (request.resolver_match.url_name)
+
+    Returns:
+        Dict {css: percorso statico, critico: testo CSS} oppure None
+    """
+    if not pipeline_attiva() or not nome_url:
+        return None
+    return _indice_css_pagine().get(nome_url)
+
+
+def minifica_css(testo):
+    """
+    Minificazione conservativa del CSS.
+
+    Elimina commenti e spazi superflui senza toccare il contenuto delle
+    stringhe (es. data URI SVG) né gli spazi significativi nei selettori.
+    """
+    parti = []
+    posizione = 0
+    for match in _TOKEN_CSS.finditer(testo):
+        parti.append(_compatta_css(testo[posizione:match.start()]))
+        parti.append(match.group(1) or "")
+        posizione = match.end()
+    parti.append(_compatta_css(testo[posizione:]))
+    return "".join(parti).replace(";}", "}").strip()
+
+
+def _compatta_css(frammento):
+    frammento = _SPAZI_CSS.sub(" ", frammento)
+    return _SPAZI_SEPARATORI_CSS.sub(r"\1", frammento)
+
+
+def riscrivi_url_css(testo, sorgente, destinazione):
+    """
+    Adegua gli url() relativi di un CSS spostato da sorgente a destinazione.
+
+    Gli URL assoluti, i data URI e i frammenti restano invariati.
+    """
+    cartella_sorgente = posixpath.dirname(sorgente)
+    cartella_destinazione = posixpath.dirname(destinazione) or "."
+
+    def _riscrivi(match):
+        url = (match.group("doppi") or match.group("singoli") or match.group("url") or "").strip()
+        if not url or url.startswith(("/", "#", "data:")) or "//" in url:
+            return match.group(0)
+        percorso, separatore, resto = url.partition("?")
+        assoluto = posixpath.normpath(posixpath.join(cartella_sorgente, percorso))
+        relativo = posixpath.relpath(assoluto, cartella_destinazione)
+        return f'url("{relativo}{separatore}{resto}")'
+
+    return _URL_CSS.sub(_riscrivi, testo)
+
+
+def costruisci_bundle(nome, leggi, destinazione=None):
+    """
+    Concatena (e per il CSS minifica) i sorgenti di un bundle.
+
+    Args:
+        nome: Percorso del bundle
+        leggi: Funzione percorso sorgente -> contenuto testuale
+        destinazione: Percorso finale, se diverso da nome (per gli url() relativi)
+
+    Returns:
+        Contenuto del bundle
+    """
+    sorgenti = get_bundles()[nome]
+
+    if nome.endswith(".css"):
+        parti = []
+        for sorgente in sorgenti:
+            testo = _CHARSET_CSS.sub("", leggi(sorgente))
+            testo = riscrivi_url_css(testo, sorgente, destinazione or nome)
+            parti.append(minifica_css(testo))
+        return '@charset "UTF-8";' + "\n".join(parti) + "\n"
+
+    # JavaScript: i sorgenti sono già minificati (tranne script piccoli),
+    # si concatenano separando con ';' per non fondere le espressioni finali
+    parti = [_SOURCEMAP.sub("", leggi(sorgente)).strip() for sorgente in sorgenti]
+    return "\n;\n".join(parti) + "\n"
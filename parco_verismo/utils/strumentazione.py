@@ -0,0 +1,152 @@
+"""
+Misure per richiesta: tempo e numero delle query SQL, tempo di rendering
+dei template, hit e miss della cache (usate da ServerTimingMiddleware).
+
+Le misure della richiesta in corso vivono in una ContextVar: fuori da
+misura_richiesta() template e cache non misurano nulla. Il rendering e la
+cache vengono strumentati una sola volta per processo
+(installa_strumentazione), le query con connection.execute_wrapper.
+"""
+
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache.backends.base import BaseCache
+from django.db import connections
+from django.template.backends.django import Template
+from django.utils.module_loading import import_string
+
+_misure = ContextVar("misure_richiesta", default=None)
+
+# Valore di default di cache.get() per distinguere un miss da un None salvato
+_MANCANTE = object()
+
+
+class MisureRichiesta:
+    """Misure raccolte durante una richiesta."""
+
+    def __init__(self):
+        self.sql = []  # (millisecondi, SQL)
+        self.template_ms = 0.0
+        self.cache_hit = 0
+        self.cache_miss = 0
+        self._rendering = False
+
+    @property
+    def query(self):
+        return len(self.sql)
+
+    @property
+    def db_ms(self):
+        return sum(ms for ms, _ in self.sql)
+
+    def sql_lente(self, numero):
+        """Le numero query più lente, dalla più lenta."""
+        return sorted(self.sql, key=lambda voce: voce[0], reverse=True)[:numero]
+
+    def server_timing(self, totale_ms):
+        """Valore dell'header Server-Timing."""
+        return ", ".join(
+            (
+                f"app;dur={totale_ms:.1f}",
+                f'db;dur={self.db_ms:.1f};desc="{self.query} query"',
+                f"tpl;dur={self.template_ms:.1f}",
+                f'cache;desc="{self.cache_hit} hit, {self.cache_miss} miss"',
+            )
+        )
+
+
+def _misura_sql(execute, sql, params, many, context):
+    inizio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        misure = _misure.get()
+        if misure is not None:
+            misure.sql.append(((time.perf_counter() - inizio) * 1000, sql))
+
+
+@contextmanager
+def misura_richiesta():
+    """Raccoglie le misure del blocco (una richiesta) in un MisureRichiesta."""
+    misure = MisureRichiesta()
+    token = _misure.set(misure)
+    try:
+        with ExitStack() as stack:
+            for connessione in connections.all():
+                stack.enter_context(connessione.execute_wrapper(_misura_sql))
+            yield misure
+    finally:
+        _misure.reset(token)
+
+
+def _strumenta_template():
+    originale = Template.render
+    if getattr(originale, "strumentato", False):
+        return
+
+    @wraps(originale)
+    def render(self, context=None, request=None):
+        misure = _misure.get()
+        # Un template renderizzato dentro un altro è già nel tempo di quello esterno
+        if misure is None or misure._rendering:
+            return originale(self, context, request)
+        misure._rendering = True
+        inizio = time.perf_counter()
+        try:
+            return originale(self, context, request)
+        finally:
+            misure.template_ms += (time.perf_counter() - inizio) * 1000
+            misure._rendering = False
+
+    render.strumentato = True
+    Template.render = render
+
+
+def _strumenta_cache(classe):
+    originale = classe.get
+    if getattr(originale, "strumentato", False):
+        return
+
+    @wraps(originale)
+    def get(self, key, default=None, version=None):
+        misure = _misure.get()
+        if misure is None:
+            return originale(self, key, default, version)
+        valore = originale(self, key, _MANCANTE, version)
+        if valore is _MANCANTE:
+            misure.cache_miss += 1
+            return default
+        misure.cache_hit += 1
+        return valore
+
+    get.strumentato = True
+    classe.get = get
+
+    # BaseCache.get_many() chiama get(): va strumentata solo se il backend la ridefinisce
+    originale_many = classe.get_many
+    if originale_many is BaseCache.get_many or getattr(originale_many, "strumentato", False):
+        return
+
+    @wraps(originale_many)
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        risultato = originale_many(self, keys, version)
+        misure = _misure.get()
+        if misure is not None:
+            misure.cache_hit += len(risultato)
+            misure.cache_miss += len(keys) - len(risultato)
+        return risultato
+
+    get_many.strumentato = True
+    classe.get_many = get_many
+
+
+def installa_strumentazione():
+    """Strumenta il rendering dei template e i backend di settings.CACHES (una volta per processo)."""
+    _strumenta_template()
+    for configurazione in settings.CACHES.values():
+        _strumenta_cache(import_string(configurazione["BACKEND"]))
@@ -37,8 +37,26 @@ from .itinerari import (
     itinerari_capuaniani_view,
     itinerari_tematici_view,
     itinerario_detail_view,
+    itinerario_dati_view,
+    pianifica_itinerario_view,
+    pianifica_itinerario_api_view,
 )
 
+# Mappe
+from .mappe import tile_view
+
+# Service worker e pacchetti offline
+from .offline import service_worker_view, pacchetto_offline_view
+
+# File SEO alla radice (favicon, robots.txt, sitemap)
+from .seo import favicon_view, robots_txt_view, sitemap_index_view, sitemap_sezione_view
+
+# Frammenti dinamici delle pagine in cache (home, contatti)
+from .frammenti import csrf_token_view, messaggi_view
+
+# Health check e metriche Prometheus
+from .health import health_check_view, readiness_view, metriche_view
+
 # Comuni
 from .comuni import (
     licodia_view,
@@ -82,6 +100,26 @@ __all__ = [
     'itinerari_capuaniani_view',
     'itinerari_tematici_view',
     'itinerario_detail_view',
+    'itinerario_dati_view',
+    'pianifica_itinerario_view',
+    'pianifica_itinerario_api_view',
+    # Mappe
+    'tile_view',
+    # Offline
+    'service_worker_view',
+    'pacchetto_offline_view',
+    # SEO
+    'favicon_view',
+    'robots_txt_view',
+    'sitemap_index_view',
+    'sitemap_sezione_view',
+    # Frammenti
+    'csrf_token_view',
+    'messaggi_view',
+    # Health check e metriche
+    'health_check_view',
+    'readiness_view',
+    'metriche_view',
     # Comuni
     'licodia_view',
     'mineo_view',
@@ -8,12 +8,13 @@ from django.shortcuts import render, get_object_or_404
 
 # Local imports
 from ..models import Opera, Autore
+from ..utils.decorators import risposta_condizionale
 
 
 def biblioteca_view(request):
     """Mostra tutte le opere e gestisce la ricerca per titolo e autore."""
     query = request.GET.get("q", "")
-    opere_list = Opera.objects.all()
+    opere_list = Opera.objects.with_translations().select_related("autore")
 
     if query:
         # Cerca nel titolo dell'opera O nel nome dell'autore
@@ -31,7 +32,7 @@ def biblioteca_view(request):
 def opere_per_autore_view(request, autore_slug):
     """Pagina di presentazione delle opere di un singolo autore."""
     autore = get_object_or_404(Autore, slug=autore_slug)
-    opere_autore = Opera.objects.filter(autore=autore)
+    opere_autore = Opera.objects.with_translations().select_related("autore").filter(autore=autore)
     context = {
         "autore": autore,
         "opere": opere_autore,
@@ -39,6 +40,8 @@ def opere_per_autore_view(request, autore_slug):
     return render(request, "parco_verismo/opere_per_autore.html", context)
 
 
+# La pagina mostra anche nome e link dell'autore
+@risposta_condizionale(Opera, campi_data=("updated_at", "autore__updated_at"))
 def opera_detail_view(request, slug):
     """Pagina di dettaglio della singola opera con trama e analisi."""
     opera = get_object_or_404(Opera, slug=slug)
@@ -7,11 +7,12 @@ from django.shortcuts import render, get_object_or_404
 
 # Local imports
 from ..models import Documento, FotoArchivio
+from ..utils.decorators import risposta_condizionale
 
 
 def documenti_view(request):
     """Mostra tutti i documenti e studi attivi con filtri per tipo e ricerca."""
-    documenti = Documento.objects.filter(is_active=True).order_by('-data_pubblicazione')
+    documenti = Documento.objects.with_translations().filter(is_active=True).order_by('-data_pubblicazione')
     
     # Filtro per tipo
     tipo_filter = request.GET.get('tipo', '')
@@ -36,6 +37,7 @@ def documenti_view(request):
     return render(request, 'parco_verismo/documenti.html', context)
 
 
+@risposta_condizionale(Documento, is_active=True)
 def documento_detail_view(request, slug):
     """Pagina di dettaglio di un singolo documento/studio."""
     documento = get_object_or_404(Documento, slug=slug, is_active=True)
@@ -47,9 +49,10 @@ def documento_detail_view(request, slug):
 
 def verga_capuana_fotografi_view(request):
     """Pagina dell'archivio fotografico con carosello e categorie."""
-    foto_verga = FotoArchivio.objects.filter(is_active=True, autore='VERGA').order_by('ordine', '-data_aggiunta')
-    foto_capuana = FotoArchivio.objects.filter(is_active=True, autore='CAPUANA').order_by('ordine', '-data_aggiunta')
-    foto_altro = FotoArchivio.objects.filter(is_active=True).exclude(autore__in=['VERGA', 'CAPUANA']).order_by('ordine', '-data_aggiunta')
+    foto = FotoArchivio.objects.with_translations()
+    foto_verga = foto.filter(is_active=True, autore='VERGA').order_by('ordine', '-data_aggiunta')
+    foto_capuana = foto.filter(is_active=True, autore='CAPUANA').order_by('ordine', '-data_aggiunta')
+    foto_altro = foto.filter(is_active=True).exclude(autore__in=['VERGA', 'CAPUANA']).order_by('ordine', '-data_aggiunta')
     
     # Raggruppa per categoria se necessario (opzionale, per ora lasciamo semplice)
     
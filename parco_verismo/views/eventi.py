@@ -8,6 +8,7 @@ from django.utils import timezone, translation
 
 # Local imports
 from ..models import Evento, Notizia
+from ..utils.decorators import risposta_condizionale
 
 
 def eventi_view(request):
@@ -15,19 +16,19 @@ def eventi_view(request):
     now = timezone.now()
     
     # Eventi futuri (ordinati dal più vicino al più lontano)
-    eventi_futuri = list(Evento.objects.filter(
+    eventi_futuri = list(Evento.objects.with_translations().filter(
         is_active=True, data_inizio__gte=now
     ).order_by("data_inizio"))
     
     # Eventi passati (ordinati dal più recente al più vecchio)
-    eventi_passati = list(Evento.objects.filter(
+    eventi_passati = list(Evento.objects.with_translations().filter(
         is_active=True, data_inizio__lt=now
     ).order_by("-data_inizio"))
     
     # Combina: prima futuri, poi passati, max 5 totali
     eventi = (eventi_futuri + eventi_passati)[:5]
     
-    notizie = Notizia.objects.filter(is_active=True).order_by("-data_pubblicazione")[
+    notizie = Notizia.objects.with_translations().filter(is_active=True).order_by("-data_pubblicazione")[
         :20
     ]
     context = {
@@ -39,7 +40,7 @@ def eventi_view(request):
 
 def calendario_view(request):
     """Mostra il calendario degli eventi."""
-    eventi = Evento.objects.filter(is_active=True).order_by("data_inizio")
+    eventi = Evento.objects.with_translations().filter(is_active=True).order_by("data_inizio")
     context = {
         "eventi": eventi,
         "LANGUAGE_CODE": translation.get_language(),
@@ -47,6 +48,7 @@ def calendario_view(request):
     return render(request, "parco_verismo/calendario.html", context)
 
 
+@risposta_condizionale(Evento, is_active=True)
 def evento_detail_view(request, slug):
     """Pagina di dettaglio di un singolo evento."""
     evento = get_object_or_404(Evento, slug=slug, is_active=True)
@@ -58,8 +60,8 @@ def evento_detail_view(request, slug):
 
 def notizie_view(request):
     """Mostra tutte le notizie attive ordinate per data di pubblicazione."""
-    notizie = Notizia.objects.filter(is_active=True).order_by("-data_pubblicazione")
-    eventi = Evento.objects.filter(
+    notizie = Notizia.objects.with_translations().filter(is_active=True).order_by("-data_pubblicazione")
+    eventi = Evento.objects.with_translations().filter(
         is_active=True, data_inizio__gte=timezone.now()
     ).order_by("data_inizio")[:20]
     context = {
@@ -69,6 +71,7 @@ def notizie_view(request):
     return render(request, "parco_verismo/notizie.html", context)
 
 
+@risposta_condizionale(Notizia, is_active=True)
 def notizia_detail_view(request, slug):
     """Pagina di dettaglio di una singola notizia."""
     notizia = get_object_or_404(Notizia, slug=slug, is_active=True)
@@ -0,0 +1,28 @@
+"""
+Frammenti dinamici delle pagine condivise (home, contatti).
+
+L'HTML di queste pagine è uguale per tutti e sta in cache: il token CSRF
+del modulo di contatto e i messaggi dopo l'invio vengono chiesti da
+JavaScript (static/js/modulo-contatto.js) a queste view, mai in cache.
+"""
+
+# Django imports
+from django.http import JsonResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+
+@never_cache
+@require_GET
+def csrf_token_view(request):
+    """Token CSRF per il modulo di contatto (imposta anche il cookie csrftoken)."""
+    return JsonResponse({"token": get_token(request)})
+
+
+@never_cache
+@require_GET
+def messaggi_view(request):
+    """Messaggi in sospeso (es. conferma di invio del modulo) come frammento HTML."""
+    return render(request, "parco_verismo/components/messaggi.html")
@@ -2,13 +2,30 @@
 Views di utilità per il sistema.
 """
 
-from django.http import JsonResponse, HttpResponse
+import hmac
 
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
 
+from ..services.salute_service import controlla_prontezza
+from ..utils.metriche import esposizione_prometheus
+
+
+def _accesso_riservato(request):
+    """Staff, oppure "Authorization: Bearer <METRICHE_TOKEN>" (monitoraggio)."""
+    token = settings.METRICHE_TOKEN
+    autorizzazione = request.headers.get("Authorization", "")
+    autorizzato = bool(token) and hmac.compare_digest(autorizzazione.encode(), f"Bearer {token}".encode())
+    return autorizzato or request.user.is_staff
+
+
+@never_cache
 def health_check_view(request):
     """
-    Endpoint di health check per Docker e Nginx.
-    Utilizzato per verificare che l'applicazione sia in esecuzione.
+    Liveness: il processo risponde (nessuna dipendenza controllata).
+    Un errore qui significa che il container va riavviato.
     """
     return JsonResponse({
         "status": "healthy",
@@ -16,6 +33,35 @@ def health_check_view(request):
     })
 
 
+@never_cache
+def readiness_view(request):
+    """
+    Readiness: database, migrazioni, cache e volume media funzionanti, con
+    la latenza di ciascuno. 503 se un controllo fallisce, così Docker e
+    nginx smettono di considerare pronta l'istanza.
+
+    La pagina è pubblica: errori, migrazioni in attesa e spazio su disco
+    sono mostrati solo come per /metrics (staff o METRICHE_TOKEN), agli
+    altri soltanto esito e latenza di ogni controllo.
+    """
+    risultato = controlla_prontezza()
+    if not _accesso_riservato(request):
+        risultato = {
+            "pronto": risultato["pronto"],
+            "controlli": {
+                nome: {"ok": esito["ok"], "ms": esito["ms"]} for nome, esito in risultato["controlli"].items()
+            },
+        }
+    return JsonResponse(
+        {
+            "status": "ready" if risultato["pronto"] else "unavailable",
+            "service": "parco-verismo",
+            **risultato,
+        },
+        status=200 if risultato["pronto"] else 503,
+    )
+
+
 def google_verification_view(request):
     """
     Serve il file di verifica per Google Search Console.
@@ -24,3 +70,17 @@ def google_verification_view(request):
         "google-site-verification: googlebff3b6f1bd148bc7.html",
         content_type="text/html"
     )
+
+
+@never_cache
+@require_GET
+def metriche_view(request):
+    """
+    Metriche di tutti i worker nel formato testuale di Prometheus.
+
+    Accessibile allo staff o con "Authorization: Bearer <METRICHE_TOKEN>"
+    (lo scraper di Prometheus); per tutti gli altri la pagina non esiste.
+    """
+    if not _accesso_riservato(request):
+        raise Http404
+    return HttpResponse(esposizione_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
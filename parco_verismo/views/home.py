@@ -11,8 +11,10 @@ from django.utils import timezone
 # Local imports
 from ..forms.richiesta import RichiestaForm
 from ..models import Evento, Notizia
+from ..utils.decorators import pagina_condivisa
 
 
+@pagina_condivisa(sezioni=("eventi", "notizie"))
 def home_view(request):
     """Vista homepage con modulo di contatto e contenuti in evidenza."""
     # Gestione form di contatto con validazione
@@ -51,12 +53,12 @@ def home_view(request):
 
     # Eventi: 5 eventi totali, prima quelli futuri (più vicini) poi quelli passati (più recenti)
     now = timezone.now()
-    eventi_futuri = list(Evento.objects.filter(is_active=True, data_inizio__gte=now).order_by("data_inizio"))
-    eventi_passati = list(Evento.objects.filter(is_active=True, data_inizio__lt=now).order_by("-data_inizio"))
+    eventi_futuri = list(Evento.objects.with_translations().filter(is_active=True, data_inizio__gte=now).order_by("data_inizio"))
+    eventi_passati = list(Evento.objects.with_translations().filter(is_active=True, data_inizio__lt=now).order_by("-data_inizio"))
     eventi_latest = (eventi_futuri + eventi_passati)[:5]
 
     # Notizie: prendere le ultime 5 notizie attive ordinate per data di pubblicazione
-    notizie_latest = Notizia.objects.filter(is_active=True).order_by("-data_pubblicazione")[:5]
+    notizie_latest = Notizia.objects.with_translations().filter(is_active=True).order_by("-data_pubblicazione")[:5]
 
     context = {
         "eventi": eventi_latest,
@@ -8,6 +8,8 @@ from django.urls import reverse
 
 # Local imports
 from ..forms.richiesta import RichiestaForm
+from ..utils.decorators import pagina_condivisa
+from ..utils.metriche import cronometro
 
 
 # =============================================================================
@@ -43,6 +45,7 @@ def accrediti_finanziamenti_view(request):
     return render(request, "parco_verismo/accrediti_finanziamenti.html")
 
 
+@pagina_condivisa()
 def contatti_view(request):
     """Pagina Contatti del Parco Letterario con modulo funzionale."""
     if request.method == "POST":
@@ -73,13 +76,14 @@ Puoi gestire questa richiesta dal pannello di amministrazione:
 {request.scheme}://{request.get_host()}/richieste/dashboard/
                     """
                     
-                    send_mail(
-                        subject,
-                        message,
-                        settings.DEFAULT_FROM_EMAIL,  # Mittente (configurato in settings)
-                        ["info@parcovergacapuana.it"],  # Destinatario
-                        fail_silently=False,
-                    )
+                    with cronometro("parco_email_invio_secondi", tipo="contatti"):
+                        send_mail(
+                            subject,
+                            message,
+                            settings.DEFAULT_FROM_EMAIL,  # Mittente (configurato in settings)
+                            ["info@parcovergacapuana.it"],  # Destinatario
+                            fail_silently=False,
+                        )
                 except Exception as e:
                     logging.error(f"Errore invio email: {e}")
                     # Non blocchiamo il flusso se l'email fallisce, ma logghiamo l'errore
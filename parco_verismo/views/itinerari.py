@@ -12,13 +12,20 @@ from django.http import JsonResponse
 
 # Local imports
 from ..models import Itinerario
+from ..services.offline_service import dati_mappa_itinerario
+from ..services.planner_service import (
+    MAX_TAPPE_PIANIFICABILI,
+    get_tappe_disponibili,
+    pianifica_percorso,
+)
+from ..utils.decorators import risposta_condizionale
 
 
 def itinerari_verghiani_view(request):
     """
     View per gli itinerari verghiani con mappa interattiva e sidebar.
     """
-    itinerari = Itinerario.objects.filter(
+    itinerari = Itinerario.objects.with_translations().filter(
         is_active=True, 
         tipo="verghiano"
     ).prefetch_related('galleria').order_by("ordine")
@@ -42,6 +49,9 @@ def itinerari_verghiani_view(request):
             "coordinate_tappe": itinerario.coordinate_tappe or [],
             "percorsi_calcolati": itinerario.percorsi_calcolati or {},
             "centro_mappa": itinerario.get_centro_mappa(),
+            "bbox_mappa": itinerario.bbox_mappa,
+            "lunghezza_percorso": itinerario.lunghezza_percorso,
+            "durata_percorso": itinerario.durata_percorso,
             "numero_tappe": itinerario.get_numero_tappe(),
             "url_detail": itinerario.get_absolute_url(),
             "url_immagine": itinerario.immagine.url if itinerario.immagine else None,
@@ -66,7 +76,7 @@ def itinerari_capuaniani_view(request):
     """
     View per gli itinerari capuaniani con mappa interattiva e sidebar.
     """
-    itinerari = Itinerario.objects.filter(
+    itinerari = Itinerario.objects.with_translations().filter(
         is_active=True, 
         tipo="capuaniano"
     ).prefetch_related('galleria').order_by("ordine")
@@ -90,6 +100,9 @@ def itinerari_capuaniani_view(request):
             "coordinate_tappe": itinerario.coordinate_tappe or [],
             "percorsi_calcolati": itinerario.percorsi_calcolati or {},
             "centro_mappa": itinerario.get_centro_mappa(),
+            "bbox_mappa": itinerario.bbox_mappa,
+            "lunghezza_percorso": itinerario.lunghezza_percorso,
+            "durata_percorso": itinerario.durata_percorso,
             "numero_tappe": itinerario.get_numero_tappe(),
             "url_detail": itinerario.get_absolute_url(),
             "url_immagine": itinerario.immagine.url if itinerario.immagine else None,
@@ -114,7 +127,7 @@ def itinerari_tematici_view(request):
     """
     View per gli itinerari tematici con mappa interattiva e sidebar.
     """
-    itinerari = Itinerario.objects.filter(
+    itinerari = Itinerario.objects.with_translations().filter(
         is_active=True, 
         tipo="tematico"
     ).prefetch_related('galleria').order_by("ordine")
@@ -138,6 +151,9 @@ def itinerari_tematici_view(request):
             "coordinate_tappe": itinerario.coordinate_tappe or [],
             "percorsi_calcolati": itinerario.percorsi_calcolati or {},
             "centro_mappa": itinerario.get_centro_mappa(),
+            "bbox_mappa": itinerario.bbox_mappa,
+            "lunghezza_percorso": itinerario.lunghezza_percorso,
+            "durata_percorso": itinerario.durata_percorso,
             "numero_tappe": itinerario.get_numero_tappe(),
             "url_detail": itinerario.get_absolute_url(),
             "url_immagine": itinerario.immagine.url if itinerario.immagine else None,
@@ -158,25 +174,95 @@ def itinerari_tematici_view(request):
     return render(request, "parco_verismo/itinerari_tematici.html", context)
 
 
+@risposta_condizionale(Itinerario, is_active=True)
 def itinerario_detail_view(request, slug):
     """
     View per il dettaglio di un singolo itinerario con mappa delle tappe.
     """
     itinerario = get_object_or_404(Itinerario, slug=slug, is_active=True)
     
-    # Prepara i dati per la mappa
+    # Prepara i dati per la mappa (geometria pre-calcolata al salvataggio)
+    tappe = itinerario.get_tappe_ordinate()
+    centro_mappa = itinerario.get_centro_mappa()
     coordinate_json = json.dumps({
-        "tappe": itinerario.get_tappe_ordinate(),
-        "centro": itinerario.get_centro_mappa(),
+        "tappe": tappe,
+        "centro": centro_mappa,
+        "bbox": itinerario.bbox_mappa,
+        "tratte": itinerario.tratte_stimate,
         "colore": itinerario.colore_percorso,
     }, ensure_ascii=False)
     
     context = {
         "itinerario": itinerario,
-        "tappe": itinerario.get_tappe_ordinate(),
+        "tappe": tappe,
         "numero_tappe": itinerario.get_numero_tappe(),
-        "centro_mappa": itinerario.get_centro_mappa(),
+        "centro_mappa": centro_mappa,
         "coordinate_json": coordinate_json
     }
     
     return render(request, "parco_verismo/itinerario_detail.html", context)
+
+
+def itinerario_dati_view(request, slug):
+    """
+    Dati JSON della mappa di un itinerario (usati anche dal pacchetto offline).
+    """
+    itinerario = get_object_or_404(Itinerario, slug=slug, is_active=True)
+    return JsonResponse(dati_mappa_itinerario(itinerario), json_dumps_params={"ensure_ascii": False})
+
+
+def _tappe_richieste(request):
+    """Legge le chiavi tappa dalla query string (?tappe=a&tappe=b o ?tappe=a,b)."""
+    chiavi = []
+    for valore in request.GET.getlist("tappe"):
+        chiavi.extend(c.strip() for c in valore.split(",") if c.strip())
+    return chiavi
+
+
+def _partenza_richiesta(request):
+    """Legge la tappa di partenza scelta (?partenza=slug:indice), se presente."""
+    return request.GET.get("partenza", "").strip() or None
+
+
+def pianifica_itinerario_view(request):
+    """
+    Pianificatore di itinerari personalizzati: il visitatore sceglie le tappe
+    da qualsiasi itinerario (e, se vuole, quella di partenza) e ottiene un
+    ordine di visita efficiente.
+    """
+    chiavi = _tappe_richieste(request)[:MAX_TAPPE_PIANIFICABILI]
+    partenza = _partenza_richiesta(request)
+    percorso = pianifica_percorso(chiavi, partenza) if chiavi or partenza else None
+
+    context = {
+        "gruppi_tappe": get_tappe_disponibili(),
+        "selezionate": chiavi,
+        "partenza": partenza,
+        "percorso": percorso,
+        "max_tappe": MAX_TAPPE_PIANIFICABILI,
+    }
+
+    return render(request, "parco_verismo/pianifica_itinerario.html", context)
+
+
+def pianifica_itinerario_api_view(request):
+    """
+    Endpoint JSON del pianificatore: restituisce l'ordine di visita ottimizzato
+    per le tappe indicate; ?partenza= fissa il punto di partenza, altrimenti
+    viene scelto anche quello.
+    """
+    chiavi = _tappe_richieste(request)
+    partenza = _partenza_richiesta(request)
+    if not chiavi:
+        return JsonResponse({"error": "Nessuna tappa selezionata"}, status=400)
+    if len(chiavi) > MAX_TAPPE_PIANIFICABILI:
+        return JsonResponse(
+            {"error": f"Massimo {MAX_TAPPE_PIANIFICABILI} tappe per pianificazione"},
+            status=400,
+        )
+
+    percorso = pianifica_percorso(chiavi, partenza)
+    if percorso is None:
+        return JsonResponse({"error": "Nessuna tappa valida"}, status=404)
+
+    return JsonResponse(percorso, json_dumps_params={"ensure_ascii": False})
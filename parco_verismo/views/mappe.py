@@ -0,0 +1,36 @@
+"""
+Views per le mappe: proxy con cache locale delle tile OpenStreetMap.
+"""
+
+# Django imports
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+# Local imports
+from ..services.tile_service import TileFuoriArea, TileNonDisponibile, get_tile, tile_valida
+
+
+@require_GET
+def tile_view(request, z, x, y):
+    """
+    Serve una tile della mappa dalla cache su disco, scaricandola
+    dall'origine alla prima richiesta (solo nell'area del parco). Usata da
+    tutte le mappe Leaflet.
+    """
+    if not tile_valida(z, x, y):
+        raise Http404("Tile non valida")
+
+    try:
+        contenuto, hit = get_tile(z, x, y)
+    except TileFuoriArea:
+        raise Http404("Tile fuori dall'area del parco")
+    except TileNonDisponibile:
+        response = HttpResponse(status=502)
+        response["Cache-Control"] = "no-store"
+        return response
+
+    response = HttpResponse(contenuto, content_type="image/png")
+    response["Cache-Control"] = f"public, max-age={settings.TILE_CACHE_MAX_AGE}"
+    response["X-Tile-Cache"] = "HIT" if hit else "MISS"
+    return response
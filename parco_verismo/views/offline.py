@@ -0,0 +1,55 @@
+"""
+Views per il service worker e i pacchetti offline degli itinerari.
+"""
+
+# Django imports
+from django.conf import settings
+from django.http import HttpResponseNotModified, JsonResponse
+from django.shortcuts import get_object_or_404, render
+
+# Local imports
+from ..models import Itinerario
+from ..services.offline_service import (
+    get_pacchetto_offline,
+    precache_json,
+    versione_service_worker,
+)
+
+
+def service_worker_view(request):
+    """
+    Serve il service worker dalla radice del sito (scope '/').
+    Il browser lo ricontrolla ad ogni navigazione, quindi non va cachato.
+    """
+    context = {
+        "versione": versione_service_worker(),
+        "precache": precache_json(),
+        "static_url": settings.STATIC_URL,
+        "media_url": settings.MEDIA_URL,
+    }
+    response = render(
+        request, "parco_verismo/sw.js", context, content_type="application/javascript"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["Service-Worker-Allowed"] = "/"
+    return response
+
+
+def pacchetto_offline_view(request, slug):
+    """
+    Manifest versionato del pacchetto offline di un itinerario.
+    Risponde 304 se il client ha già la versione corrente.
+    """
+    itinerario = get_object_or_404(
+        Itinerario.objects.prefetch_related("galleria"), slug=slug, is_active=True
+    )
+    pacchetto = get_pacchetto_offline(itinerario)
+    etag = f'"{pacchetto["versione"]}"'
+
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(pacchetto)
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,144 @@
+"""
+Views per i file SEO alla radice del sito (favicon.ico, robots.txt, sitemap).
+
+Sono tra gli URL più richiesti (browser e crawler): il contenuto viene
+preparato una sola volta (per processo o in cache) e servito dalla memoria
+con ETag, così le richieste successive ricevono un 304 senza corpo.
+"""
+
+# Standard library imports
+import hashlib
+from functools import lru_cache
+
+# Django imports
+from django.contrib.sitemaps import views as sitemap_views
+from django.contrib.staticfiles import finders
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.http import parse_etags, parse_http_date_safe
+
+# Local imports
+from ..services.sitemap_service import chiave_sitemap, get_xml_in_cache, salva_xml_in_cache
+from ..sitemaps import SEZIONI, get_sitemaps
+
+FAVICON = "favicon.ico"
+FAVICON_MAX_AGE = 60 * 60 * 24 * 7  # 7 giorni (URL senza hash)
+ROBOTS_MAX_AGE = 60 * 60 * 24  # 1 giorno
+# Le sitemap cambiano ad ogni salvataggio: i crawler rivalidano sempre (304)
+SITEMAP_MAX_AGE = 0
+
+
+def _etag(contenuto):
+    return f'"{hashlib.sha256(contenuto).hexdigest()[:16]}"'
+
+
+def _non_modificato(request, etag, last_modified):
+    """True se il client ha già la versione corrente (If-None-Match / If-Modified-Since)."""
+    # Confronto debole (RFC 9110): W/"x" corrisponde a "x"
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        attesi = {e.removeprefix("W/") for e in parse_etags(if_none_match)}
+        return if_none_match.strip() == "*" or etag in attesi
+    # If-Modified-Since è considerato solo in assenza di If-None-Match
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    modificato = parse_http_date_safe(last_modified or "")
+    return bool(if_modified_since and modificato and modificato <= if_modified_since)
+
+
+def _risposta_in_memoria(request, contenuto, etag, content_type, max_age, last_modified=None):
+    """Risposta con ETag (e Last-Modified) e Cache-Control; 304 se il client ha già il contenuto."""
+    if _non_modificato(request, etag, last_modified):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(contenuto, content_type=content_type)
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = last_modified
+    response["Cache-Control"] = f"public, max-age={max_age}"
+    return response
+
+
+@lru_cache(maxsize=1)
+def _favicon():
+    """Bytes ed ETag della favicon (None se il file non esiste)."""
+    percorso = finders.find(FAVICON)
+    if not percorso:
+        return None
+    with open(percorso, "rb") as f:
+        contenuto = f.read()
+    return contenuto, _etag(contenuto)
+
+
+@lru_cache(maxsize=8)
+def _robots(sitemap_url):
+    """robots.txt generato per un URL della sitemap (uno per host servito)."""
+    contenuto = render_to_string("parco_verismo/robots.txt", {"sitemap_url": sitemap_url}).encode("utf-8")
+    return contenuto, _etag(contenuto)
+
+
+def favicon_view(request):
+    """Serve /favicon.ico dalla memoria."""
+    favicon = _favicon()
+    if favicon is None:
+        raise Http404("favicon.ico non trovata")
+    contenuto, etag = favicon
+    return _risposta_in_memoria(request, contenuto, etag, "image/x-icon", FAVICON_MAX_AGE)
+
+
+def robots_txt_view(request):
+    """Serve /robots.txt con l'URL assoluto della sitemap del dominio corrente."""
+    sitemap_url = request.build_absolute_uri(reverse("sitemap"))
+    contenuto, etag = _robots(sitemap_url)
+    return _risposta_in_memoria(request, contenuto, etag, "text/plain; charset=utf-8", ROBOTS_MAX_AGE)
+
+
+def _sitemap_in_cache(request, nome, sezioni, genera):
+    """
+    Serve l'XML di una sitemap dalla cache, generandolo con ``genera`` se manca.
+
+    La chiave dipende dalla versione delle sezioni coinvolte: un salvataggio
+    invalida solo gli shard della sezione modificata (e l'indice).
+    """
+    chiave = chiave_sitemap(request, nome, sezioni)
+    dati = get_xml_in_cache(chiave)
+    if dati is None:
+        response = genera()
+        response.render()
+        dati = {
+            "contenuto": response.content,
+            "etag": _etag(response.content),
+            "last_modified": response.get("Last-Modified"),
+        }
+        salva_xml_in_cache(chiave, dati)
+
+    response = _risposta_in_memoria(
+        request, dati["contenuto"], dati["etag"], "application/xml", SITEMAP_MAX_AGE, dati["last_modified"]
+    )
+    # Come le view di django.contrib.sitemaps: il file non va indicizzato
+    response["X-Robots-Tag"] = "noindex, noodp, noarchive"
+    return response
+
+
+def sitemap_index_view(request):
+    """Serve /sitemap.xml: indice degli shard per sezione e lingua, con lastmod."""
+    return _sitemap_in_cache(
+        request,
+        "indice",
+        SEZIONI,
+        lambda: sitemap_views.index(request, get_sitemaps(), sitemap_url_name="sitemap_sezione"),
+    )
+
+
+def sitemap_sezione_view(request, section):
+    """Serve /sitemap-<sezione>-<lingua>.xml (paginata con ?p=)."""
+    sitemaps = get_sitemaps()
+    if section not in sitemaps:
+        raise Http404(f"Sitemap sconosciuta: {section}")
+    sezione = section.rsplit("-", 1)[0]
+    return _sitemap_in_cache(
+        request,
+        section,
+        [sezione],
+        lambda: sitemap_views.sitemap(request, sitemaps, section=section),
+    )
@@ -37,9 +37,12 @@ mkdir -p "$BACKUP_DIR"
 # ================================
 echo -e "${YELLOW}Backup database SQLite...${NC}"
 
-# Copia il database dal volume Docker
-docker cp parco_verismo_web:/app/data/db.sqlite3 /tmp/db_backup.sqlite3 2>/dev/null || \
-docker cp parco_verismo_web:/app/db.sqlite3 /tmp/db_backup.sqlite3
+# Copia consistente con l'API di backup di SQLite: in modalità WAL le ultime
+# transazioni possono essere ancora in db.sqlite3-wal, che un docker cp del
+# solo file principale perderebbe
+docker exec parco_verismo_web python -c "import sqlite3; s = sqlite3.connect('/app/data/db.sqlite3'); d = sqlite3.connect('/app/data/db_backup.sqlite3'); s.backup(d); d.close(); s.close()"
+docker cp parco_verismo_web:/app/data/db_backup.sqlite3 /tmp/db_backup.sqlite3
+docker exec parco_verismo_web rm -f /app/data/db_backup.sqlite3
 
 # Comprimi (SQLite da ~400KB diventa ~50KB)
 gzip -9 /tmp/db_backup.sqlite3